@@ -1,30 +1,86 @@
-from flask import Flask, request, Response
+from flask import Flask, request, Response, g, send_file
 from twilio.twiml.voice_response import VoiceResponse, Gather
+import openai
 from openai import OpenAI
+import atexit
 import logging
 import os
+import threading
+import time
 from datetime import datetime
 from config.settings import config
-
-# Ensure logs directory exists
-os.makedirs('logs', exist_ok=True)
-
-# Configure logging
-logging.basicConfig(
-    filename='logs/voice_caller.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+from services.answer_cache import AnswerCache, normalize_utterance
+from services.twiml_cache import TwimlRegistry, TwimlTemplate
+from services.audio_prompts import AudioPromptStore, create_synthesizer, content_type as audio_content_type
+from services.streaming import StreamingAnswers
+from services.speculative import SpeculativeAnswers
+from services.sessions import SessionStore
+from services.storage import TranscriptStore
+from services.call_events import CallEventStore
+from services.model_router import ModelRouter, load_tiers
+from services.intents import IntentMatcher, classify_yes_no, load_facts
+from services.knowledge import KnowledgeBase
+from services.usage import load_prices, record_usage, estimate_cost
+from services.log_pipeline import configure_logging, parse_sample_rates, RequestLog
+from services.health import ReadinessProber
+from services.metrics import (
+    registry as metrics_registry, route_metrics, reprompt_reasons, record_openai_call, openai_coalesced,
+    speculative_waste, CONTENT_TYPE as METRICS_CONTENT_TYPE
 )
+from services.call_policy import (
+    CallPolicy, CircuitBreaker, CircuitOpenError, DeadlineExceeded, classify_error, FATAL
+)
+from services.single_flight import SingleFlight
+from services.deferred import DeferredAnswers, READY as DEFERRED_READY, MISSING as DEFERRED_MISSING
 
+# Importing this module starts no threads, opens no files or connections and creates
+# no log files: the entry points call setup_logging(), and the OpenAI client, database
+# connections and worker threads are created on first use. Import does read the
+# knowledge base file, build the (idle) stores and worker pools below, and register
+# atexit hooks that flush the transcript and call-event stores.
 logger = logging.getLogger(__name__)
 
+# Logging pipeline, started by setup_logging()
+log_pipeline = None
+
+def setup_logging():
+    """Send logging through a queue to a background writer (JSON lines, rotated); idempotent"""
+    global log_pipeline
+    if log_pipeline is None:
+        log_pipeline = configure_logging(
+            log_file=config.LOG_FILE,
+            level=config.LOG_LEVEL,
+            json_lines=config.LOG_FORMAT == 'json',
+            max_bytes=config.LOG_MAX_BYTES,
+            backup_count=config.LOG_BACKUP_COUNT,
+            sample_rates=parse_sample_rates(config.LOG_SAMPLE_RATES)
+        )
+    return log_pipeline
+
 app = Flask(__name__)
 
 # ==== CONFIGURATION ====
-# Initialize OpenAI client
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY', config.OPENAI_API_KEY)
-)
+def create_openai_client(api_key=None):
+    """Build the OpenAI client from the environment/config (api_key overrides OPENAI_API_KEY)"""
+    return OpenAI(
+        api_key=api_key or os.getenv('OPENAI_API_KEY', config.OPENAI_API_KEY),
+        base_url=config.OPENAI_BASE_URL,
+        # CallPolicy owns retries; SDK retries would multiply attempts past the turn deadline
+        max_retries=0
+    )
+
+# OpenAI client, created on first use (or per worker by warm_up)
+client = None
+_client_lock = threading.Lock()
+
+def get_openai_client():
+    """The shared OpenAI client"""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                client = create_openai_client()
+    return client
 
 # Configuration constants
 MAX_RETRIES = 3
@@ -32,61 +88,237 @@ SPEECH_TIMEOUT = 10
 MAX_TOKENS = 150
 TEMPERATURE = 0.3
 
-def create_error_response(message="I'm sorry, I'm experiencing technical difficulties. Please try again later."):
+DEFAULT_ERROR_MESSAGE = "I'm sorry, I'm experiencing technical difficulties. Please try again later."
+ANSWER_UNAVAILABLE_MESSAGE = (
+    "I'm having trouble processing your request right now. "
+    "Please call back in a few minutes or visit our website for immediate assistance."
+)
+HIGH_DEMAND_MESSAGE = "I'm currently experiencing high demand. Please try again in a moment."
+CIRCUIT_OPEN_MESSAGE = (
+    "I'm sorry, I can't look that up right now. "
+    "Our sales team will be happy to answer your question directly."
+)
+OUTBOUND_ERROR_MESSAGE = "I'm sorry, there was an issue starting our conversation."
+ROUTING_ERROR_MESSAGE = "I'm sorry, there was a routing error. Please try again."
+LOST_QUESTION_MESSAGE = "I'm sorry, I lost track of your question. Please call back and ask again."
+CALL_ENDED_MESSAGE = "Thank you for calling Buildn 123. Goodbye!"
+
+WELCOME_MESSAGE = (
+    'Hi, I am the virtual assistant from Buildn 123. '
+    'How can I help you with our real estate project today?'
+)
+NO_SPEECH_MESSAGE = "I didn't hear anything. Let me ask again."
+NO_INPUT_MESSAGE = "I didn't catch that. Could you please repeat your question more clearly?"
+LOW_CONFIDENCE_MESSAGE = "I'm not sure I understood that correctly. Could you please repeat your question?"
+FOLLOWUP_QUESTION = 'Is there anything else I can help you with?'
+GOODBYE_MESSAGE = 'Thank you for your interest in Buildn 123. Have a great day!'
+HOLD_MESSAGE = 'One moment while I look that up for you.'
+STILL_CHECKING_MESSAGE = 'Thanks for waiting, I am still checking.'
+
+# Fixed phrases pre-rendered to audio files (see render_audio_prompts)
+STATIC_PROMPTS = (
+    WELCOME_MESSAGE, NO_SPEECH_MESSAGE, NO_INPUT_MESSAGE, LOW_CONFIDENCE_MESSAGE,
+    FOLLOWUP_QUESTION, GOODBYE_MESSAGE, HOLD_MESSAGE, STILL_CHECKING_MESSAGE,
+    DEFAULT_ERROR_MESSAGE, ANSWER_UNAVAILABLE_MESSAGE, HIGH_DEMAND_MESSAGE, CIRCUIT_OPEN_MESSAGE,
+    OUTBOUND_ERROR_MESSAGE, ROUTING_ERROR_MESSAGE, LOST_QUESTION_MESSAGE, CALL_ENDED_MESSAGE
+)
+
+# Twilio <Say> voice for text without a recording
+SAY_VOICE = 'Polly.Joanna'
+
+AUDIO_MAX_AGE = 365 * 24 * 3600
+
+SYSTEM_PROMPT = (
+    "You are a helpful AI assistant for Buildn 123, a residential real estate project in Dallas. "
+    "Answer user questions clearly, briefly (under 100 words), and professionally, "
+    "using the project facts below. "
+    "If asked about specific details you don't know, suggest they contact our sales team. "
+    "Always maintain a friendly, helpful tone."
+)
+
+# Retries, backoff and circuit breaking for OpenAI calls, within Twilio's webhook window
+openai_breaker = CircuitBreaker(
+    failure_threshold=config.OPENAI_BREAKER_THRESHOLD,
+    recovery_timeout=config.OPENAI_BREAKER_RECOVERY
+)
+openai_policy = CallPolicy(
+    deadline=config.OPENAI_TURN_DEADLINE,
+    max_attempts=MAX_RETRIES,
+    breaker=openai_breaker
+)
+
+def turn_deadline(tier):
+    """A tier's timeout, capped by OPENAI_TURN_DEADLINE so one setting keeps every turn under Twilio's limit"""
+    return min(tier.timeout, openai_policy.deadline)
+
+# Project facts, indexed once; each prompt gets only the relevant ones
+knowledge_base = KnowledgeBase.from_file(config.KNOWLEDGE_BASE_PATH)
+
+# Common questions answered locally from facts read out of the knowledge base
+intent_matcher = IntentMatcher(load_facts(knowledge_base.snippets), enabled=config.INTENT_FASTPATH_ENABLED)
+
+# Fast model for simple questions, GPT-4 for the rest
+model_router = ModelRouter(
+    tiers=load_tiers(config.MODEL_TIERS),
+    default_tier='smart',
+    enabled=config.MODEL_ROUTING_ENABLED
+)
+
+# Recordings of fixed prompts and frequent answers, played instead of <Say>
+audio_prompts = AudioPromptStore(
+    config.AUDIO_DIR,
+    synthesizer=create_synthesizer(
+        config.AUDIO_SYNTHESIZER,
+        voice=config.AUDIO_VOICE,
+        azure_key=config.AZURE_SPEECH_KEY,
+        azure_region=config.AZURE_SPEECH_REGION
+    ),
+    voice=config.AUDIO_VOICE,
+    base_url=config.AUDIO_BASE_URL,
+    answer_cache_bytes=config.AUDIO_ANSWER_CACHE_MB * 1024 * 1024,
+    min_hits=config.AUDIO_ANSWER_MIN_HITS
+)
+
+# USD per 1K tokens, for the per-turn cost estimate
+model_prices = load_prices(config.MODEL_PRICES)
+
+# Cache of answers to repeated caller questions
+answer_cache = AnswerCache(
+    max_size=config.ANSWER_CACHE_SIZE,
+    ttl=config.ANSWER_CACHE_TTL,
+    enabled=config.ANSWER_CACHE_ENABLED
+)
+
+# Identical questions asked at the same time share one OpenAI call
+openai_flights = SingleFlight(enabled=config.SINGLE_FLIGHT_ENABLED)
+
+def flight_key(tier, user_input, history):
+    """
+    Key of an OpenAI request that identical concurrent requests can share, or None.
+
+    Only first questions qualify: with history the prompt is the call's own.
+    Questions are compared normalized, like the answer cache does.
+    """
+    if history:
+        return None
+    question = normalize_utterance(user_input)
+    return (tier.model, tier.max_tokens, question) if question else None
+
+# Background answers for deferred mode, keyed by CallSid
+deferred_answers = DeferredAnswers(max_workers=config.DEFERRED_WORKERS)
+
+# Buffered sentences of streamed answers, keyed by CallSid
+streaming_answers = StreamingAnswers()
+
+# Conversation history per call, trimmed to a token budget
+session_store = SessionStore(
+    max_sessions=config.SESSION_MAX_CALLS,
+    max_turns=config.SESSION_MAX_TURNS,
+    idle_ttl=config.SESSION_IDLE_TTL,
+    token_budget=config.SESSION_HISTORY_TOKEN_BUDGET
+)
+
+# Durable transcript of every answered turn (written in the background)
+transcript_store = TranscriptStore(config.DATABASE_URL) if config.TRANSCRIPTS_ENABLED else None
+if transcript_store is not None:
+    atexit.register(transcript_store.close)
+
+# Twilio call-progress events, buffered and written in batches
+call_event_store = CallEventStore(
+    config.DATABASE_URL,
+    batch_size=config.CALL_EVENTS_BATCH_SIZE,
+    flush_interval=config.CALL_EVENTS_FLUSH_INTERVAL,
+    max_buffer=config.CALL_EVENTS_MAX_BUFFER
+) if config.CALL_EVENTS_ENABLED else None
+if call_event_store is not None:
+    atexit.register(call_event_store.close)
+
+def speculate(text, call_sid):
+    """Speculative answer_fn: (answer, turn_info), so the reused turn keeps its model, tokens and cost"""
+    turn_info = {}
+    return get_ai_response(text, call_sid=call_sid, turn_info=turn_info), turn_info
+
+def record_speculative_waste(result):
+    """Count the tokens of a speculative answer that was superseded or did not match the question"""
+    _, turn_info = result
+    speculative_waste['prompt'].inc(turn_info.get('prompt_tokens', 0))
+    speculative_waste['completion'].inc(turn_info.get('completion_tokens', 0))
+
+# Answers started early from stable partial transcripts, keyed by CallSid
+speculative_answers = SpeculativeAnswers(
+    answer_fn=speculate,
+    max_workers=config.SPECULATIVE_WORKERS,
+    min_words=config.SPECULATIVE_MIN_WORDS,
+    enabled=config.SPECULATIVE_ANSWERS_ENABLED,
+    skip_fn=lambda text: intent_matcher.match(text) is not None,
+    waste_fn=record_speculative_waste
+)
+
+def create_error_response(message=DEFAULT_ERROR_MESSAGE):
     """Create a standardized error response"""
-    resp = VoiceResponse()
-    resp.say(message, language='en-US', voice='Polly.Joanna')
-    resp.hangup()
-    return Response(str(resp), mimetype='text/xml')
+    return twiml_response(render_error_twiml(message))
+
+def render_error_twiml(message=DEFAULT_ERROR_MESSAGE):
+    """Error TwiML bytes, playing the message's recording if there is one"""
+    audio_url = audio_prompts.url_for(message)
+    if audio_url:
+        return ERROR_AUDIO_TEMPLATE.render(audio_url=audio_url)
+    return ERROR_TEMPLATE.render(message=message)
+
+def render_answer_twiml(answer):
+    """Answer TwiML bytes, playing a recording of the answer once it is a frequent one"""
+    audio_url = audio_prompts.answer_url(answer)
+    if audio_url:
+        return ANSWER_AUDIO_TEMPLATE.render(audio_url=audio_url)
+    return ANSWER_TEMPLATE.render(answer=answer)
+
+def twiml_response(body):
+    """Wrap rendered TwiML bytes in a Flask response"""
+    return Response(body, mimetype='text/xml')
+
+# Twilio fields worth keeping in the per-request log line (never the whole form)
+LOGGED_FIELDS = {'SpeechResult': 'speech', 'Confidence': 'confidence', 'CallStatus': 'call_status'}
+
+# High-volume endpoints without a per-request log line (their data is stored instead)
+UNLOGGED_PATHS = {'/call_status'}
+
+@app.before_request
+def start_request_log():
+    """Bind the request's CallSid to every log record it produces"""
+    if request.path not in UNLOGGED_PATHS:
+        g.request_log = RequestLog(request.values.get('CallSid'))
 
 def log_request_info(route_name):
-    """Log incoming request information"""
-    logger.info(f"=== {route_name} REQUEST ===")
-    logger.info(f"Method: {request.method}")
-    logger.info(f"Form data: {dict(request.form)}")
-    logger.info(f"Args: {dict(request.args)}")
-    logger.info(f"Remote addr: {request.remote_addr}")
+    """Name the webhook in its request log line (logged once, after the response)"""
+    g.route_name = route_name
+
+@app.after_request
+def finish_request_log(response):
+    """One structured log line per webhook request"""
+    request_log = g.pop('request_log', None)
+    if request_log is not None:
+        fields = {name: request.values[key] for key, name in LOGGED_FIELDS.items() if key in request.values}
+        route = g.get('route_name', request.path)
+        request_log.finish(logger, route, request.method, response.status_code,
+                           remote_addr=request.remote_addr, **fields)
+    return response
 
 # ===== OUTBOUND CALL HANDLER =====
 @app.route("/outbound", methods=['GET', 'POST'])
+@route_metrics['outbound'].instrument
 def outbound():
     try:
         log_request_info("OUTBOUND")
-        
-        resp = VoiceResponse()
-        gather = Gather(
-            input='speech',
-            timeout=SPEECH_TIMEOUT,
-            language='en-US',
-            action='/process_speech',
-            partial_result_callback='/partial_result'  # Optional: for real-time feedback
-        )
-        
-        welcome_message = (
-            'Hi, I am the virtual assistant from Buildn 123. '
-            'How can I help you with our real estate project today?'
-        )
-        
-        gather.say(welcome_message, language='en-US', voice='Polly.Joanna')
-        resp.append(gather)
-        
-        # If no speech detected, try again with a different message
-        resp.say(
-            'I didn\'t hear anything. Let me ask again.',
-            language='en-US', 
-            voice='Polly.Joanna'
-        )
-        resp.redirect('/outbound')
-        
-        logger.info("Outbound call initiated successfully")
-        return Response(str(resp), mimetype='text/xml')
+        return twiml_response(static_twiml.get('outbound'))
         
     except Exception as e:
-        logger.error(f"Error in outbound handler: {str(e)}", exc_info=True)
-        return create_error_response("I'm sorry, there was an issue starting our conversation.")
+        logger.error("Error in outbound handler: %s", e, exc_info=True)
+        route_metrics['outbound'].error()
+        return create_error_response(OUTBOUND_ERROR_MESSAGE)
 
 # ===== SPEECH PROCESSING AND GPT-4 INTEGRATION =====
 @app.route("/process_speech", methods=['GET', 'POST'])
+@route_metrics['process_speech'].instrument
 def process_speech():
     try:
         log_request_info("PROCESS_SPEECH")
@@ -95,199 +327,719 @@ def process_speech():
         user_input = request.values.get('SpeechResult', '').strip()
         confidence = request.values.get('Confidence', 0)
         
-        logger.info(f"Speech Result: '{user_input}' (Confidence: {confidence})")
-        
-        resp = VoiceResponse()
+        logger.debug("Speech Result: '%s' (Confidence: %s)", user_input, confidence)
         
         # Check if we got valid speech input
         if not user_input:
             logger.warning("No speech input received")
-            resp.say(
-                'I didn\'t catch that. Could you please repeat your question more clearly?',
-                language='en-US',
-                voice='Polly.Joanna'
-            )
-            resp.redirect('/outbound')
-            return Response(str(resp), mimetype='text/xml')
+            reprompt_reasons['no_input'].inc()
+            return twiml_response(static_twiml.get('no_input'))
         
         # Check confidence level (if provided by Twilio)
         try:
             confidence_float = float(confidence)
             if confidence_float < 0.5:  # Low confidence threshold
-                logger.warning(f"Low confidence speech recognition: {confidence_float}")
-                resp.say(
-                    'I\'m not sure I understood that correctly. Could you please repeat your question?',
-                    language='en-US',
-                    voice='Polly.Joanna'
-                )
-                resp.redirect('/outbound')
-                return Response(str(resp), mimetype='text/xml')
+                logger.warning("Low confidence speech recognition: %s", confidence_float)
+                reprompt_reasons['low_confidence'].inc()
+                return twiml_response(static_twiml.get('low_confidence'))
         except (ValueError, TypeError):
             # Confidence not available or invalid, continue processing
             pass
         
-        # Process with OpenAI
-        answer = get_ai_response(user_input)
+        call_sid = request.values.get('CallSid')
         
-        if answer:
-            logger.info(f"Successful AI response generated for input: '{user_input}'")
-            resp.say(answer, language='en-US', voice='Polly.Joanna')
-            
-            # Optional: Ask if they need more help
-            gather = Gather(
-                input='speech',
-                timeout=5,
-                language='en-US',
-                action='/process_followup'
-            )
-            gather.say('Is there anything else I can help you with?', language='en-US', voice='Polly.Joanna')
-            resp.append(gather)
-            
-            # If no response, end call politely
-            resp.say('Thank you for your interest in Buildn 123. Have a great day!', language='en-US', voice='Polly.Joanna')
-            resp.hangup()
-        else:
-            logger.error("Failed to get AI response")
-            return create_error_response(
-                "I'm having trouble processing your request right now. "
-                "Please call back in a few minutes or visit our website for immediate assistance."
-            )
+        # Common questions are answered from the fact table without calling OpenAI
+        intent = intent_matcher.match(user_input)
+        if intent is not None:
+            speculative_answers.claim(call_sid, user_input)
+            answer_intent_turn(call_sid, user_input, intent, confidence)
+            return build_answer_response(intent.answer, user_input)
         
-        return Response(str(resp), mimetype='text/xml')
+        # Reuse a request already started from the caller's partial transcript
+        speculative = speculative_answers.claim(call_sid, user_input)
+        if speculative is not None:
+            logger.info("Reusing speculative AI response for call %s", call_sid)
+        answer_job = lambda: answer_turn(call_sid, user_input, speculative, confidence=confidence)
+        
+        # Streaming mode: speak the first sentence as soon as it is generated
+        if config.STREAMING_ANSWERS_ENABLED and call_sid and speculative is None:
+            cached_answer = answer_cache.get(user_input) if not session_store.history(call_sid) else None
+            if cached_answer:
+                session_store.add_exchange(call_sid, user_input, cached_answer)
+                return build_answer_response(cached_answer, user_input)
+            return start_streamed_answer(call_sid, user_input, confidence)
+        
+        # Deferred mode: answer in the background and put the caller on hold
+        if config.DEFERRED_ANSWERS_ENABLED and call_sid:
+            deferred_answers.submit(call_sid, answer_job)
+            state, answer = deferred_answers.result(call_sid, timeout=config.DEFERRED_INLINE_WAIT)
+            if state == DEFERRED_READY:
+                return build_answer_response(answer, user_input)
+            logger.info("Deferred AI response for call %s", call_sid)
+            return create_hold_response(HOLD_MESSAGE, attempt=1)
+        
+        # Process with OpenAI
+        answer = answer_job()
+        return build_answer_response(answer, user_input)
         
     except Exception as e:
-        logger.error(f"Error in process_speech: {str(e)}", exc_info=True)
+        logger.error("Error in process_speech: %s", e, exc_info=True)
+        route_metrics['process_speech'].error()
         return create_error_response()
 
-def get_ai_response(user_input, retry_count=0):
-    """Get response from OpenAI with retry logic"""
-    if retry_count >= MAX_RETRIES:
-        logger.error(f"Max retries ({MAX_RETRIES}) reached for OpenAI API")
+def answer_turn(call_sid, user_input, speculative=None, confidence=None):
+    """Answer one caller turn and remember it in the call's session and transcript"""
+    turn_info = {}
+    started = time.monotonic()
+    if speculative is not None:
+        answer, speculative_info = speculative.result()
+        turn_info.update(speculative_info, speculative=True)
+    else:
+        answer = get_ai_response(user_input, call_sid=call_sid, turn_info=turn_info)
+    if answer:
+        session_store.add_exchange(call_sid, user_input, answer)
+    record_transcript_turn(call_sid, user_input, answer, confidence, started, turn_info)
+    return answer
+
+def answer_intent_turn(call_sid, user_input, intent, confidence=None):
+    """Remember a turn answered by the local intent fast-path"""
+    logger.info("Answered locally as intent '%s'", intent.intent)
+    session_store.add_exchange(call_sid, user_input, intent.answer)
+    turn_info = {'model': 'local', 'tier': f'intent:{intent.intent}', 'retries': 0}
+    record_transcript_turn(call_sid, user_input, intent.answer, confidence, time.monotonic(), turn_info)
+    return intent.answer
+
+def record_transcript_turn(call_sid, user_input, answer, confidence, started, turn_info):
+    """Queue a turn for the durable transcript (no-op when transcripts are disabled)"""
+    if transcript_store is None or not call_sid:
+        return
+    try:
+        confidence = float(confidence) if confidence not in (None, '') else None
+    except (TypeError, ValueError):
+        confidence = None
+    prompt_tokens = turn_info.get('prompt_tokens')
+    completion_tokens = turn_info.get('completion_tokens')
+    transcript_store.record_turn(
+        call_sid,
+        user_input,
+        answer,
+        confidence=confidence,
+        model=turn_info.get('model'),
+        tier=turn_info.get('tier'),
+        latency_ms=round((time.monotonic() - started) * 1000, 1),
+        retries=turn_info.get('retries'),
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost_usd=estimate_cost(model_prices, turn_info.get('model'), prompt_tokens, completion_tokens)
+    )
+
+def get_call_transcript(call_sid):
+    """Full stored transcript for a call, oldest turn first"""
+    if transcript_store is None:
+        return []
+    transcript_store.flush(timeout=2)
+    return transcript_store.get_transcript(call_sid)
+
+def get_usage_report(call_sid=None, limit=10):
+    """Token/cost/latency totals for one call, or a summary of the worst calls and turns"""
+    if transcript_store is None:
         return None
+    transcript_store.flush(timeout=2)
+    if call_sid:
+        usage = transcript_store.get_call_usage(call_sid)
+        if usage is not None:
+            usage['turns_detail'] = transcript_store.get_transcript(call_sid)
+        return usage
+    return transcript_store.usage_summary(limit=limit)
+
+# ===== USAGE REPORTS =====
+@app.route("/usage", methods=['GET'])
+@app.route("/usage/<call_sid>", methods=['GET'])
+def usage_report(call_sid=None):
+    """Token usage, cost, latency and retries per call (JSON)"""
+    if transcript_store is None:
+        return {"error": "Transcripts are disabled (TRANSCRIPTS_ENABLED=false)"}, 404
+    report = get_usage_report(call_sid, limit=request.args.get('limit', 10, type=int))
+    if report is None:
+        return {"error": f"No turns recorded for call {call_sid}"}, 404
+    return report
+
+# ===== CALL STATUS CALLBACKS =====
+@app.route("/call_status", methods=['POST'])
+@route_metrics['call_status'].instrument
+def call_status():
+    """Twilio statusCallback: buffer the event and answer at once"""
+    if call_event_store is not None:
+        call_event_store.record(request.form)
+    return '', 204
+
+@app.route("/call_status/stats", methods=['GET'])
+def call_status_stats():
+    """Outcomes, answer rate and talk time of outbound calls (JSON)"""
+    if call_event_store is None:
+        return {"error": "Call events are disabled (CALL_EVENTS_ENABLED=false)"}, 404
+    return call_event_store.stats(since=request.args.get('since', type=float))
+
+def build_answer_response(answer, user_input):
+    """Speak the AI answer and offer further help, or fall back to an error response"""
+    if not answer:
+        logger.error("Failed to get AI response")
+        return create_error_response(ANSWER_UNAVAILABLE_MESSAGE)
     
-    system_prompt = (
-        "You are a helpful AI assistant for Buildn 123, a residential real estate project in Dallas, "
-        "offering modern 2- and 3-bedroom apartments starting at $180,000. "
-        "Key details: Located in Dallas, modern amenities, competitive pricing, quality construction. "
-        "Answer user questions clearly, briefly (under 100 words), and professionally. "
-        "If asked about specific details you don't know, suggest they contact our sales team. "
-        "Always maintain a friendly, helpful tone."
+    logger.debug("Successful AI response generated for input: '%s'", user_input)
+    return twiml_response(render_answer_twiml(answer))
+
+def append_followup(resp):
+    """Ask if the caller needs more help, ending the call politely if they stay silent"""
+    gather = Gather(
+        input='speech',
+        timeout=5,
+        language='en-US',
+        action='/process_followup'
     )
+    say(gather, FOLLOWUP_QUESTION)
+    resp.append(gather)
     
+    # If no response, end call politely
+    say(resp, GOODBYE_MESSAGE)
+    resp.hangup()
+
+def create_hold_response(message, attempt):
+    """Keep the caller on hold and poll again for a deferred answer"""
+    audio_url = audio_prompts.url_for(message)
+    if audio_url:
+        return twiml_response(HOLD_AUDIO_TEMPLATE.render(audio_url=audio_url, attempt=attempt))
+    if message:
+        return twiml_response(HOLD_TEMPLATE.render(message=message, attempt=attempt))
+    return twiml_response(POLL_TEMPLATE.render(attempt=attempt))
+
+# ===== DEFERRED ANSWER POLLING =====
+@app.route("/await_answer", methods=['GET', 'POST'])
+def await_answer():
     try:
-        logger.info(f"Sending request to OpenAI (attempt {retry_count + 1}): '{user_input}'")
+        call_sid = request.values.get('CallSid')
+        try:
+            attempt = int(request.values.get('attempt', 1))
+        except (TypeError, ValueError):
+            attempt = 1
         
-        # Updated API call for OpenAI v1.0+
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ],
-            max_tokens=MAX_TOKENS,
-            temperature=TEMPERATURE,
-            timeout=30
+        state, answer = deferred_answers.result(call_sid)
+        
+        if state == DEFERRED_READY:
+            logger.info("Deferred AI response ready for call %s after %s poll(s)", call_sid, attempt)
+            return build_answer_response(answer, '(deferred)')
+        
+        if state == DEFERRED_MISSING:
+            logger.warning("No deferred answer job for call %s", call_sid)
+            return create_error_response(LOST_QUESTION_MESSAGE)
+        
+        if attempt >= config.DEFERRED_MAX_POLLS:
+            logger.error("Deferred AI response for call %s timed out after %s polls", call_sid, attempt)
+            deferred_answers.discard(call_sid)
+            return build_answer_response(None, '(deferred)')
+        
+        # Reassure the caller every few polls, otherwise just wait quietly
+        message = STILL_CHECKING_MESSAGE if attempt % 4 == 0 else None
+        return create_hold_response(message, attempt=attempt + 1)
+        
+    except Exception as e:
+        logger.error("Error in await_answer: %s", e, exc_info=True)
+        return create_error_response()
+
+# ===== PARTIAL TRANSCRIPTS =====
+@app.route("/partial_result", methods=['GET', 'POST'])
+def partial_result():
+    """Record Twilio's partial transcript; kept cheap because it fires many times per utterance"""
+    call_sid = request.values.get('CallSid')
+    if call_sid:
+        speculative_answers.record_partial(
+            call_sid,
+            request.values.get('StableSpeechResult', ''),
+            request.values.get('UnstableSpeechResult', '')
+        )
+    return '', 204
+
+# ===== STREAMED ANSWERS =====
+def start_streamed_answer(call_sid, user_input, confidence=None):
+    """Start a streamed completion and speak its first sentence"""
+    first_turn = not session_store.history(call_sid)
+    started = time.monotonic()
+    
+    turn_info = {}
+    
+    def on_complete(full_answer):
+        record_transcript_turn(call_sid, user_input, full_answer, confidence, started, turn_info)
+        if turn_info.get('circuit_open'):
+            # A canned reply, not an answer to remember
+            return
+        session_store.add_exchange(call_sid, user_input, full_answer)
+        if first_turn:
+            answer_cache.set(user_input, full_answer)
+    
+    streaming_answers.start(
+        call_sid,
+        stream_ai_response(user_input, call_sid=call_sid, turn_info=turn_info),
+        on_complete=on_complete
+    )
+    sentences, finished = streaming_answers.next_sentences(
+        call_sid, timeout=config.STREAM_FIRST_SENTENCE_TIMEOUT
+    )
+    logger.debug("Streamed first sentence for call %s: %s", call_sid, sentences)
+    return build_streamed_response(sentences, finished)
+
+def build_streamed_response(sentences, finished):
+    """Speak the buffered sentences and chain to /continue_answer until the stream ends"""
+    if not sentences and finished:
+        return build_answer_response(None, '(streamed)')
+    
+    resp = VoiceResponse()
+    if sentences:
+        resp.say(' '.join(sentences), language='en-US', voice=SAY_VOICE)
+    else:
+        resp.pause(length=1)
+    
+    if finished:
+        append_followup(resp)
+    else:
+        resp.redirect('/continue_answer')
+    return Response(str(resp), mimetype='text/xml')
+
+@app.route("/continue_answer", methods=['GET', 'POST'])
+def continue_answer():
+    try:
+        call_sid = request.values.get('CallSid')
+        sentences, finished = streaming_answers.next_sentences(
+            call_sid, timeout=config.STREAM_CONTINUE_TIMEOUT
         )
         
-        answer = response.choices[0].message.content.strip()
-        logger.info(f"OpenAI response received: '{answer[:100]}...'")
+        if sentences is None:
+            # Stream already delivered or expired: move the conversation on
+            logger.warning("No streamed answer for call %s", call_sid)
+            resp = VoiceResponse()
+            append_followup(resp)
+            return Response(str(resp), mimetype='text/xml')
         
-        # Validate response
-        if not answer or len(answer.strip()) == 0:
-            logger.warning("Empty response from OpenAI")
-            return None
-            
-        return answer
+        return build_streamed_response(sentences, finished)
         
     except Exception as e:
-        error_str = str(e).lower()
+        logger.error("Error in continue_answer: %s", e, exc_info=True)
+        return create_error_response()
+
+def build_messages(user_input, history=()):
+    """System prompt with the relevant project facts, the call's recent history, then the new question"""
+    return [
+        {"role": "system", "content": build_system_prompt(user_input, history)},
+        *history,
+        {"role": "user", "content": user_input}
+    ]
+
+def build_system_prompt(user_input, history=()):
+    """SYSTEM_PROMPT plus the knowledge snippets most relevant to this turn"""
+    # The previous question helps with follow-ups like "and the three bedroom?"
+    previous = [turn['content'] for turn in history if turn['role'] == 'user'][-1:]
+    facts = knowledge_base.context(
+        ' '.join(previous + [user_input]),
+        k=config.KNOWLEDGE_TOP_K,
+        token_budget=config.KNOWLEDGE_TOKEN_BUDGET
+    )
+    if not facts:
+        return SYSTEM_PROMPT
+    return f"{SYSTEM_PROMPT}\n\nProject facts:\n{facts}"
+
+def stream_ai_response(user_input, call_sid=None, turn_info=None):
+    """
+    Yield answer text deltas from a streamed OpenAI completion.
+
+    If turn_info is a dict it is filled with the model, retries and token usage.
+    """
+    if turn_info is None:
+        turn_info = {}
+    logger.debug("Sending streaming request to OpenAI: '%s'", user_input)
+    history = session_store.history(call_sid)
+    tier = model_router.route(user_input, has_history=bool(history))
+    turn_info['model'] = tier.model
+    turn_info['tier'] = tier.name
+    messages = build_messages(user_input, history)
+    started = time.monotonic()
+    try:
+        stream = openai_policy.call(
+            lambda timeout: get_openai_client().chat.completions.create(
+                model=tier.model,
+                messages=messages,
+                max_tokens=tier.max_tokens,
+                temperature=TEMPERATURE,
+                timeout=timeout,
+                stream=True,
+                stream_options={"include_usage": True}
+            ),
+            deadline=turn_deadline(tier),
+            info=turn_info
+        )
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit open, answering with canned response")
+        turn_info['circuit_open'] = True
+        record_openai_call(tier.name, time.monotonic() - started, 'circuit_open', turn_info.get('retries', 0))
+        yield CIRCUIT_OPEN_MESSAGE
+        return
+    except Exception:
+        record_openai_call(tier.name, time.monotonic() - started, 'error', turn_info.get('retries', 0))
+        raise
+    record_openai_call(tier.name, time.monotonic() - started, 'ok', turn_info.get('retries', 0))
+    try:
+        for chunk in stream:
+            # The final chunk carries token usage and no choices
+            if getattr(chunk, 'usage', None) is not None:
+                record_usage(turn_info, chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        # The policy saw the stream open; a connection that dies mid-answer is an upstream failure too
+        if classify_error(e) != FATAL:
+            openai_breaker.record_failure()
+        raise
+
+def get_ai_response(user_input, call_sid=None, turn_info=None):
+    """
+    Get response from OpenAI through the retry/circuit-breaker policy.
+
+    If turn_info is a dict it is filled with the model used, the number of
+    retries, token usage and whether the answer came from the cache.
+    """
+    if turn_info is None:
+        turn_info = {}
+    turn_info['retries'] = 0
+    
+    # Answers that depend on earlier turns are neither cached nor served from cache
+    history = session_store.history(call_sid)
+    
+    if not history:
+        cached_answer = answer_cache.get(user_input)
+        if cached_answer:
+            logger.debug("Answer cache hit for input: '%s'", user_input)
+            turn_info['cached'] = True
+            return cached_answer
+    
+    tier = model_router.route(user_input, has_history=bool(history))
+    turn_info['model'] = tier.model
+    turn_info['tier'] = tier.name
+    outcome = 'error'
+    started = time.monotonic()
+    
+    try:
+        logger.debug("Sending request to OpenAI (%s: %s): '%s'", tier.name, tier.model, user_input)
         
-        # Handle rate limiting
-        if "rate_limit" in error_str or "rate limit" in error_str:
-            logger.error(f"OpenAI rate limit exceeded: {str(e)}")
-            return "I'm currently experiencing high demand. Please try again in a moment."
+        # Updated API call for OpenAI v1.0+
+        response = openai_flights.do(
+            flight_key(tier, user_input, history),
+            lambda: openai_policy.call(
+                lambda timeout: get_openai_client().chat.completions.create(
+                    model=tier.model,
+                    messages=build_messages(user_input, history),
+                    max_tokens=tier.max_tokens,
+                    temperature=TEMPERATURE,
+                    timeout=timeout
+                ),
+                deadline=turn_deadline(tier),
+                info=turn_info
+            ),
+            timeout=turn_deadline(tier),
+            info=turn_info
+        )
+        # Latency and tokens are accounted once, by the caller that made the call
+        if not turn_info.get('coalesced'):
+            model_router.record(tier.name, (time.monotonic() - started) * 1000)
+            record_usage(turn_info, getattr(response, 'usage', None))
         
-        # Handle authentication errors
-        elif "authentication" in error_str or "unauthorized" in error_str or "api_key" in error_str:
-            logger.error(f"OpenAI authentication error: {str(e)}")
-            return None
+        answer = (response.choices[0].message.content or '').strip()
+        logger.debug("OpenAI response received: '%.100s'", answer)
         
-        # Handle timeout errors
-        elif "timeout" in error_str:
-            logger.error(f"OpenAI timeout error: {str(e)}")
-            if retry_count < MAX_RETRIES - 1:
-                logger.info(f"Retrying OpenAI request after timeout (attempt {retry_count + 2})")
-                return get_ai_response(user_input, retry_count + 1)
+        # Validate response
+        if not answer:
+            logger.warning("Empty response from OpenAI")
+            outcome = 'empty'
             return None
         
-        # Handle other API errors with retry
+        outcome = 'ok'
+        if not history:
+            answer_cache.set(user_input, answer)
+        return answer
+        
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit open, answering with canned response")
+        turn_info['circuit_open'] = True
+        outcome = 'circuit_open'
+        return CIRCUIT_OPEN_MESSAGE
+    
+    except openai.RateLimitError as e:
+        logger.error("OpenAI rate limit exceeded: %s", e)
+        outcome = 'rate_limited'
+        return HIGH_DEMAND_MESSAGE
+    
+    except openai.AuthenticationError as e:
+        logger.error("OpenAI authentication error: %s", e)
+        return None
+    
+    except DeadlineExceeded as e:
+        logger.error("OpenAI turn deadline exceeded: %s", e)
+        outcome = 'deadline'
+        return None
+    
+    except Exception as e:
+        logger.error("OpenAI API error: %s: %s", type(e).__name__, e)
+        return None
+    
+    finally:
+        if turn_info.get('coalesced'):
+            openai_coalesced.inc()
         else:
-            logger.error(f"OpenAI API error: {str(e)}")
-            if retry_count < MAX_RETRIES - 1:
-                logger.info(f"Retrying OpenAI request (attempt {retry_count + 2})")
-                return get_ai_response(user_input, retry_count + 1)
-            return None
+            record_openai_call(tier.name, time.monotonic() - started, outcome, turn_info.get('retries', 0))
 
 # ===== FOLLOW-UP HANDLER =====
 @app.route("/process_followup", methods=['GET', 'POST'])
+@route_metrics['process_followup'].instrument
 def process_followup():
     try:
         log_request_info("PROCESS_FOLLOWUP")
         
         user_input = request.values.get('SpeechResult', '').strip().lower()
-        resp = VoiceResponse()
         
         # Check for positive responses
-        positive_responses = ['yes', 'yeah', 'yep', 'sure', 'okay', 'ok']
-        if any(word in user_input for word in positive_responses):
-            resp.redirect('/outbound')  # Start over
-        else:
-            resp.say('Thank you for your interest in Buildn 123. Have a great day!', language='en-US', voice='Polly.Joanna')
-            resp.hangup()
+        if wants_more_help(user_input):
+            return twiml_response(static_twiml.get('restart'))  # Start over
         
-        return Response(str(resp), mimetype='text/xml')
+        # Call is ending: its conversation history is no longer needed
+        session_store.end(request.values.get('CallSid'))
+        return twiml_response(static_twiml.get('goodbye'))
         
     except Exception as e:
-        logger.error(f"Error in process_followup: {str(e)}", exc_info=True)
-        return create_error_response("Thank you for calling Buildn 123. Goodbye!")
+        logger.error("Error in process_followup: %s", e, exc_info=True)
+        route_metrics['process_followup'].error()
+        return create_error_response(CALL_ENDED_MESSAGE)
 
-# ===== HEALTH CHECK ENDPOINT =====
-@app.route("/health", methods=['GET'])
-def health_check():
-    """Health check endpoint for monitoring"""
-    try:
-        # Test OpenAI API connectivity
-        test_response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": "Test"}],
-            max_tokens=5
-        )
-        api_status = "healthy"
-    except Exception as e:
-        logger.error(f"Health check - OpenAI API issue: {str(e)}")
-        api_status = "unhealthy"
-    
+def wants_more_help(user_input):
+    """True if the caller's follow-up reply is a yes (whole words, so "book" is not "ok")"""
+    return classify_yes_no(user_input) == 'yes'
+
+# ===== PROMPT AUDIO =====
+@app.route("/audio/<path:filename>", methods=['GET', 'HEAD'])
+def audio_file(filename):
+    """Serve a prompt/answer recording: ETag and Range handled by send_file, sendfile(2) via wsgi.file_wrapper"""
+    path = audio_prompts.resolve(filename)
+    if path is None:
+        return Response('Not found', status=404, mimetype='text/plain')
+    # File names are content hashes, so a URL's audio never changes
+    return send_file(path, mimetype=audio_content_type(filename), conditional=True, etag=True,
+                     max_age=AUDIO_MAX_AGE)
+
+# ===== METRICS ENDPOINT =====
+@app.route("/metrics", methods=['GET'])
+def metrics():
+    """Prometheus text exposition of route, OpenAI and reprompt metrics"""
+    return Response(metrics_registry.render(), mimetype=METRICS_CONTENT_TYPE)
+
+# ===== HEALTH CHECK ENDPOINTS =====
+def probe_openai():
+    """Cheapest real check of the OpenAI dependency: a one-token completion on a small model"""
+    get_openai_client().chat.completions.create(
+        model=config.HEALTH_PROBE_MODEL,
+        messages=[{"role": "user", "content": "ping"}],
+        max_tokens=1,
+        timeout=config.HEALTH_PROBE_TIMEOUT
+    )
+
+# Readiness is probed in the background and served from cache
+health_prober = ReadinessProber(
+    check_fn=probe_openai,
+    interval=config.HEALTH_PROBE_INTERVAL,
+    stale_after=config.HEALTH_PROBE_STALE_AFTER,
+    breaker=openai_breaker
+)
+
+STARTED_AT = time.time()
+
+def liveness():
+    """Process-local liveness: no I/O"""
+    return {
+        "status": "alive",
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - STARTED_AT, 1),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.route("/health/live", methods=['GET'])
+def health_live():
+    """Liveness probe: answers instantly from process state"""
+    return liveness()
+
+@app.route("/health/ready", methods=['GET'])
+def health_ready():
+    """Readiness probe: cached OpenAI check plus circuit breaker state (503 when not ready)"""
+    health_prober.ensure_started()
+    readiness = health_prober.snapshot()
+    return readiness, 200 if readiness['ready'] else 503
+
+def health_summary():
+    """Health summary for monitoring; never calls OpenAI itself"""
+    health_prober.ensure_started()
+    readiness = health_prober.snapshot()
     return {
         "status": "running",
         "timestamp": datetime.now().isoformat(),
-        "openai_api": api_status
+        "ready": readiness['ready'],
+        "openai_api": readiness['openai_api'],
+        "readiness": readiness,
+        "answer_cache": answer_cache.stats(),
+        "openai_single_flight": openai_flights.stats(),
+        "openai_circuit": openai_breaker.snapshot(),
+        "model_tiers": model_router.stats(),
+        "audio_prompts": audio_prompts.stats()
     }
 
+@app.route("/health", methods=['GET'])
+def health_check():
+    """Health check endpoint for monitoring"""
+    return health_summary()
+
+# ===== PRECOMPILED TWIML =====
+def say(verb, text):
+    """Play the pre-rendered recording of text if there is one, else have Twilio speak it"""
+    audio_url = audio_prompts.url_for(text)
+    if audio_url:
+        verb.play(audio_url)
+    else:
+        verb.say(text, language='en-US', voice=SAY_VOICE)
+
+def build_outbound_twiml():
+    """Welcome prompt that gathers the caller's question"""
+    resp = VoiceResponse()
+    gather = Gather(
+        input='speech',
+        timeout=SPEECH_TIMEOUT,
+        language='en-US',
+        action='/process_speech',
+        partial_result_callback='/partial_result'  # Optional: for real-time feedback
+    )
+    
+    say(gather, WELCOME_MESSAGE)
+    resp.append(gather)
+    
+    # If no speech detected, try again with a different message
+    say(resp, NO_SPEECH_MESSAGE)
+    resp.redirect('/outbound')
+    return resp
+
+def build_reprompt_twiml(message):
+    """Ask the caller to repeat themselves and restart the conversation"""
+    resp = VoiceResponse()
+    say(resp, message)
+    resp.redirect('/outbound')
+    return resp
+
+def build_goodbye_twiml():
+    """Thank the caller and hang up"""
+    resp = VoiceResponse()
+    say(resp, GOODBYE_MESSAGE)
+    resp.hangup()
+    return resp
+
+def build_restart_twiml():
+    """Send the caller back to the welcome prompt"""
+    resp = VoiceResponse()
+    resp.redirect('/outbound')
+    return resp
+
+def build_error_twiml(message=None, audio_url=None):
+    """Speak (or play) an error message and hang up"""
+    resp = VoiceResponse()
+    if audio_url is not None:
+        resp.play(audio_url)
+    else:
+        say(resp, message)
+    resp.hangup()
+    return resp
+
+def build_answer_twiml(answer=None, audio_url=None):
+    """Speak (or play) the AI answer followed by the follow-up prompt"""
+    resp = VoiceResponse()
+    if audio_url is not None:
+        resp.play(audio_url)
+    else:
+        resp.say(answer, language='en-US', voice=SAY_VOICE)
+    append_followup(resp)
+    return resp
+
+def build_hold_twiml(attempt, message=None, audio_url=None):
+    """Optional hold phrase, a pause, then poll for the deferred answer"""
+    resp = VoiceResponse()
+    if audio_url is not None:
+        resp.play(audio_url)
+    elif message is not None:
+        resp.say(message, language='en-US', voice=SAY_VOICE)
+    resp.pause(length=config.DEFERRED_POLL_PAUSE)
+    resp.redirect(f'/await_answer?attempt={attempt}')
+    return resp
+
+# Static documents rendered once, served as bytes
+static_twiml = TwimlRegistry()
+static_twiml.register('outbound', build_outbound_twiml)
+static_twiml.register('no_input', lambda: build_reprompt_twiml(NO_INPUT_MESSAGE))
+static_twiml.register('low_confidence', lambda: build_reprompt_twiml(LOW_CONFIDENCE_MESSAGE))
+static_twiml.register('goodbye', build_goodbye_twiml)
+static_twiml.register('restart', build_restart_twiml)
+static_twiml.render_all()
+
+# Dynamic documents: only the text is escaped and inserted per request
+ERROR_TEMPLATE = TwimlTemplate(build_error_twiml, 'message')
+ANSWER_TEMPLATE = TwimlTemplate(build_answer_twiml, 'answer')
+HOLD_TEMPLATE = TwimlTemplate(build_hold_twiml, 'message', 'attempt')
+POLL_TEMPLATE = TwimlTemplate(build_hold_twiml, 'attempt')
+ERROR_AUDIO_TEMPLATE = TwimlTemplate(build_error_twiml, 'audio_url')
+ANSWER_AUDIO_TEMPLATE = TwimlTemplate(build_answer_twiml, 'audio_url')
+HOLD_AUDIO_TEMPLATE = TwimlTemplate(build_hold_twiml, 'audio_url', 'attempt')
+TWIML_TEMPLATES = (ERROR_TEMPLATE, ANSWER_TEMPLATE, HOLD_TEMPLATE, POLL_TEMPLATE,
+                   ERROR_AUDIO_TEMPLATE, ANSWER_AUDIO_TEMPLATE, HOLD_AUDIO_TEMPLATE)
+
+def refresh_twiml():
+    """Re-render the static documents and templates, e.g. after prompt audio was rendered"""
+    static_twiml.render_all()
+    for template in TWIML_TEMPLATES:
+        template.refresh()
+
+def render_audio_prompts(force=False):
+    """Synthesize the fixed prompts and fact-table answers to files and switch their TwiML to <Play>"""
+    rendered, failed = audio_prompts.render(STATIC_PROMPTS + tuple(intent_matcher.answers()), force=force)
+    refresh_twiml()
+    return rendered, failed
+
+def warm_up():
+    """Prepare a (freshly forked) worker before it accepts traffic"""
+    global client
+    setup_logging()
+    # HTTP connection pools must not be shared across fork, so each worker builds its own
+    client = create_openai_client()
+    if config.AUDIO_RENDER_ON_STARTUP and audio_prompts.synthesizer is not None:
+        render_audio_prompts()
+    else:
+        static_twiml.render_all()
+    health_prober.ensure_started()
+    logger.info(f"Worker {os.getpid()} warmed up")
+
 # ===== ERROR HANDLERS =====
 @app.errorhandler(404)
 def not_found(error):
-    logger.warning(f"404 error: {request.url}")
-    return create_error_response("I'm sorry, there was a routing error. Please try again.")
+    logger.warning("404 error: %s", request.url)
+    return create_error_response(ROUTING_ERROR_MESSAGE)
 
 @app.errorhandler(500)
 def internal_error(error):
-    logger.error(f"500 error: {str(error)}", exc_info=True)
+    logger.error("500 error: %s", error, exc_info=True)
     return create_error_response()
 
 # Remove the direct execution - let main.py handle this
 if __name__ == "__main__":
+    setup_logging()
     logger.info("Starting Voice Caller Application")
-    logger.info(f"OpenAI API Key configured: {'Yes' if client.api_key else 'No'}")
+    logger.info(f"OpenAI API Key configured: {'Yes' if config.OPENAI_API_KEY else 'No'}")
     
     # For direct execution (fallback)
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
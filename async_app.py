@@ -0,0 +1,362 @@
+"""
+Asyncio serving mode for the Twilio webhooks.
+
+Serves the same routes as app.py with aiohttp and the AsyncOpenAI client,
+so a call waiting on the model costs a coroutine instead of a worker
+thread. TwiML documents, the answer cache, sessions and transcripts are
+shared with the Flask app. Deferred, streamed and speculative answers are
+Flask-only: here every answer is given inline, and the server warns at
+startup if those modes are turned on.
+"""
+import asyncio
+import logging
+import os
+import time
+
+import openai
+from aiohttp import web
+from openai import AsyncOpenAI
+
+from config.settings import config
+from services.call_policy import CircuitOpenError, DeadlineExceeded
+from services.single_flight import AsyncSingleFlight
+from services.usage import record_usage
+from services.log_pipeline import RequestLog
+from services.metrics import (
+    registry as metrics_registry, route_metrics, reprompt_reasons, record_openai_call, openai_coalesced,
+    CONTENT_TYPE
+)
+from app import (
+    static_twiml, render_error_twiml, render_answer_twiml,
+    DEFAULT_ERROR_MESSAGE, ANSWER_UNAVAILABLE_MESSAGE,
+    HIGH_DEMAND_MESSAGE, CIRCUIT_OPEN_MESSAGE, CALL_ENDED_MESSAGE, ROUTING_ERROR_MESSAGE, TEMPERATURE,
+    openai_policy, model_router, answer_cache, session_store, build_messages, record_transcript_turn, wants_more_help,
+    intent_matcher, answer_intent_turn, transcript_store, get_usage_report, LOGGED_FIELDS,
+    flight_key, turn_deadline,
+    call_event_store, UNLOGGED_PATHS,
+    health_prober, health_summary, liveness,
+    audio_prompts, audio_content_type, AUDIO_MAX_AGE, setup_logging
+)
+
+logger = logging.getLogger('app.async')
+
+OPENAI_CLIENT = web.AppKey('openai_client', object)
+
+# Identical questions asked at the same time share one OpenAI call (per event loop)
+openai_flights = AsyncSingleFlight(enabled=config.SINGLE_FLIGHT_ENABLED)
+
+# Flask-only answer modes, ignored by these routes
+UNSUPPORTED_FLAGS = {
+    'DEFERRED_ANSWERS_ENABLED': "answers are given inline; /await_answer is not served",
+    'STREAMING_ANSWERS_ENABLED': "answers are given whole; /continue_answer is not served",
+    'SPECULATIVE_ANSWERS_ENABLED': "partial transcripts are accepted but not answered early",
+}
+
+
+def unsupported_flags():
+    """(flag, reason) for each enabled mode the asyncio server ignores"""
+    return [(flag, reason) for flag, reason in UNSUPPORTED_FLAGS.items() if getattr(config, flag)]
+
+
+def warn_unsupported_flags():
+    for flag, reason in unsupported_flags():
+        logger.warning("%s is ignored in async mode: %s", flag, reason)
+
+
+def twiml(body):
+    """Wrap rendered TwiML bytes in an aiohttp response"""
+    return web.Response(body=body, content_type='text/xml')
+
+
+def error_twiml(message=DEFAULT_ERROR_MESSAGE):
+    return twiml(render_error_twiml(message))
+
+
+async def request_values(request):
+    """Query string and form fields merged, like Flask's request.values (post() is parsed once)"""
+    values = dict(request.query)
+    if request.body_exists:
+        values.update(await request.post())
+    return values
+
+
+async def get_ai_response_async(openai_client, user_input, call_sid=None, turn_info=None):
+    """Async counterpart of app.get_ai_response"""
+    if turn_info is None:
+        turn_info = {}
+    history = session_store.history(call_sid)
+
+    if not history:
+        cached_answer = answer_cache.get(user_input)
+        if cached_answer:
+            turn_info.update(cached=True, retries=0)
+            return cached_answer
+
+    tier = model_router.route(user_input, has_history=bool(history))
+    turn_info['model'] = tier.model
+    turn_info['tier'] = tier.name
+    outcome = 'error'
+    started = time.monotonic()
+
+    try:
+        logger.debug("Sending async request to OpenAI (%s: %s): '%s'", tier.name, tier.model, user_input)
+        response = await openai_flights.do(
+            flight_key(tier, user_input, history),
+            lambda: openai_policy.call_async(
+                lambda timeout: openai_client.chat.completions.create(
+                    model=tier.model,
+                    messages=build_messages(user_input, history),
+                    max_tokens=tier.max_tokens,
+                    temperature=TEMPERATURE,
+                    timeout=timeout
+                ),
+                deadline=turn_deadline(tier),
+                info=turn_info
+            ),
+            timeout=turn_deadline(tier),
+            info=turn_info
+        )
+        if not turn_info.get('coalesced'):
+            model_router.record(tier.name, (time.monotonic() - started) * 1000)
+            record_usage(turn_info, getattr(response, 'usage', None))
+        answer = (response.choices[0].message.content or '').strip()
+        if not answer:
+            logger.warning("Empty response from OpenAI")
+            outcome = 'empty'
+            return None
+        outcome = 'ok'
+        if not history:
+            answer_cache.set(user_input, answer)
+        return answer
+
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit open, answering with canned response")
+        turn_info['circuit_open'] = True
+        outcome = 'circuit_open'
+        return CIRCUIT_OPEN_MESSAGE
+    except openai.RateLimitError as e:
+        logger.error("OpenAI rate limit exceeded: %s", e)
+        outcome = 'rate_limited'
+        return HIGH_DEMAND_MESSAGE
+    except DeadlineExceeded as e:
+        logger.error("OpenAI turn deadline exceeded: %s", e)
+        outcome = 'deadline'
+        return None
+    except Exception as e:
+        logger.error("OpenAI API error: %s: %s", type(e).__name__, e)
+        return None
+    finally:
+        if turn_info.get('coalesced'):
+            openai_coalesced.inc()
+        else:
+            record_openai_call(tier.name, time.monotonic() - started, outcome, turn_info.get('retries', 0))
+
+
+# ===== ROUTES =====
+@route_metrics['outbound'].instrument
+async def outbound(request):
+    return twiml(static_twiml.get('outbound'))
+
+
+@route_metrics['process_speech'].instrument
+async def process_speech(request):
+    try:
+        values = await request_values(request)
+        user_input = values.get('SpeechResult', '').strip()
+        confidence = values.get('Confidence', 0)
+        call_sid = values.get('CallSid')
+        logger.debug("Speech Result: '%s' (Confidence: %s)", user_input, confidence)
+
+        if not user_input:
+            logger.warning("No speech input received")
+            reprompt_reasons['no_input'].inc()
+            return twiml(static_twiml.get('no_input'))
+
+        try:
+            if float(confidence) < 0.5:
+                logger.warning("Low confidence speech recognition: %s", confidence)
+                reprompt_reasons['low_confidence'].inc()
+                return twiml(static_twiml.get('low_confidence'))
+        except (ValueError, TypeError):
+            pass
+
+        intent = intent_matcher.match(user_input)
+        if intent is not None:
+            answer_intent_turn(call_sid, user_input, intent, confidence)
+            return twiml(render_answer_twiml(intent.answer))
+
+        turn_info = {}
+        started = time.monotonic()
+        answer = await get_ai_response_async(request.app[OPENAI_CLIENT], user_input, call_sid, turn_info)
+        if answer:
+            session_store.add_exchange(call_sid, user_input, answer)
+        record_transcript_turn(call_sid, user_input, answer, confidence, started, turn_info)
+
+        if not answer:
+            logger.error("Failed to get AI response")
+            return error_twiml(ANSWER_UNAVAILABLE_MESSAGE)
+        return twiml(render_answer_twiml(answer))
+
+    except Exception as e:
+        logger.error("Error in async process_speech: %s", e, exc_info=True)
+        route_metrics['process_speech'].error()
+        return error_twiml()
+
+
+@route_metrics['process_followup'].instrument
+async def process_followup(request):
+    try:
+        values = await request_values(request)
+        user_input = values.get('SpeechResult', '').strip().lower()
+        if wants_more_help(user_input):
+            return twiml(static_twiml.get('restart'))
+        session_store.end(values.get('CallSid'))
+        return twiml(static_twiml.get('goodbye'))
+    except Exception as e:
+        logger.error("Error in async process_followup: %s", e, exc_info=True)
+        route_metrics['process_followup'].error()
+        return error_twiml(CALL_ENDED_MESSAGE)
+
+
+async def partial_result(request):
+    """Accept partial transcripts cheaply so they never hit the 404 handler (no speculative answers here)"""
+    return web.Response(status=204)
+
+
+async def audio_file(request):
+    """Prompt/answer recordings; FileResponse handles ETag and Range and uses sendfile(2)"""
+    path = audio_prompts.resolve(request.match_info['filename'])
+    if path is None:
+        return web.Response(status=404, text='Not found')
+    return web.FileResponse(path, headers={
+        'Content-Type': audio_content_type(path),
+        'Cache-Control': f'public, max-age={AUDIO_MAX_AGE}',
+    })
+
+
+async def health_check(request):
+    return web.json_response(dict(health_summary(), openai_single_flight=openai_flights.stats()))
+
+
+async def health_live(request):
+    return web.json_response(liveness())
+
+
+async def health_ready(request):
+    health_prober.ensure_started()
+    readiness = health_prober.snapshot()
+    return web.json_response(readiness, status=200 if readiness['ready'] else 503)
+
+
+async def metrics(request):
+    """Prometheus text exposition of route, OpenAI and reprompt metrics"""
+    return web.Response(body=metrics_registry.render().encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+
+
+async def usage_report(request):
+    """Token usage, cost, latency and retries per call (JSON)"""
+    if transcript_store is None:
+        return web.json_response({"error": "Transcripts are disabled (TRANSCRIPTS_ENABLED=false)"}, status=404)
+    call_sid = request.match_info.get('call_sid')
+    try:
+        limit = int(request.query.get('limit', 10))
+    except ValueError:
+        limit = 10
+    # SQLite reads are blocking; keep them off the event loop
+    report = await asyncio.to_thread(get_usage_report, call_sid, limit)
+    if report is None:
+        return web.json_response({"error": f"No turns recorded for call {call_sid}"}, status=404)
+    return web.json_response(report)
+
+
+@route_metrics['call_status'].instrument
+async def call_status(request):
+    """Twilio statusCallback: buffer the event and answer at once"""
+    if call_event_store is not None:
+        call_event_store.record(await request.post())
+    return web.Response(status=204)
+
+
+async def call_status_stats(request):
+    """Outcomes, answer rate and talk time of outbound calls (JSON)"""
+    if call_event_store is None:
+        return web.json_response({"error": "Call events are disabled (CALL_EVENTS_ENABLED=false)"}, status=404)
+    try:
+        since = float(request.query['since']) if 'since' in request.query else None
+    except ValueError:
+        since = None
+    stats = await asyncio.to_thread(call_event_store.stats, since)
+    return web.json_response(stats)
+
+
+@web.middleware
+async def request_log_middleware(request, handler):
+    """One structured log line per request, with the CallSid bound to every record it logs"""
+    if request.path in UNLOGGED_PATHS:
+        return await handler(request)
+    values = await request_values(request)
+    request_log = RequestLog(values.get('CallSid'))
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        fields = {name: values[key] for key, name in LOGGED_FIELDS.items() if key in values}
+        request_log.finish(logger, request.path, request.method, status,
+                           remote_addr=request.remote, **fields)
+
+
+@web.middleware
+async def twiml_error_middleware(request, handler):
+    """Answer unknown routes and unhandled errors with TwiML, like the Flask error handlers"""
+    try:
+        return await handler(request)
+    except web.HTTPNotFound:
+        logger.warning("404 error: %s", request.url)
+        return error_twiml(ROUTING_ERROR_MESSAGE)
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        logger.error("500 error: %s", e, exc_info=True)
+        return error_twiml()
+
+
+def create_async_app(openai_client=None):
+    """Build the aiohttp application; pass openai_client to inject a fake in tests/benchmarks"""
+    aio_app = web.Application(middlewares=[request_log_middleware, twiml_error_middleware])
+    aio_app[OPENAI_CLIENT] = openai_client or AsyncOpenAI(
+        api_key=os.getenv('OPENAI_API_KEY', config.OPENAI_API_KEY),
+        base_url=config.OPENAI_BASE_URL,
+        # CallPolicy owns retries; SDK retries would multiply attempts past the turn deadline
+        max_retries=0
+    )
+    aio_app.router.add_route('*', '/outbound', outbound)
+    aio_app.router.add_route('*', '/process_speech', process_speech)
+    aio_app.router.add_route('*', '/process_followup', process_followup)
+    aio_app.router.add_route('*', '/partial_result', partial_result)
+    aio_app.router.add_get('/health', health_check)
+    aio_app.router.add_get('/health/live', health_live)
+    aio_app.router.add_get('/health/ready', health_ready)
+    aio_app.router.add_get('/metrics', metrics)
+    aio_app.router.add_get('/usage', usage_report)
+    aio_app.router.add_get('/usage/{call_sid}', usage_report)
+    aio_app.router.add_post('/call_status', call_status)
+    aio_app.router.add_get('/call_status/stats', call_status_stats)
+    aio_app.router.add_get('/audio/{filename:.+}', audio_file)
+    return aio_app
+
+
+def run_async_server(port=5000, host='0.0.0.0'):
+    """Serve the webhooks on a single asyncio event loop"""
+    setup_logging()
+    warn_unsupported_flags()
+    logger.info(f"Starting async Voice Caller server on {host}:{port}")
+    web.run_app(create_async_app(), host=host, port=port, print=None)
+
+
+if __name__ == "__main__":
+    run_async_server()
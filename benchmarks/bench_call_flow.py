@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+End-to-end call-flow load benchmark.
+
+Simulated callers walk the real webhook flow the way Twilio drives it:
+/outbound -> /process_speech (with /partial_result updates while the
+caller talks) -> /process_followup, following <Redirect>s and honouring
+<Pause>s, with randomized think times and a weighted mix of utterances
+(fact-table questions, open questions for the model, mumbles, silence).
+The app runs in-process against a fake LLM with a log-normal latency, or
+with the real OpenAI client against --openai-base-url (benchmarks/fake_openai.py).
+
+Reports throughput plus p50/p95/p99 latency per route, and writes the
+results as JSON so runs can be compared (--compare a previous file).
+
+Usage:
+  python benchmarks/bench_call_flow.py [--calls 200] [--concurrency 50] [--server flask|async]
+  python benchmarks/bench_call_flow.py --compare benchmarks/results/call_flow-flask-20260101-120000.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+from aiohttp import web
+from werkzeug.serving import make_server
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+# (weight, utterance, confidence); None is silence
+UTTERANCES = (
+    (20, 'How much does a two bedroom cost?', 0.92),
+    (10, 'Where is the project located?', 0.90),
+    (8, 'How many bedrooms do the units have?', 0.88),
+    (15, 'Is it a good area for families?', 0.91),
+    (12, 'What are the schools like nearby?', 0.87),
+    (10, 'Can I bring my dog and is there a park close by?', 0.85),
+    (8, 'What financing options do you offer for first time buyers?', 0.90),
+    (7, 'Could you compare the east and west towers for me?', 0.83),
+    (5, 'uh hmm what', 0.30),
+    (5, None, None),
+)
+FOLLOWUPS = ((55, 'no thanks'), (35, 'yes please'), (10, 'not sure'))
+
+ANSWER = ("Buildn 123 is a family friendly community close to good schools and parks. "
+          "Our sales team can walk you through the details.")
+
+
+# ===== FAKE LLM =====
+def sample_latency(rng, median, sigma):
+    """Log-normal latency with the given median (seconds); sigma 0 is constant"""
+    return median * math.exp(rng.gauss(0, sigma)) if sigma else median
+
+
+def completion(text, prompt_tokens, completion_tokens):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                              total_tokens=prompt_tokens + completion_tokens)
+    )
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+
+def prompt_tokens(messages):
+    return sum(len(m.get('content') or '') for m in messages) // 4
+
+
+class FakeCompletions:
+    """chat.completions stand-in: log-normal latency, optional streaming at --llm-token-rate"""
+
+    def __init__(self, median, sigma, token_rate, seed=0):
+        self.median = median
+        self.sigma = sigma
+        self.token_rate = token_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _latency(self):
+        with self._lock:
+            self.calls += 1
+            return sample_latency(self._rng, self.median, self.sigma)
+
+    def create(self, messages=(), stream=False, **kwargs):
+        latency = self._latency()
+        if not stream:
+            time.sleep(latency)
+            return completion(ANSWER, prompt_tokens(messages), len(ANSWER) // 4)
+
+        def deltas():
+            time.sleep(latency)
+            for word in ANSWER.split(' '):
+                time.sleep(1 / self.token_rate)
+                yield chunk(word + ' ')
+        return deltas()
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, messages=(), **kwargs):
+        await asyncio.sleep(self._latency())
+        return completion(ANSWER, prompt_tokens(messages), len(ANSWER) // 4)
+
+
+def fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions), api_key='fake')
+
+
+# ===== SIMULATED CALLER =====
+class Recorder:
+    """Latency and status of every request, by route"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.turns = []          # question -> answer time, including redirects and holds
+        self.calls_completed = 0
+        self.calls_failed = 0
+
+    def request(self, route, seconds, ok):
+        self.latencies[route].append(seconds)
+        if not ok:
+            self.errors[route] += 1
+
+
+def pick(rng, weighted):
+    total = sum(item[0] for item in weighted)
+    point = rng.uniform(0, total)
+    for item in weighted:
+        point -= item[0]
+        if point <= 0:
+            return item[1:]
+    return weighted[-1][1:]
+
+
+def parse_twiml(body):
+    """(gather action, redirect URL, hangup, pause seconds) from a TwiML document"""
+    root = ET.fromstring(body)
+    gather = root.find('Gather')
+    redirect = root.find('Redirect')
+    return (
+        gather.get('action') if gather is not None else None,
+        redirect.text if redirect is not None else None,
+        root.find('Hangup') is not None,
+        sum(float(el.get('length', 1)) for el in root.iter('Pause')),
+    )
+
+
+class Caller:
+    """One simulated call: follows the TwiML it gets back until the app hangs up"""
+
+    def __init__(self, session, base_url, call_sid, rng, recorder, args):
+        self.session = session
+        self.base_url = base_url
+        self.call_sid = call_sid
+        self.rng = rng
+        self.recorder = recorder
+        self.args = args
+
+    async def post(self, path, data=None):
+        route = urlsplit(path).path
+        form = {'CallSid': self.call_sid, **(data or {})}
+        started = time.perf_counter()
+        try:
+            async with self.session.post(self.base_url + path, data=form) as response:
+                body = await response.read()
+                ok = response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            body, ok = b'', False
+        self.recorder.request(route, time.perf_counter() - started, ok)
+        if not ok:
+            raise RuntimeError(f'{route} failed')
+        return body
+
+    async def think(self, seconds):
+        await asyncio.sleep(seconds * self.args.time_scale)
+
+    async def speak(self, text):
+        """Talk for a while, sending Twilio-style partial transcripts as the words come in"""
+        words = text.split()
+        for i in range(1, len(words) + 1):
+            await self.think(self.rng.uniform(0.2, 0.4))
+            if self.args.partials and i < len(words) and i % 2 == 0:
+                await self.post('/partial_result', {
+                    'StableSpeechResult': ' '.join(words[:i]),
+                    'UnstableSpeechResult': words[i]
+                })
+
+    async def run(self):
+        questions = 0
+        path, data = '/outbound', None
+        asked_at = None
+        for _ in range(self.args.max_requests):
+            action, redirect, hangup, pause = parse_twiml(await self.post(path, data))
+            if pause:
+                await self.think(pause)
+            if action is None:
+                if hangup or redirect is None:
+                    return
+                path, data = redirect, None
+                continue
+
+            # A <Gather>: the prompt plays, then the caller answers
+            if asked_at is not None and action.startswith('/process_followup'):
+                self.recorder.turns.append(time.perf_counter() - asked_at)
+                asked_at = None
+            await self.think(self.rng.uniform(*self.args.think_time))
+            if action.startswith('/process_followup'):
+                reply = 'no thanks' if questions >= self.args.max_questions else pick(self.rng, FOLLOWUPS)[0]
+                await self.speak(reply)
+                path, data = action, {'SpeechResult': reply, 'Confidence': '0.9'}
+                continue
+            utterance, confidence = pick(self.rng, UTTERANCES)
+            if utterance is None:
+                # Silence: Twilio skips the action and plays what follows the <Gather>
+                path, data = (redirect, None) if redirect else (action, {})
+                continue
+            await self.speak(utterance)
+            questions += 1
+            asked_at = time.perf_counter()
+            path, data = action, {'SpeechResult': utterance, 'Confidence': str(confidence)}
+        raise RuntimeError(f'call {self.call_sid} did not hang up after {self.args.max_requests} requests')
+
+
+async def drive(base_url, args):
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    timeout = aiohttp.ClientTimeout(total=30)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def one_call(i):
+            async with semaphore:
+                caller = Caller(session, base_url, f'CAbench{i:06d}', random.Random(rng.random()), recorder, args)
+                try:
+                    await caller.run()
+                    recorder.calls_completed += 1
+                except RuntimeError:
+                    recorder.calls_failed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_call(i) for i in range(args.calls)))
+        return recorder, time.perf_counter() - started
+
+
+# ===== SERVERS =====
+def prepare_app(args):
+    import app as flask_app
+    if args.no_cache:
+        flask_app.answer_cache.enabled = False
+    flask_app.transcript_store = None if args.no_transcripts else flask_app.transcript_store
+    return flask_app
+
+
+def run_flask(args):
+    flask_app = prepare_app(args)
+    completions = FakeCompletions(args.llm_latency, args.llm_jitter, args.llm_token_rate, args.seed)
+    if args.openai_base_url:
+        from openai import OpenAI
+        flask_app.client = OpenAI(api_key='fake', base_url=args.openai_base_url, max_retries=0)
+    else:
+        flask_app.client = fake_client(completions)
+    server = make_server('127.0.0.1', 0, flask_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        recorder, elapsed = asyncio.run(drive(f'http://127.0.0.1:{server.server_port}', args))
+    finally:
+        server.shutdown()
+    return recorder, elapsed, None if args.openai_base_url else completions.calls
+
+
+def run_async(args):
+    prepare_app(args)
+    from async_app import create_async_app
+    completions = FakeAsyncCompletions(args.llm_latency, args.llm_jitter, args.llm_token_rate, args.seed)
+
+    async def run():
+        if args.openai_base_url:
+            from openai import AsyncOpenAI
+            openai_client = AsyncOpenAI(api_key='fake', base_url=args.openai_base_url, max_retries=0)
+        else:
+            openai_client = fake_client(completions)
+        runner = web.AppRunner(create_async_app(openai_client))
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await drive(f'http://127.0.0.1:{port}', args)
+        finally:
+            await runner.cleanup()
+
+    recorder, elapsed = asyncio.run(run())
+    return recorder, elapsed, None if args.openai_base_url else completions.calls
+
+
+# ===== REPORTING =====
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def latency_summary(values, elapsed):
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'per_second': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 1) if values else 0.0,
+        'p50_ms': round(percentile(values, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 1),
+        'max_ms': round(values[-1] * 1000, 1) if values else 0.0,
+    }
+
+
+def build_results(args, recorder, elapsed, llm_calls):
+    routes = {}
+    for route, values in sorted(recorder.latencies.items()):
+        routes[route] = {**latency_summary(values, elapsed), 'errors': recorder.errors.get(route, 0)}
+    requests = sum(len(values) for values in recorder.latencies.values())
+    return {
+        'benchmark': 'call_flow',
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'summary': {
+            'elapsed_seconds': round(elapsed, 2),
+            'calls_completed': recorder.calls_completed,
+            'calls_failed': recorder.calls_failed,
+            'calls_per_second': round(recorder.calls_completed / elapsed, 2) if elapsed else 0.0,
+            'requests': requests,
+            'requests_per_second': round(requests / elapsed, 2) if elapsed else 0.0,
+            'llm_calls': llm_calls,
+        },
+        'turn_latency': latency_summary(recorder.turns, elapsed),
+        'routes': routes,
+    }
+
+
+def print_results(results, baseline=None):
+    summary = results['summary']
+    print(f"{summary['calls_completed']} calls completed ({summary['calls_failed']} failed) "
+          f"in {summary['elapsed_seconds']}s: {summary['calls_per_second']} calls/s, "
+          f"{summary['requests_per_second']} req/s, {summary['llm_calls'] or 'n/a'} LLM calls")
+    header = f"{'route':<20} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    if baseline:
+        header += f" {'p99 vs base':>12}"
+    print(header)
+    rows = dict(results['routes'], **{'(question->answer)': {**results['turn_latency'], 'errors': 0}})
+    base_rows = {}
+    if baseline:
+        base_rows = dict(baseline['routes'], **{'(question->answer)': baseline['turn_latency']})
+    for route, row in rows.items():
+        line = (f"{route:<20} {row['count']:>7} {row['per_second']:>8} {row['p50_ms']:>8} "
+                f"{row['p95_ms']:>8} {row['p99_ms']:>8} {row['errors']:>7}")
+        base = base_rows.get(route)
+        if base and base['p99_ms']:
+            line += f" {(row['p99_ms'] - base['p99_ms']) / base['p99_ms'] * 100:>+11.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end call-flow load benchmark')
+    parser.add_argument('--server', choices=['flask', 'async'], default='flask')
+    parser.add_argument('--calls', type=int, default=200, help='Simulated calls in total')
+    parser.add_argument('--concurrency', type=int, default=50, help='Calls in progress at once')
+    parser.add_argument('--think-time', type=float, nargs=2, default=(0.5, 2.0), metavar=('MIN', 'MAX'),
+                        help='Seconds a caller waits before answering a prompt')
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help='Multiplier for think times, speaking and pauses (0.1 = 10x faster callers)')
+    parser.add_argument('--max-questions', type=int, default=3, help='Questions per call at most')
+    parser.add_argument('--max-requests', type=int, default=60, help='Requests per call before it counts as stuck')
+    parser.add_argument('--no-partials', dest='partials', action='store_false',
+                        help='Do not send /partial_result updates while callers speak')
+    parser.add_argument('--llm-latency', type=float, default=0.8, help='Median fake LLM latency in seconds')
+    parser.add_argument('--llm-jitter', type=float, default=0.4, help='Log-normal sigma of the LLM latency')
+    parser.add_argument('--llm-token-rate', type=float, default=40.0, help='Streamed words per second')
+    parser.add_argument('--openai-base-url',
+                        help='Use a real OpenAI client against this endpoint (e.g. benchmarks/fake_openai.py) '
+                             'instead of the in-process fake LLM')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the answer cache')
+    parser.add_argument('--no-transcripts', action='store_true', help='Do not write transcripts to SQLite')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Results JSON path (default: benchmarks/results/call_flow-<server>-<time>.json)')
+    parser.add_argument('--compare', help='Previous results JSON to compare p99 latencies against')
+    args = parser.parse_args()
+
+    print(f"{args.calls} calls, {args.concurrency} concurrent, {args.server} server, "
+          f"fake LLM median {args.llm_latency}s")
+    runner = run_flask if args.server == 'flask' else run_async
+    results = build_results(args, *runner(args))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_results(results, baseline)
+
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"call_flow-{args.server}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
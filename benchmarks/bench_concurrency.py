@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: Flask (thread per request) vs the asyncio server.
+
+Both servers run locally against a fake OpenAI client that sleeps for
+--llm-latency seconds, and --concurrency callers hit /process_speech at
+the same time. Reports throughput, p50/p99 latency and the peak number of
+threads in the process.
+
+Usage: python benchmarks/bench_concurrency.py [--concurrency 200] [--requests 600]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+from aiohttp import web
+from werkzeug.serving import make_server
+
+
+def completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class SlowSyncCompletions:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        return completion("Apartments start at $180,000.")
+
+
+class SlowAsyncCompletions:
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return completion("Apartments start at $180,000.")
+
+
+def fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions), api_key='fake')
+
+
+class ThreadSampler:
+    """Records the peak number of live threads while running"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def drive(url, concurrency, total):
+    """Send `total` requests with at most `concurrency` in flight; return latencies"""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=120)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def one(i):
+            async with semaphore:
+                data = {'SpeechResult': f'What is the price of unit {i}?', 'Confidence': '0.9'}
+                start = time.perf_counter()
+                async with session.post(url, data=data) as response:
+                    await response.read()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies
+
+
+def report(name, latencies, elapsed, peak_threads):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name}:")
+    print(f"  throughput:   {len(latencies) / elapsed:8.1f} req/s")
+    print(f"  p50 latency:  {statistics.median(latencies) * 1000:8.1f} ms")
+    print(f"  p99 latency:  {p99 * 1000:8.1f} ms")
+    print(f"  peak threads: {peak_threads:8d}")
+
+
+def bench_flask(args):
+    import app as flask_app
+    flask_app.client = fake_client(SlowSyncCompletions(args.llm_latency))
+    flask_app.answer_cache.enabled = False
+    flask_app.intent_matcher.enabled = False
+    flask_app.speculative_answers.enabled = False
+
+    server = make_server('127.0.0.1', 0, flask_app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_port}/process_speech'
+    try:
+        with ThreadSampler() as sampler:
+            start = time.perf_counter()
+            latencies = asyncio.run(drive(url, args.concurrency, args.requests))
+            elapsed = time.perf_counter() - start
+        report('flask (threaded)', latencies, elapsed, sampler.peak)
+    finally:
+        server.shutdown()
+
+
+def bench_async(args):
+    import app as flask_app
+    from async_app import create_async_app
+    flask_app.answer_cache.enabled = False
+    flask_app.intent_matcher.enabled = False
+
+    async def run():
+        runner = web.AppRunner(create_async_app(fake_client(SlowAsyncCompletions(args.llm_latency))))
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            start = time.perf_counter()
+            latencies = await drive(f'http://127.0.0.1:{port}/process_speech', args.concurrency, args.requests)
+            return latencies, time.perf_counter() - start
+        finally:
+            await runner.cleanup()
+
+    with ThreadSampler() as sampler:
+        latencies, elapsed = asyncio.run(run())
+    report('asyncio (aiohttp + AsyncOpenAI)', latencies, elapsed, sampler.peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flask vs asyncio concurrency benchmark')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--llm-latency', type=float, default=1.0, help='Fake model latency in seconds')
+    parser.add_argument('--server', choices=['both', 'flask', 'async'], default='both')
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent, fake LLM latency {args.llm_latency}s")
+    if args.server in ('both', 'flask'):
+        bench_flask(args)
+    if args.server in ('both', 'async'):
+        bench_async(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time and import side effects of each entry point.
+
+Every module (and every `main.py` command) is run in a fresh interpreter,
+in an empty working directory, without credentials in the environment and
+with outbound connections blocked. Besides the time, it reports anything
+the import did besides defining things: threads started, files created,
+connections attempted, and which heavy libraries (Flask, OpenAI, Twilio...)
+it pulled in. Any thread, file or connection is a failure (exit status 1).
+
+Usage:
+  python benchmarks/bench_startup.py [--repeat 5]
+  python benchmarks/bench_startup.py --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    'config.settings',
+    'voice_calls.make_call',
+    'voice_calls.make_call_test',
+    'voice_calls.campaign',
+    'app',
+    'async_app',
+    'main',
+]
+
+COMMANDS = [
+    ['--help'],
+    ['--mode', 'test'],
+]
+
+HEAVY_MODULES = ('flask', 'openai', 'twilio', 'aiohttp', 'requests', 'boto3')
+
+CREDENTIAL_VARS = ('OPENAI_API_KEY', 'TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN', 'AZURE_SPEECH_KEY')
+
+# Runs in the child interpreter: argv[1] is a module name, or 'main.py', its path and its arguments
+PROBE = r'''
+import io, json, runpy, socket, sys, threading, time
+connections = []
+def blocked(self, address, *args):
+    connections.append(str(address))
+    raise OSError('network access during import')
+socket.socket.connect = blocked
+socket.socket.connect_ex = blocked
+target, error = sys.argv[1], None
+stdout, sys.stdout = sys.stdout, io.StringIO()
+started = time.perf_counter()
+try:
+    if target == 'main.py':
+        sys.argv = sys.argv[2:]
+        runpy.run_path(sys.argv[0], run_name='__main__')
+    else:
+        __import__(target)
+except SystemExit:
+    pass
+except BaseException as e:
+    error = f'{type(e).__name__}: {e}'
+seconds = time.perf_counter() - started
+sys.stdout = stdout
+print(json.dumps({
+    'seconds': seconds,
+    'threads': threading.active_count(),
+    'connections': connections,
+    'heavy': sorted(name for name in HEAVY if name in sys.modules),
+    'error': error,
+}))
+'''
+
+
+def probe_environment():
+    env = {name: value for name, value in os.environ.items() if name not in CREDENTIAL_VARS}
+    env['PYTHONPATH'] = str(ROOT)
+    return env
+
+
+def probe(*target):
+    """Import a module (or run main.py with arguments) in a clean child process; returns what it did"""
+    with tempfile.TemporaryDirectory() as cwd:
+        code = f'HEAVY = {HEAVY_MODULES!r}\n' + PROBE
+        argv = list(target)
+        if target[0] == 'main.py':
+            argv.insert(1, str(ROOT / 'main.py'))
+        completed = subprocess.run(
+            [sys.executable, '-c', code] + argv, cwd=cwd, env=probe_environment(),
+            capture_output=True, text=True, timeout=120
+        )
+        if completed.returncode != 0 or not completed.stdout.strip():
+            return {'seconds': None, 'threads': None, 'connections': [], 'heavy': [], 'files': [],
+                    'error': (completed.stderr.strip().splitlines() or ['probe failed'])[-1]}
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result['files'] = sorted(os.listdir(cwd))
+    return result
+
+
+def side_effects(result):
+    """Human-readable list of what the import should not have done"""
+    problems = []
+    if result['error']:
+        problems.append(f"error: {result['error']}")
+    if result['threads'] and result['threads'] > 1:
+        problems.append(f"{result['threads'] - 1} thread(s)")
+    if result['files']:
+        problems.append(f"created {', '.join(result['files'])}")
+    if result['connections']:
+        problems.append(f"connected to {', '.join(result['connections'])}")
+    return problems
+
+
+def measure(label, target, repeat):
+    runs = [probe(*target) for _ in range(repeat)]
+    times = [run['seconds'] for run in runs if run['seconds'] is not None]
+    problems = sorted({problem for run in runs for problem in side_effects(run)})
+    row = {
+        'median_ms': round(statistics.median(times) * 1000, 1) if times else None,
+        'min_ms': round(min(times) * 1000, 1) if times else None,
+        'heavy': runs[-1]['heavy'],
+        'side_effects': problems,
+    }
+    median = f"{row['median_ms']:8.1f}" if times else '       -'
+    print(f"  {label:<28} {median} ms  {','.join(row['heavy']) or '-':<36} "
+          f"{'; '.join(problems) or 'ok'}")
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import time and side effects of the entry points')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per target (default: 5)')
+    parser.add_argument('--output', help='Write the results as JSON to this path')
+    args = parser.parse_args()
+
+    print(f"  {'import / command':<28} {'median':>8}     {'heavy modules loaded':<36} side effects")
+    results = {'modules': {}, 'commands': {}}
+    for module in MODULES:
+        results['modules'][module] = measure(module, (module,), args.repeat)
+    for command in COMMANDS:
+        label = 'main.py ' + ' '.join(command)
+        results['commands'][label] = measure(label, ('main.py',) + tuple(command), args.repeat)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    failed = any(row['side_effects'] for group in results.values() for row in group.values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
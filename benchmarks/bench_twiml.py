@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-request CPU cost of building TwiML.
+
+Compares building a VoiceResponse tree and serializing it on every request
+(the old path) with serving precompiled bytes / filling a template.
+
+Usage: python benchmarks/bench_twiml.py [--iterations 20000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ANSWER = 'Buildn 123 offers modern 2- and 3-bedroom apartments in Dallas starting at $180,000.'
+
+
+def measure(label, fn, iterations):
+    """Run fn `iterations` times and return CPU microseconds per call"""
+    fn()  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    per_call = (time.process_time() - start) / iterations * 1e6
+    print(f"  {label:<32} {per_call:9.2f} µs/request")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TwiML rendering micro-benchmark')
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    import app
+
+    cases = [
+        ('outbound',
+         lambda: str(app.build_outbound_twiml()),
+         lambda: app.static_twiml.get('outbound')),
+        ('goodbye',
+         lambda: str(app.build_goodbye_twiml()),
+         lambda: app.static_twiml.get('goodbye')),
+        ('error',
+         lambda: str(app.build_error_twiml("I'm sorry, I'm experiencing technical difficulties.")),
+         lambda: app.ERROR_TEMPLATE.render(message="I'm sorry, I'm experiencing technical difficulties.")),
+        ('answer',
+         lambda: str(app.build_answer_twiml(ANSWER)),
+         lambda: app.ANSWER_TEMPLATE.render(answer=ANSWER)),
+    ]
+
+    print(f"TwiML rendering, {args.iterations} iterations per case")
+    for name, build, cached in cases:
+        print(f"{name}:")
+        before = measure('VoiceResponse build + str()', build, args.iterations)
+        after = measure('precompiled', cached, args.iterations)
+        print(f"  speedup: {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
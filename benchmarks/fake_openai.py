@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stand-in server for benchmarks and chaos tests.
+
+Speaks POST /v1/chat/completions (plain and streamed as server-sent events,
+with usage, including stream_options.include_usage) and GET /v1/models.
+Every request draws a time-to-first-token from the latency distribution,
+streams tokens at --token-rate, and can be failed on purpose: 429 rate
+limits (with Retry-After), 500/503 server errors, or a hang that trips the
+client's timeout. Requests are recorded, optionally to a JSON-lines file.
+
+Point the app at it with OPENAI_BASE_URL:
+  python benchmarks/fake_openai.py --port 8098 --latency 0.8 --jitter 0.4 --rate-limit-rate 0.05
+  OPENAI_BASE_URL=http://127.0.0.1:8098/v1 OPENAI_API_KEY=fake python main.py
+
+The failure profile can be changed while it runs (no restart):
+  curl -X POST localhost:8098/_control -d '{"error_rate": 0.5}'
+  curl localhost:8098/_requests            # recorded requests
+  curl -X POST localhost:8098/_reset       # clear recordings
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = ("Buildn 123 offers one to three bedroom homes in Dallas, close to schools and parks. "
+                  "Our sales team will be happy to help with the details.")
+
+# Tunable at runtime through POST /_control
+PROFILE_FIELDS = {
+    'latency': float,           # median (or constant/mean) time to first token, seconds
+    'jitter': float,            # lognormal sigma, normal stddev, or uniform half-width
+    'distribution': str,        # constant | uniform | normal | lognormal
+    'token_rate': float,        # completion tokens per second after the first
+    'rate_limit_rate': float,   # fraction of requests answered 429
+    'error_rate': float,        # fraction answered 500/503
+    'timeout_rate': float,      # fraction that hang for `hang_seconds` and then drop the connection
+    'hang_seconds': float,
+    'answer': str,
+}
+DISTRIBUTIONS = ('constant', 'uniform', 'normal', 'lognormal')
+
+
+def count_tokens(text):
+    """Rough token count (4 characters per token), good enough for usage fields"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def split_tokens(text):
+    """The answer cut into word-sized streaming deltas"""
+    words = text.split(' ')
+    return [word + (' ' if i < len(words) - 1 else '') for i, word in enumerate(words)]
+
+
+class Profile:
+    """Latency distribution and failure rates"""
+
+    def __init__(self, latency=0.5, jitter=0.3, distribution='lognormal', token_rate=50.0,
+                 rate_limit_rate=0.0, error_rate=0.0, timeout_rate=0.0, hang_seconds=30.0,
+                 answer=DEFAULT_ANSWER, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.token_rate = token_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.answer = answer
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def update(self, changes):
+        """Apply a dict of PROFILE_FIELDS; unknown fields raise ValueError"""
+        for name, value in changes.items():
+            if name not in PROFILE_FIELDS:
+                raise ValueError(f"Unknown profile field '{name}'")
+            value = PROFILE_FIELDS[name](value)
+            if name == 'distribution' and value not in DISTRIBUTIONS:
+                raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+            setattr(self, name, value)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in PROFILE_FIELDS}
+
+    def first_token_delay(self):
+        with self._lock:
+            if self.distribution == 'uniform':
+                delay = self._rng.uniform(self.latency - self.jitter, self.latency + self.jitter)
+            elif self.distribution == 'normal':
+                delay = self._rng.gauss(self.latency, self.jitter)
+            elif self.distribution == 'lognormal':
+                delay = self.latency * math.exp(self._rng.gauss(0, self.jitter))
+            else:
+                delay = self.latency
+        return max(0.0, delay)
+
+    def outcome(self):
+        """'ok', 'rate_limited', 'error' or 'timeout' for the next request"""
+        with self._lock:
+            roll = self._rng.random()
+        for outcome, rate in (('rate_limited', self.rate_limit_rate), ('error', self.error_rate),
+                              ('timeout', self.timeout_rate)):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return 'ok'
+
+
+class FakeOpenAI(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), profile=None, record_file=None):
+        super().__init__(address, FakeOpenAIHandler)
+        self.profile = profile or Profile()
+        self.record_file = record_file
+        self.requests = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def next_id(self):
+        return f'chatcmpl-fake{next(self._ids):08d}'
+
+    def record(self, entry):
+        with self._lock:
+            self.requests.append(entry)
+            if self.record_file:
+                with open(self.record_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def reset(self):
+        with self._lock:
+            self.requests = []
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, error_type, headers=None):
+        self._json(status, {'error': {'message': message, 'type': error_type, 'param': None, 'code': None}},
+                   headers)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        return json.loads(raw or b'{}')
+
+    def do_GET(self):
+        if self.path == '/v1/models':
+            self._json(200, {'object': 'list', 'data': [
+                {'id': model, 'object': 'model', 'created': 0, 'owned_by': 'fake'}
+                for model in ('gpt-4', 'gpt-4o-mini', 'gpt-3.5-turbo')
+            ]})
+        elif self.path == '/_requests':
+            with self.server._lock:
+                self._json(200, {'requests': list(self.server.requests)})
+        elif self.path == '/_control':
+            self._json(200, self.server.profile.as_dict())
+        else:
+            self._error(404, f'Unknown path {self.path}', 'invalid_request_error')
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+        except ValueError:
+            self._error(400, 'Request body is not valid JSON', 'invalid_request_error')
+            return
+        if self.path == '/v1/chat/completions':
+            self._chat_completion(payload)
+        elif self.path == '/_control':
+            try:
+                self.server.profile.update(payload)
+            except (TypeError, ValueError) as e:
+                self._error(400, str(e), 'invalid_request_error')
+                return
+            self._json(200, self.server.profile.as_dict())
+        elif self.path == '/_reset':
+            self.server.reset()
+            self._json(200, {'requests': 0})
+        else:
+            self._error(404, f'Unknown path {self.path}', 'invalid_request_error')
+
+    def _chat_completion(self, payload):
+        profile = self.server.profile
+        started = time.time()
+        outcome = profile.outcome()
+        entry = {
+            'ts': round(started, 3),
+            'model': payload.get('model'),
+            'stream': bool(payload.get('stream')),
+            'max_tokens': payload.get('max_tokens'),
+            'messages': payload.get('messages', []),
+            'outcome': outcome,
+        }
+        try:
+            if outcome == 'rate_limited':
+                self._error(429, 'Rate limit reached (injected)', 'rate_limit_error', {'Retry-After': '1'})
+            elif outcome == 'error':
+                status = random.choice((500, 503))
+                self._error(status, 'The server had an error (injected)', 'server_error')
+            elif outcome == 'timeout':
+                time.sleep(profile.hang_seconds)
+                self.close_connection = True
+            elif payload.get('stream'):
+                self._stream(payload, profile)
+            else:
+                self._complete(payload, profile)
+        except (BrokenPipeError, ConnectionResetError):
+            entry['outcome'] = 'client_disconnected'
+        entry['duration_ms'] = round((time.time() - started) * 1000, 1)
+        self.server.record(entry)
+
+    def _usage(self, payload, answer):
+        prompt = sum(count_tokens(m.get('content') or '') for m in payload.get('messages', []))
+        completion = count_tokens(answer)
+        return {'prompt_tokens': prompt, 'completion_tokens': completion, 'total_tokens': prompt + completion}
+
+    def _answer(self, payload, profile):
+        tokens = split_tokens(profile.answer)
+        max_tokens = payload.get('max_tokens')
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        return tokens
+
+    def _complete(self, payload, profile):
+        tokens = self._answer(payload, profile)
+        time.sleep(profile.first_token_delay() + len(tokens) / profile.token_rate)
+        answer = ''.join(tokens).rstrip()
+        self._json(200, {
+            'id': self.server.next_id(),
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': answer},
+                         'finish_reason': 'stop', 'logprobs': None}],
+            'usage': self._usage(payload, answer),
+        })
+
+    def _stream(self, payload, profile):
+        tokens = self._answer(payload, profile)
+        completion_id = self.server.next_id()
+        created = int(time.time())
+
+        def chunk(delta, finish_reason=None, usage=None, choices=True):
+            body = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                    'model': payload.get('model'),
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}] if choices else []}
+            if usage is not None:
+                body['usage'] = usage
+            return body
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        time.sleep(profile.first_token_delay())
+        self._send_event(chunk({'role': 'assistant', 'content': ''}))
+        for token in tokens:
+            self._send_event(chunk({'content': token}))
+            time.sleep(1 / profile.token_rate)
+        self._send_event(chunk({}, finish_reason='stop'))
+        if (payload.get('stream_options') or {}).get('include_usage'):
+            self._send_event(chunk({}, usage=self._usage(payload, ''.join(tokens)), choices=False))
+        self._send_chunk(b'data: [DONE]\n\n')
+        self._send_chunk(b'')
+
+    def _send_event(self, body):
+        self._send_chunk(f'data: {json.dumps(body)}\n\n'.encode('utf-8'))
+
+    def _send_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local OpenAI-compatible stand-in server')
+    parser.add_argument('--port', type=int, default=8098)
+    parser.add_argument('--latency', type=float, default=0.5, help='Median time to first token (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.3, help='Spread of the latency distribution')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--token-rate', type=float, default=50.0, help='Completion tokens per second')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 500/503')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests that hang')
+    parser.add_argument('--hang-seconds', type=float, default=30.0, help='How long a hanging request hangs')
+    parser.add_argument('--answer', default=DEFAULT_ANSWER)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--record', help='Append every request to this JSON-lines file')
+    args = parser.parse_args()
+
+    profile = Profile(
+        latency=args.latency, jitter=args.jitter, distribution=args.distribution, token_rate=args.token_rate,
+        rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate, timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds, answer=args.answer, seed=args.seed
+    )
+    server = FakeOpenAI(('127.0.0.1', args.port), profile=profile, record_file=args.record)
+    print(f"Fake OpenAI listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Twilio REST API's call-creation endpoint.
+
+Accepts POST /2010-04-01/Accounts/<sid>/Calls.json like Twilio does,
+answers with a queued call after --latency seconds, and rejects calls
+above --cps-limit per second with Twilio's 429 (error 20429), so the
+campaign dialer's rate limiting can be checked without placing real calls.
+
+Usage:
+  python benchmarks/fake_twilio.py --port 8099 --cps-limit 5
+  TWILIO_API_BASE_URL=http://127.0.0.1:8099 python main.py --mode campaign --input numbers.csv
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+CALLS_PATH = re.compile(r'^/2010-04-01/Accounts/(?P<account>[^/]+)/Calls\.json$')
+
+
+class FakeTwilio(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency=0.0, cps_limit=None):
+        super().__init__(address, FakeTwilioHandler)
+        self.latency = latency
+        self.cps_limit = cps_limit
+        self.calls = []             # form fields of every accepted call
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._recent = deque()      # creation times within the last second
+        self._sids = itertools.count(1)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def admit(self):
+        """Record a call attempt; False if it exceeds the CPS limit"""
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if self.cps_limit is not None and len(self._recent) >= self.cps_limit:
+                self.rejected += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def next_sid(self):
+        return f'CA{next(self._sids):032x}'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class FakeTwilioHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        fields = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        match = CALLS_PATH.match(self.path)
+        if not match:
+            self._reply(404, {'code': 20404, 'message': 'The requested resource was not found', 'status': 404})
+            return
+        if not self.server.admit():
+            self._reply(429, {'code': 20429, 'message': 'Too Many Requests', 'status': 429})
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        sid = self.server.next_sid()
+        with self.server._lock:
+            self.server.calls.append(fields)
+        self._reply(201, {
+            'sid': sid,
+            'account_sid': match.group('account'),
+            'to': fields.get('To'),
+            'from': fields.get('From'),
+            'status': 'queued',
+            'uri': f"/2010-04-01/Accounts/{match.group('account')}/Calls/{sid}.json",
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Twilio call-creation API')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per call creation')
+    parser.add_argument('--cps-limit', type=float, default=None, help='Reject calls above this rate with 429')
+    args = parser.parse_args()
+    server = FakeTwilio(('127.0.0.1', args.port), latency=args.latency, cps_limit=args.cps_limit)
+    print(f"Fake Twilio listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
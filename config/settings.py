@@ -4,8 +4,17 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _env_bool(name, default):
+    """Read a true/false flag from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
 class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    # Alternative OpenAI-compatible endpoint, e.g. benchmarks/fake_openai.py (http://127.0.0.1:8098/v1)
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')
     TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
     TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
     TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
@@ -17,23 +26,129 @@ class Config:
     TWIML_TEST_URL = os.getenv('TWIML_TEST_URL')
     FLASK_SERVER_URL_OUTBOUND = os.getenv('FLASK_SERVER_URL_OUTBOUND')
 
+    # Outbound campaigns: Twilio account calls-per-second limit and dialer threads.
+    # TWILIO_API_BASE_URL redirects the Twilio REST client (e.g. to a local fake server)
+    TWILIO_CPS = float(os.getenv('TWILIO_CPS', '1'))
+    CAMPAIGN_CONCURRENCY = int(os.getenv('CAMPAIGN_CONCURRENCY', '10'))
+    TWILIO_API_BASE_URL = os.getenv('TWILIO_API_BASE_URL')
+    # Durable dial queue (in DATABASE_URL): attempts per number, lease before a
+    # crashed dial is retried, and base delay of the exponential retry backoff
+    DIAL_MAX_ATTEMPTS = int(os.getenv('DIAL_MAX_ATTEMPTS', '3'))
+    DIAL_LEASE_SECONDS = float(os.getenv('DIAL_LEASE_SECONDS', '60'))
+    DIAL_RETRY_BACKOFF = float(os.getenv('DIAL_RETRY_BACKOFF', '30'))
+    # Public URL of the /call_status webhook; outbound calls only report progress when set
+    STATUS_CALLBACK_URL = os.getenv('STATUS_CALLBACK_URL')
+
+    # Call status events, buffered and written in batches (to DATABASE_URL)
+    CALL_EVENTS_ENABLED = _env_bool('CALL_EVENTS_ENABLED', True)
+    CALL_EVENTS_BATCH_SIZE = int(os.getenv('CALL_EVENTS_BATCH_SIZE', '200'))
+    CALL_EVENTS_FLUSH_INTERVAL = float(os.getenv('CALL_EVENTS_FLUSH_INTERVAL', '1.0'))
+    CALL_EVENTS_MAX_BUFFER = int(os.getenv('CALL_EVENTS_MAX_BUFFER', '50000'))
+
+    # Answer cache for repeated caller questions
+    ANSWER_CACHE_ENABLED = _env_bool('ANSWER_CACHE_ENABLED', True)
+    ANSWER_CACHE_SIZE = int(os.getenv('ANSWER_CACHE_SIZE', '256'))
+    ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', '3600'))
+
+    # Identical concurrent OpenAI requests share one upstream call
+    SINGLE_FLIGHT_ENABLED = _env_bool('SINGLE_FLIGHT_ENABLED', True)
+
+    # Deferred answers: hold prompt + polling instead of blocking the webhook
+    DEFERRED_ANSWERS_ENABLED = _env_bool('DEFERRED_ANSWERS_ENABLED', False)
+    DEFERRED_WORKERS = int(os.getenv('DEFERRED_WORKERS', '8'))
+    DEFERRED_INLINE_WAIT = float(os.getenv('DEFERRED_INLINE_WAIT', '0.05'))
+    DEFERRED_POLL_PAUSE = int(os.getenv('DEFERRED_POLL_PAUSE', '1'))
+    DEFERRED_MAX_POLLS = int(os.getenv('DEFERRED_MAX_POLLS', '20'))
+
+    # Streamed answers: speak the first sentence, chain the rest (takes precedence over deferred)
+    STREAMING_ANSWERS_ENABLED = _env_bool('STREAMING_ANSWERS_ENABLED', False)
+    STREAM_FIRST_SENTENCE_TIMEOUT = float(os.getenv('STREAM_FIRST_SENTENCE_TIMEOUT', '8'))
+    STREAM_CONTINUE_TIMEOUT = float(os.getenv('STREAM_CONTINUE_TIMEOUT', '5'))
+
+    # Speculative answers started from stable partial transcripts. Off by default: every
+    # stable partial that is not the final question costs a completion that is thrown away
+    SPECULATIVE_ANSWERS_ENABLED = _env_bool('SPECULATIVE_ANSWERS_ENABLED', False)
+    SPECULATIVE_MIN_WORDS = int(os.getenv('SPECULATIVE_MIN_WORDS', '3'))
+    SPECULATIVE_WORKERS = int(os.getenv('SPECULATIVE_WORKERS', '4'))
+
+    # Per-call conversation history
+    SESSION_MAX_CALLS = int(os.getenv('SESSION_MAX_CALLS', '1000'))
+    SESSION_MAX_TURNS = int(os.getenv('SESSION_MAX_TURNS', '20'))
+    SESSION_IDLE_TTL = int(os.getenv('SESSION_IDLE_TTL', '900'))
+    SESSION_HISTORY_TOKEN_BUDGET = int(os.getenv('SESSION_HISTORY_TOKEN_BUDGET', '600'))
+
+    # OpenAI call policy: total time per caller turn (Twilio gives up on webhooks after 15s)
+    OPENAI_TURN_DEADLINE = float(os.getenv('OPENAI_TURN_DEADLINE', '12'))
+    OPENAI_BREAKER_THRESHOLD = int(os.getenv('OPENAI_BREAKER_THRESHOLD', '5'))
+    OPENAI_BREAKER_RECOVERY = float(os.getenv('OPENAI_BREAKER_RECOVERY', '30'))
+
+    # Model routing: fast tier for simple questions, GPT-4 for the rest.
+    # MODEL_TIERS is optional JSON, e.g. {"fast": {"model": "gpt-4o-mini", "max_tokens": 100, "timeout": 6}, ...}
+    MODEL_ROUTING_ENABLED = _env_bool('MODEL_ROUTING_ENABLED', True)
+    MODEL_TIERS = os.getenv('MODEL_TIERS')
+    # Optional JSON price table, USD per 1K tokens: {"gpt-4": [0.03, 0.06], ...}
+    MODEL_PRICES = os.getenv('MODEL_PRICES')
+
+    # Durable call transcripts (DATABASE_URL defaults to sqlite:///data/voice_caller.db)
+    TRANSCRIPTS_ENABLED = _env_bool('TRANSCRIPTS_ENABLED', True)
+
+    # Local intent fast-path: answer price/bedrooms/location/... questions without the LLM
+    INTENT_FASTPATH_ENABLED = _env_bool('INTENT_FASTPATH_ENABLED', True)
+
+    # Knowledge base: only the top-k relevant facts (within a token ceiling) go into each prompt
+    KNOWLEDGE_BASE_PATH = os.getenv(
+        'KNOWLEDGE_BASE_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'knowledge', 'buildn123.txt')
+    )
+    # Pre-rendered prompt audio played with <Play>: synthesizer none|polly|azure. AUDIO_VOICE is
+    # part of every file name, so a server that only serves rendered files must use the same voice
+    AUDIO_SYNTHESIZER = os.getenv('AUDIO_SYNTHESIZER', 'none')
+    AUDIO_VOICE = os.getenv('AUDIO_VOICE', 'Polly.Joanna')
+    AUDIO_DIR = os.getenv(
+        'AUDIO_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'audio')
+    )
+    AUDIO_BASE_URL = os.getenv('AUDIO_BASE_URL', '')   # public URL of this app; '' = relative /audio/... URLs
+    AUDIO_RENDER_ON_STARTUP = _env_bool('AUDIO_RENDER_ON_STARTUP', False)
+    AUDIO_ANSWER_CACHE_MB = int(os.getenv('AUDIO_ANSWER_CACHE_MB', '200'))
+    AUDIO_ANSWER_MIN_HITS = int(os.getenv('AUDIO_ANSWER_MIN_HITS', '3'))
+
+    KNOWLEDGE_TOP_K = int(os.getenv('KNOWLEDGE_TOP_K', '3'))
+    KNOWLEDGE_TOKEN_BUDGET = int(os.getenv('KNOWLEDGE_TOKEN_BUDGET', '200'))
+
+    # Readiness: a cheap OpenAI check every HEALTH_PROBE_INTERVAL seconds, cached;
+    # results older than HEALTH_PROBE_STALE_AFTER count as unknown (not ready)
+    HEALTH_PROBE_INTERVAL = float(os.getenv('HEALTH_PROBE_INTERVAL', '30'))
+    HEALTH_PROBE_STALE_AFTER = float(os.getenv('HEALTH_PROBE_STALE_AFTER', '90'))
+    HEALTH_PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', '5'))
+    HEALTH_PROBE_MODEL = os.getenv('HEALTH_PROBE_MODEL', 'gpt-4o-mini')
+
+    # Logging: JSON lines (or 'text') written by a background thread, rotated by size.
+    # LOG_SAMPLE_RATES keeps a fraction of low-level records, e.g. "DEBUG=0.1,INFO=0.5"
+    LOG_FILE = os.getenv('LOG_FILE', 'logs/voice_caller.log')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+    REQUIRED_VARS = ('OPENAI_API_KEY', 'TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN')
+
     @classmethod
-    def validate_required_vars(cls):
+    def missing_vars(cls, names=REQUIRED_VARS):
+        """Names of the given variables that are not set"""
+        return [name for name in names if not getattr(cls, name)]
+
+    @classmethod
+    def validate_required_vars(cls, names=REQUIRED_VARS):
         """
         Check if all important variables are set.
         This prevents your app from crashing later!
+
+        Called by the entry points that need them (see main.py), not on
+        import, so tools and tests can import the config without credentials.
         """
-        required_vars = {
-            'OPENAI_API_KEY': cls.OPENAI_API_KEY,
-            'TWILIO_ACCOUNT_SID': cls.TWILIO_ACCOUNT_SID,
-            'TWILIO_AUTH_TOKEN': cls.TWILIO_AUTH_TOKEN,
-        }
-        
-        missing_vars = []
-        for var_name, var_value in required_vars.items():
-            if not var_value:
-                missing_vars.append(var_name)
-        
+        missing_vars = cls.missing_vars(names)
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
         
@@ -41,6 +156,3 @@ class Config:
 
 # Create a global config instance
 config = Config()
-
-# Validate when the module is imported
-config.validate_required_vars()
\ No newline at end of file
@@ -13,17 +13,35 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# Each mode imports only what it needs (Flask, OpenAI, Twilio...) inside its
+# function, so quick modes start fast and none has side effects it doesn't need
+
+def require_vars(names=None):
+    """Exit with a clear message if environment variables this mode needs are missing"""
+    from config.settings import config
+    try:
+        config.validate_required_vars(names or config.REQUIRED_VARS)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
 def run_web_server(port=5000, debug=True):
     """Start the Flask web server for handling Twilio webhooks"""
     try:
-        from app import app, logger
+        from app import app, logger, setup_logging
+        setup_logging()
         logger.info("Starting Voice Caller Flask Application")
         logger.info(f"Server will be available at: http://localhost:{port}")
         logger.info("Webhook endpoints:")
         logger.info("  - /outbound (for outbound calls)")
         logger.info("  - /process_speech (for speech processing)")
+        logger.info("  - /partial_result (partial transcripts)")
         logger.info("  - /process_followup (for follow-up responses)")
-        logger.info("  - /health (health check)")
+        logger.info("  - /await_answer (deferred answer polling)")
+        logger.info("  - /continue_answer (streamed answer continuation)")
+        logger.info("  - /usage (token/cost report)")
+        logger.info("  - /metrics (Prometheus metrics)")
+        logger.info("  - /health, /health/live, /health/ready (health checks)")
         
         # Run server with specified parameters
         app.run(debug=debug, host='0.0.0.0', port=port)
@@ -36,64 +54,188 @@ def run_web_server(port=5000, debug=True):
         print(f"Error starting web server: {e}")
         sys.exit(1)
 
+def run_async_web_server(port=5000):
+    """Start the asyncio (aiohttp + AsyncOpenAI) server for handling Twilio webhooks"""
+    try:
+        from async_app import run_async_server
+        print(f"Async server will be available at: http://localhost:{port}")
+        run_async_server(port=port)
+        
+    except ImportError as e:
+        print(f"Error importing async app: {e}")
+        print("Please ensure all dependencies are installed: pip install aiohttp openai")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error starting async web server: {e}")
+        sys.exit(1)
+
+# Modes that hand a call's answer from one webhook to the next through process memory,
+# keyed by CallSid. Twilio's follow-up request can land on any worker, so they need one process.
+SINGLE_PROCESS_FLAGS = {
+    'DEFERRED_ANSWERS_ENABLED': "/await_answer can reach a worker that doesn't hold the pending answer",
+    'STREAMING_ANSWERS_ENABLED': "/continue_answer can reach a worker that doesn't hold the rest of the answer",
+}
+
+def single_process_conflicts(config):
+    """(flag, reason) for each enabled mode that cannot work with more than one worker"""
+    return [(flag, reason) for flag, reason in SINGLE_PROCESS_FLAGS.items() if getattr(config, flag)]
+
+def run_prefork_server(port=5000, workers=2, use_async=False):
+    """
+    Start a pool of pre-warmed worker processes sharing one listening socket.
+
+    Per-call state is per worker: deferred and streamed answers refuse to run
+    here, speculative answers are turned off (a partial transcript and the
+    final one rarely reach the same worker), and conversation history only
+    carries over when a call's next turn reaches the same worker.
+    """
+    from config.settings import config
+    conflicts = single_process_conflicts(config)
+    if conflicts:
+        print(f"❌ --workers {workers} cannot be used with:")
+        for flag, reason in conflicts:
+            print(f"   {flag}: {reason}")
+        print("Run a single process (--workers 1) or turn these off.")
+        sys.exit(1)
+    
+    try:
+        from services.prefork import PreforkServer
+        # Import the app in the master so workers share its pages copy-on-write
+        from app import app, logger, warm_up, setup_logging, speculative_answers
+        setup_logging()
+        
+        if speculative_answers.enabled:
+            logger.warning("Speculative answers disabled: partial transcripts are spread across workers")
+            speculative_answers.enabled = False
+        print("⚠️  Conversation history is per worker: a follow-up question that reaches "
+              "another worker is answered without the earlier turns")
+        logger.warning("Conversation history is per worker: a follow-up question that reaches "
+                       "another worker is answered without the earlier turns")
+        
+        if use_async:
+            from async_app import warn_unsupported_flags
+            warn_unsupported_flags()
+            
+            def serve_worker(sock):
+                from aiohttp import web
+                from async_app import create_async_app
+                web.run_app(create_async_app(), sock=sock, print=None)
+        else:
+            def serve_worker(sock):
+                from werkzeug.serving import make_server
+                make_server('0.0.0.0', port, app, threaded=True, fd=sock.fileno()).serve_forever()
+        
+        logger.info(f"Starting prefork server with {workers} workers on port {port}")
+        print(f"Server will be available at: http://localhost:{port} ({workers} workers)")
+        PreforkServer(serve_worker, workers=workers, port=port, warm_up=warm_up).run()
+        
+    except ImportError as e:
+        print(f"Error importing Flask app: {e}")
+        print("Please ensure all dependencies are installed: pip install -r requirements.txt")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error starting prefork server: {e}")
+        sys.exit(1)
+
 def make_voice_call(phone_number):
     """Make an outbound voice call"""
     try:
         from voice_calls.make_call_better import make_call
         print(f"Making call to: {phone_number}")
-        
-        # Check if make_call accepts parameters
-        import inspect
-        sig = inspect.signature(make_call)
-        
-        if len(sig.parameters) == 0:
-            # Function takes no parameters - you may need to set phone number elsewhere
-            print("Note: make_call() function doesn't accept phone number parameter.")
-            print("You may need to configure the phone number in your settings or modify the function.")
-            make_call()
-        else:
-            # Function accepts parameters
-            make_call(phone_number)
+        call_sid = make_call(phone_number)
+        print(f"✅ Call initiated. SID: {call_sid}")
         
     except ImportError as e:
         print(f"Error importing call module: {e}")
         print("Please ensure the voice_calls module is properly configured.")
         sys.exit(1)
-    except TypeError as e:
-        if "positional arguments" in str(e):
-            print(f"Error: The make_call() function signature doesn't match expected parameters.")
-            print(f"Error details: {e}")
-            print("\nTo fix this, you need to either:")
-            print("1. Modify make_call_better.py to accept a phone_number parameter, or")
-            print("2. Set the phone number in your configuration/settings")
-            sys.exit(1)
-        else:
-            print(f"Error making call: {e}")
-            sys.exit(1)
     except Exception as e:
         print(f"Error making call: {e}")
         sys.exit(1)
 
-def run_health_check(port=5000):
-    """Check if the application is healthy"""
+def run_campaign_mode(input_path, campaign, concurrency, cps):
+    """Queue a CSV file of numbers (if given) and dial the campaign's pending jobs"""
+    try:
+        from config.settings import config
+        from voice_calls.campaign import iter_numbers, run_queue
+        from voice_calls.dial_queue import DialQueue, FAILED
+        from voice_calls.make_call_better import get_client, make_call
+    except ImportError as e:
+        print(f"Error importing call module: {e}")
+        return False
+    
+    dial_queue = DialQueue(
+        config.DATABASE_URL,
+        campaign=campaign,
+        max_attempts=config.DIAL_MAX_ATTEMPTS,
+        lease_seconds=config.DIAL_LEASE_SECONDS,
+        retry_backoff=config.DIAL_RETRY_BACKOFF
+    )
+    if input_path:
+        try:
+            added, skipped = dial_queue.enqueue(iter_numbers(input_path))
+        except OSError as e:
+            print(f"❌ Cannot read {input_path}: {e}")
+            return False
+        print(f"📋 Queued {added} new numbers ({skipped} invalid rows skipped)")
+    
+    counts = dial_queue.counts()
+    print(f"📋 Campaign '{campaign}': " + ", ".join(f"{state} {count}" for state, count in counts.items()))
+    print(f"📞 Dialing with {concurrency} threads at up to {cps:g} calls/second...")
+    
+    get_client(pool_size=concurrency)   # one pooled connection per dialer thread
+    summary = run_queue(dial_queue, make_call, concurrency=concurrency, cps=cps).summary()
+    latency = summary['latency_ms']
+    counts = dial_queue.counts()
+    print(f"\n✅ Dials: {summary['succeeded']}/{summary['total']} initiated in {summary['elapsed_seconds']}s "
+          f"({summary['calls_per_second']} calls/s)")
+    print(f"   Create latency: p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+          f"p99 {latency['p99']} ms, max {latency['max']} ms")
+    for error, count in summary['errors'].items():
+        print(f"   {count} x {error}")
+    if summary['queue_errors']:
+        print(f"   ⚠️  {summary['queue_errors']} dial queue error(s), see the log")
+    if summary['lost_leases']:
+        print(f"   ⚠️  {summary['lost_leases']} dial(s) outlived their lease (DIAL_LEASE_SECONDS), see the log")
+    print(f"📋 Campaign '{campaign}': " + ", ".join(f"{state} {count}" for state, count in counts.items()))
+    for job in dial_queue.jobs(FAILED):
+        print(f"   ❌ {job['number']} after {job['attempts']} attempt(s): {job['last_error']}")
+    return counts[FAILED] == 0
+
+def run_health_check(port=5000, probe='both'):
+    """Check liveness and/or readiness of a running application"""
     try:
         import requests
         
-        print(f"Checking health at http://localhost:{port}/health...")
+        base_url = f'http://localhost:{port}'
+        healthy = True
         
-        # Try to reach the health endpoint
-        response = requests.get(f'http://localhost:{port}/health', timeout=10)
+        if probe in ('live', 'both'):
+            print(f"Checking liveness at {base_url}/health/live...")
+            response = requests.get(f'{base_url}/health/live', timeout=5)
+            if response.status_code == 200:
+                live = response.json()
+                print(f"✅ Alive (pid {live.get('pid')}, up {live.get('uptime_seconds')}s)")
+            else:
+                print(f"❌ Liveness check failed with status: {response.status_code}")
+                healthy = False
         
-        if response.status_code == 200:
-            health_data = response.json()
-            print("✅ Application is healthy!")
-            print(f"Status: {health_data.get('status')}")
-            print(f"OpenAI API: {health_data.get('openai_api')}")
-            print(f"Timestamp: {health_data.get('timestamp')}")
-            return True
-        else:
-            print(f"❌ Health check failed with status: {response.status_code}")
-            return False
+        if probe in ('ready', 'both'):
+            print(f"Checking readiness at {base_url}/health/ready...")
+            response = requests.get(f'{base_url}/health/ready', timeout=5)
+            ready = response.json() if response.headers.get('Content-Type', '').startswith('application/json') else {}
+            if response.status_code == 200:
+                print("✅ Ready to take calls!")
+            else:
+                print(f"❌ Not ready (status {response.status_code})")
+                healthy = False
+            print(f"OpenAI API: {ready.get('openai_api')} "
+                  f"(checked {ready.get('last_check_age_seconds')}s ago)")
+            print(f"Circuit breaker: {ready.get('openai_circuit')}")
+            if ready.get('last_error'):
+                print(f"Last error: {ready.get('last_error')}")
+        
+        return healthy
             
     except requests.exceptions.ConnectionError:
         print("❌ Cannot connect to the application. Is the server running?")
@@ -107,29 +249,89 @@ def run_health_check(port=5000):
         print(f"Health check error: {e}")
         return False
 
+def show_usage_report(call_sid=None, limit=10):
+    """Print token usage, cost and latency from the stored call transcripts"""
+    try:
+        from config.settings import config
+        from services.storage import TranscriptStore
+        
+        store = TranscriptStore(config.DATABASE_URL)
+        if call_sid:
+            usage = store.get_call_usage(call_sid)
+            if usage is None:
+                print(f"❌ No turns recorded for call {call_sid}")
+                return False
+            print(f"Call {call_sid}: {usage['turns']} turns, "
+                  f"{usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens, "
+                  f"${usage['cost_usd']:.4f}, avg {usage['avg_latency_ms']} ms, "
+                  f"max {usage['max_latency_ms']} ms, {usage['retries']} retries")
+            for turn in store.get_transcript(call_sid):
+                print(f"  {turn['latency_ms'] or 0:>8} ms  {turn['model'] or '-':<14} "
+                      f"{turn['prompt_tokens'] or 0:>5}+{turn['completion_tokens'] or 0:<4} tokens  "
+                      f"{turn['user_input']!r}")
+            return True
+        
+        summary = store.usage_summary(limit=limit)
+        totals = summary['totals']
+        print(f"{totals['calls']} calls, {totals['turns']} turns, "
+              f"{totals['prompt_tokens']} prompt + {totals['completion_tokens']} completion tokens, "
+              f"${totals['cost_usd']:.4f}, avg latency {totals['avg_latency_ms']} ms")
+        print("\nMost expensive calls:")
+        for call in summary['top_calls_by_cost']:
+            print(f"  {call['call_sid']}  ${call['cost_usd']:.4f}  {call['turns']} turns  "
+                  f"{call['prompt_tokens'] + call['completion_tokens']} tokens  max {call['max_latency_ms']} ms")
+        print("\nSlowest turns:")
+        for turn in summary['slowest_turns']:
+            print(f"  {turn['latency_ms']:>8} ms  {turn['call_sid']}  {turn['model'] or '-':<14} "
+                  f"{turn['user_input']!r}")
+        return True
+        
+    except Exception as e:
+        print(f"Usage report error: {e}")
+        return False
+
+def run_audio_mode(force=False):
+    """Synthesize the fixed prompts and fact-table answers to audio files"""
+    try:
+        from config.settings import config
+        import app
+    except ImportError as e:
+        print(f"Error importing app: {e}")
+        return False
+    
+    if app.audio_prompts.synthesizer is None:
+        print("❌ No speech synthesizer configured: set AUDIO_SYNTHESIZER=polly or azure")
+        return False
+    
+    print(f"🔊 Rendering prompts with {config.AUDIO_SYNTHESIZER} ({config.AUDIO_VOICE}) into {config.AUDIO_DIR}...")
+    rendered, failed = app.render_audio_prompts(force=force)
+    stats = app.audio_prompts.stats()
+    print(f"✅ Rendered {rendered} prompt(s), {stats['prompts']} available")
+    if failed:
+        print(f"❌ {failed} prompt(s) failed, see the log")
+    return not failed
+
 def test_configuration():
-    """Test that all required configurations are present"""
+    """Test that all required configurations are present (without importing the app)"""
     try:
+        import importlib.util
         from config.settings import config
-        from app import client
         
         print("🔧 Configuration Test")
         print("-" * 30)
         
-        # Check OpenAI API key
-        api_key_present = bool(client.api_key)
-        print(f"OpenAI API Key: {'✅ Present' if api_key_present else '❌ Missing'}")
+        for name in config.REQUIRED_VARS:
+            print(f"{name}: {'✅ Present' if getattr(config, name) else '❌ Missing'}")
         
-        # Check if we can import required modules
+        # Check the required modules are installed, without paying for importing them
         modules_to_check = ['flask', 'twilio', 'openai']
         for module in modules_to_check:
-            try:
-                __import__(module)
+            if importlib.util.find_spec(module) is not None:
                 print(f"{module}: ✅ Available")
-            except ImportError:
+            else:
                 print(f"{module}: ❌ Missing")
         
-        return api_key_present
+        return not config.missing_vars()
         
     except Exception as e:
         print(f"Configuration test error: {e}")
@@ -143,19 +345,30 @@ def main():
 Examples:
   python main.py --mode server          # Start the web server
   python main.py --mode call --phone +1234567890  # Make a call
-  python main.py --mode health          # Check application health
+  python main.py --mode campaign --input numbers.csv  # Dial a list at the account CPS
+  python main.py --mode campaign --input numbers.csv --cps 5 --concurrency 20
+  python main.py --mode campaign --campaign numbers  # Resume a campaign after a crash
+  python main.py --mode health          # Check liveness and readiness
+  python main.py --mode health --probe ready  # Readiness only (OpenAI + circuit breaker)
+  python main.py --mode audio           # Pre-render prompt audio (AUDIO_SYNTHESIZER)
+  python main.py --mode audio --force   # Re-render every prompt, e.g. after changing a recording
   python main.py --mode test            # Test configuration
+  python main.py --mode usage           # Token/cost/latency report
+  python main.py --mode usage --call-sid CA123  # Report for one call
   
 For development:
   python main.py                        # Defaults to server mode
   python main.py --port 8000            # Start server on port 8000
   python main.py --no-debug             # Start server without debug mode
+  python main.py --async                # Start the asyncio server (AsyncOpenAI)
+  python main.py --workers 4            # Production: 4 pre-warmed worker processes
+                                        # (conversation history is per worker, see --help)
         """
     )
     
     parser.add_argument(
         '--mode', 
-        choices=['server', 'call', 'health', 'test'], 
+        choices=['server', 'call', 'campaign', 'health', 'audio', 'test', 'usage'], 
         default='server',
         help='Application mode (default: server)'
     )
@@ -165,6 +378,30 @@ For development:
         help='Phone number for call mode (required when mode=call)'
     )
     
+    parser.add_argument(
+        '--input',
+        help='CSV file of phone numbers for campaign mode'
+    )
+    
+    parser.add_argument(
+        '--campaign',
+        help='Campaign name in the dial queue (default: the --input file name)'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=None,
+        help='Dialer threads for campaign mode (default: CAMPAIGN_CONCURRENCY)'
+    )
+    
+    parser.add_argument(
+        '--cps',
+        type=float,
+        default=None,
+        help='Max new calls per second for campaign mode (default: TWILIO_CPS)'
+    )
+    
     parser.add_argument(
         '--port',
         type=int,
@@ -178,12 +415,68 @@ For development:
         help='Disable debug mode for production'
     )
     
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Serve webhooks with the asyncio server and AsyncOpenAI client '
+             '(answers inline: deferred, streamed and speculative answers are Flask-only)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes for server mode (default: 1, the dev server). Per-call state '
+             'stays per worker: not allowed with deferred or streamed answers, disables speculative '
+             'answers, and multi-turn context is lost whenever a caller\'s next turn reaches another '
+             'worker (follow-up questions are answered without the earlier turns)'
+    )
+    
+    parser.add_argument(
+        '--probe',
+        choices=['live', 'ready', 'both'],
+        default='both',
+        help='Which probe health mode checks (default: both)'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-render prompts that already have audio (audio mode)'
+    )
+    
+    parser.add_argument(
+        '--call-sid',
+        help='Call SID for usage mode (default: summary of all calls)'
+    )
+    
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=10,
+        help='Number of calls/turns listed in usage mode (default: 10)'
+    )
+    
     args = parser.parse_args()
     
     print("🤖 AI Voice Caller")
     print("=" * 50)
     
     if args.mode == 'server':
+        require_vars()
+    elif args.mode in ('call', 'campaign'):
+        require_vars(('TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN'))
+    
+    if args.mode == 'server' and args.workers > 1:
+        print(f"Mode: Prefork Web Server (Port: {args.port}, Workers: {args.workers})")
+        run_prefork_server(port=args.port, workers=args.workers, use_async=args.use_async)
+        
+    elif args.mode == 'server' and args.use_async:
+        print(f"Mode: Async Web Server (Port: {args.port})")
+        run_async_web_server(port=args.port)
+        
+    elif args.mode == 'server':
         print(f"Mode: Web Server (Port: {args.port})")
         debug_mode = not args.no_debug
         if debug_mode:
@@ -201,9 +494,28 @@ For development:
         print(f"Mode: Make Call to {args.phone}")
         make_voice_call(args.phone)
         
+    elif args.mode == 'campaign':
+        if not args.input and not args.campaign:
+            print("❌ Error: --input or --campaign is required for campaign mode")
+            print("Usage: python main.py --mode campaign --input numbers.csv")
+            sys.exit(1)
+        
+        from config.settings import config
+        campaign = args.campaign or Path(args.input).stem
+        concurrency = args.concurrency or config.CAMPAIGN_CONCURRENCY
+        cps = args.cps or config.TWILIO_CPS
+        print(f"Mode: Campaign '{campaign}'")
+        success = run_campaign_mode(args.input, campaign, concurrency=concurrency, cps=cps)
+        sys.exit(0 if success else 1)
+        
+    elif args.mode == 'audio':
+        print("Mode: Render Prompt Audio")
+        success = run_audio_mode(force=args.force)
+        sys.exit(0 if success else 1)
+        
     elif args.mode == 'health':
         print(f"Mode: Health Check (Port: {args.port})")
-        success = run_health_check(port=args.port)
+        success = run_health_check(port=args.port, probe=args.probe)
         sys.exit(0 if success else 1)
         
     elif args.mode == 'test':
@@ -214,6 +526,11 @@ For development:
         else:
             print("\n❌ Configuration issues detected. Please check your setup.")
         sys.exit(0 if success else 1)
+        
+    elif args.mode == 'usage':
+        print("Mode: Usage Report")
+        success = show_usage_report(call_sid=args.call_sid, limit=args.limit)
+        sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Supporting services for the AI Voice Caller webhooks
+"""
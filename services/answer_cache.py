@@ -0,0 +1,101 @@
+# services/answer_cache.py
+"""
+In-process answer cache for repeated caller questions.
+
+Keys are a normalized form of the caller's SpeechResult so that
+"What's the price?" and "um, what's the price" share one entry.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Hesitation sounds only: words like "like", "right" or "well" can change the question
+FILLER_WORDS = {
+    'um', 'umm', 'uh', 'uhh', 'uhm', 'er', 'erm', 'ah', 'hmm', 'mm',
+}
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s']+")
+
+
+def normalize_utterance(text):
+    """Lowercase, strip punctuation and filler words, collapse whitespace"""
+    if not text:
+        return ''
+    text = text.lower().replace("’", "'")
+    text = _PUNCTUATION_RE.sub(' ', text)
+    words = [w.strip("'") for w in text.split()]
+    return ' '.join(w for w in words if w and w not in FILLER_WORDS)
+
+
+class AnswerCache:
+    """Bounded LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_size=256, ttl=3600, enabled=True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_input):
+        """Return the cached answer for user_input, or None"""
+        if not self.enabled:
+            return None
+        key = normalize_utterance(user_input)
+        if not key:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            answer, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def set(self, user_input, answer):
+        """Store an answer, evicting the least recently used entries if full"""
+        if not self.enabled or not answer:
+            return
+        key = normalize_utterance(user_input)
+        if not key:
+            return
+
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return a snapshot of cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,333 @@
+# services/audio_prompts.py
+"""
+Pre-rendered audio for spoken prompts.
+
+Fixed phrases (welcome, reprompts, follow-up, goodbye, error messages)
+are synthesized once to files and played with <Play>, instead of Twilio
+synthesizing the same <Say> text on every call. Answers that keep coming
+back (fact-table answers, cached LLM answers) are synthesized in the
+background once they have been given min_hits times, and kept in a
+size-bounded LRU on disk.
+
+Files are named by a hash of the voice and text, so a URL always refers
+to the same audio and can be cached forever, and changing the voice
+never plays stale recordings. Synthesis is pluggable:
+anything with `voice`, `extension` and `synthesize(text) -> bytes` works.
+Recency of a cached answer is its file's mtime, refreshed on every hit,
+and eviction scans the directory, so the size cap holds for all the
+workers sharing it. An answer another worker evicted is noticed on the
+next hit and spoken with <Say> instead of playing a missing file.
+"""
+import hashlib
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {'mp3': 'audio/mpeg', 'wav': 'audio/wav'}
+
+PROMPTS_DIR = 'prompts'
+ANSWERS_DIR = 'answers'
+
+
+class PollySynthesizer:
+    """Amazon Polly via boto3 (optional dependency), the same voices Twilio's <Say voice="Polly.*"> uses"""
+
+    extension = 'mp3'
+
+    def __init__(self, voice='Polly.Joanna', region=None, engine='standard'):
+        # Checked up front, but boto3 is only imported (slowly) when something is synthesized
+        if importlib.util.find_spec('boto3') is None:
+            raise RuntimeError("AUDIO_SYNTHESIZER=polly requires boto3 (pip install boto3)")
+        self.voice = voice
+        self.region = region
+        self.engine = engine
+        self._voice_id = voice[len('Polly.'):] if voice.startswith('Polly.') else voice
+        self._client = None
+
+    def synthesize(self, text):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('polly', region_name=self.region)
+        response = self._client.synthesize_speech(
+            Text=text, VoiceId=self._voice_id, OutputFormat='mp3', Engine=self.engine
+        )
+        return response['AudioStream'].read()
+
+
+class AzureSynthesizer:
+    """Azure Cognitive Services text-to-speech over its REST API"""
+
+    extension = 'mp3'
+    OUTPUT_FORMAT = 'audio-16khz-32kbitrate-mono-mp3'
+
+    def __init__(self, key, region, voice='en-US-JennyNeural', timeout=10.0):
+        if not key or not region:
+            raise RuntimeError("AUDIO_SYNTHESIZER=azure requires AZURE_SPEECH_KEY and AZURE_SPEECH_REGION")
+        self.voice = voice
+        self.key = key
+        self.url = f'https://{region}.tts.speech.microsoft.com/cognitiveservices/v1'
+        self.timeout = timeout
+
+    def synthesize(self, text):
+        import requests
+        ssml = (f"<speak version='1.0' xml:lang='en-US'><voice name='{self.voice}'>"
+                f"{escape(text)}</voice></speak>")
+        response = requests.post(
+            self.url,
+            data=ssml.encode('utf-8'),
+            headers={
+                'Ocp-Apim-Subscription-Key': self.key,
+                'Content-Type': 'application/ssml+xml',
+                'X-Microsoft-OutputFormat': self.OUTPUT_FORMAT,
+                'User-Agent': 'voice-caller',
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.content
+
+
+def create_synthesizer(name, voice=None, azure_key=None, azure_region=None, polly_region=None):
+    """Synthesizer for AUDIO_SYNTHESIZER ('polly', 'azure'), or None for 'none'"""
+    name = (name or 'none').strip().lower()
+    if name == 'none':
+        return None
+    if name == 'polly':
+        return PollySynthesizer(voice=voice or 'Polly.Joanna', region=polly_region)
+    if name == 'azure':
+        return AzureSynthesizer(azure_key, azure_region, voice=voice or 'en-US-JennyNeural')
+    raise ValueError(f"Unknown AUDIO_SYNTHESIZER '{name}': expected none, polly or azure")
+
+
+class AudioPromptStore:
+    """Rendered prompt files plus a disk LRU of synthesized answers"""
+
+    def __init__(self, directory, synthesizer=None, voice=None, base_url='',
+                 answer_cache_bytes=200 * 1024 * 1024, min_hits=3, max_tracked=10000, max_workers=2):
+        self.directory = directory
+        self.synthesizer = synthesizer
+        self.base_url = (base_url or '').rstrip('/') + '/audio'
+        self.answer_cache_bytes = answer_cache_bytes
+        self.min_hits = min_hits
+        self.max_tracked = max_tracked
+        self.max_workers = max_workers
+        self.extension = getattr(synthesizer, 'extension', 'mp3')
+        # Part of every file name: a server that only serves rendered files needs the same voice
+        self._voice = voice if voice is not None else getattr(synthesizer, 'voice', '')
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._prompts = set()
+        self._answers = OrderedDict()    # key -> file size, least recently used first
+        self._answer_bytes = 0
+        self._hits = OrderedDict()       # key -> times an uncached answer was given
+        self._pending = set()
+        self._executor = None
+        self._pid = None
+        self.synthesized = 0
+        self.failures = 0
+
+    def key(self, text):
+        return hashlib.sha256(f'{self._voice}\n{text}'.encode('utf-8')).hexdigest()[:24]
+
+    def path(self, kind, key):
+        return os.path.join(self.directory, kind, f'{key}.{self.extension}')
+
+    def url_for(self, text):
+        """URL of the pre-rendered recording of a fixed prompt, or None"""
+        if not text:
+            return None
+        self._ensure_loaded()
+        return self._prompt_url(self.key(text))
+
+    def _prompt_url(self, key):
+        if key in self._prompts:
+            return f'{self.base_url}/{PROMPTS_DIR}/{key}.{self.extension}'
+        return None
+
+    def answer_url(self, text):
+        """
+        URL of a recording of this answer, or None.
+
+        Each miss counts a hit for the text; at min_hits it is synthesized in
+        the background, so later callers get the recording.
+        """
+        if not text:
+            return None
+        self._ensure_loaded()
+        key = self.key(text)
+        url = self._prompt_url(key)
+        if url is not None or self.synthesizer is None:
+            return url
+        with self._lock:
+            cached = key in self._answers
+        if cached:
+            if self._touch(self.path(ANSWERS_DIR, key)):
+                with self._lock:
+                    if key in self._answers:
+                        self._answers.move_to_end(key)
+                return f'{self.base_url}/{ANSWERS_DIR}/{key}.{self.extension}'
+            # Evicted by another worker: forget it and count this as a miss
+            with self._lock:
+                self._answer_bytes -= self._answers.pop(key, 0)
+        with self._lock:
+            hits = self._hits.pop(key, 0) + 1
+            if hits < self.min_hits:
+                self._hits[key] = hits
+                if len(self._hits) > self.max_tracked:
+                    self._hits.popitem(last=False)
+                return None
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+        self._executor_for_pid().submit(self._synthesize_answer, key, text)
+        return None
+
+    def render(self, texts, force=False):
+        """Synthesize every text that has no prompt file yet; returns (rendered, failed)"""
+        if self.synthesizer is None:
+            raise RuntimeError("No speech synthesizer configured (AUDIO_SYNTHESIZER)")
+        self._ensure_loaded()
+        rendered = failed = 0
+        for text in dict.fromkeys(texts):
+            key = self.key(text)
+            if key in self._prompts and not force:
+                continue
+            try:
+                self._write(self.path(PROMPTS_DIR, key), self.synthesizer.synthesize(text))
+            except Exception as e:
+                failed += 1
+                logger.error("Failed to synthesize prompt '%s': %s: %s", text[:40], type(e).__name__, e)
+                continue
+            with self._lock:
+                self._prompts.add(key)
+            rendered += 1
+        return rendered, failed
+
+    def resolve(self, filename):
+        """Absolute path of a servable audio file (prompts/<key>.<ext> or answers/...), or None"""
+        kind, _, name = filename.partition('/')
+        key, _, extension = name.partition('.')
+        if kind not in (PROMPTS_DIR, ANSWERS_DIR) or extension != self.extension or not key.isalnum():
+            return None
+        path = self.path(kind, key)
+        return path if os.path.isfile(path) else None
+
+    def stats(self):
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                'synthesizer': type(self.synthesizer).__name__ if self.synthesizer else None,
+                'prompts': len(self._prompts),
+                'answers': len(self._answers),
+                'answer_bytes': self._answer_bytes,
+                'synthesized': self.synthesized,
+                'failures': self.failures,
+            }
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            suffix = f'.{self.extension}'
+            prompts_dir = os.path.join(self.directory, PROMPTS_DIR)
+            if os.path.isdir(prompts_dir):
+                self._prompts = {name[:-len(suffix)] for name in os.listdir(prompts_dir) if name.endswith(suffix)}
+            for _, key, size in self._scan_answers():
+                self._answers[key] = size
+                self._answer_bytes += size
+            self._loaded = True
+
+    def _scan_answers(self):
+        """(mtime, key, size) of every answer file on disk, least recently used first"""
+        suffix = f'.{self.extension}'
+        entries = []
+        try:
+            scan = os.scandir(os.path.join(self.directory, ANSWERS_DIR))
+        except OSError:
+            return entries
+        with scan:
+            for entry in scan:
+                if not entry.name.endswith(suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue    # removed by another worker meanwhile
+                entries.append((stat.st_mtime_ns, entry.name[:-len(suffix)], stat.st_size))
+        return sorted(entries)
+
+    def _touch(self, path):
+        """Mark a file as just used; False if it no longer exists"""
+        now = time.time_ns()
+        try:
+            os.utime(path, ns=(now, now))
+        except OSError:
+            return False
+        return True
+
+    def _executor_for_pid(self):
+        # Worker threads don't survive fork: each process gets its own pool
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='audio-synth')
+                    self._pid = pid
+        return self._executor
+
+    def _synthesize_answer(self, key, text):
+        path = self.path(ANSWERS_DIR, key)
+        try:
+            # Another worker sharing the directory may have synthesized it already
+            if not self._touch(path):
+                self._write(path, self.synthesizer.synthesize(text))
+                self._touch(path)
+                self.synthesized += 1
+        except Exception as e:
+            self.failures += 1
+            logger.error("Failed to synthesize answer audio: %s: %s", type(e).__name__, e)
+            with self._lock:
+                self._pending.discard(key)
+            return
+        self._evict_answers()
+        with self._lock:
+            self._pending.discard(key)
+
+    def _evict_answers(self):
+        """Delete the least recently used answer files until they fit answer_cache_bytes"""
+        entries = self._scan_answers()
+        total = sum(size for _, _, size in entries)
+        evicted = 0
+        while total > self.answer_cache_bytes and len(entries) - evicted > 1:
+            _, old_key, size = entries[evicted]
+            total -= size
+            evicted += 1
+            try:
+                os.remove(self.path(ANSWERS_DIR, old_key))
+            except OSError:
+                pass
+        with self._lock:
+            self._answers = OrderedDict((key, size) for _, key, size in entries[evicted:])
+            self._answer_bytes = total
+
+    def _write(self, path, data):
+        """Write via a temp file and rename, so a served file is never half-written"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+
+def content_type(filename):
+    return CONTENT_TYPES.get(filename.rpartition('.')[2], 'application/octet-stream')
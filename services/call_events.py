@@ -0,0 +1,191 @@
+# services/call_events.py
+"""
+Twilio call-progress events (statusCallback) in SQLite.
+
+During a campaign every call posts several status callbacks (initiated,
+ringing, in-progress, completed/busy/no-answer/...), so these outnumber
+the speech webhooks. The webhook only appends a tuple to an in-memory
+buffer; a background thread writes the buffer in one transaction when it
+reaches batch_size or every flush_interval seconds, whichever comes first.
+A full buffer drops events (and counts them) rather than slowing Twilio's
+requests down.
+"""
+import logging
+import os
+import threading
+import time
+
+from services.storage import connect, sqlite_path_from_url
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ('completed', 'busy', 'no-answer', 'failed', 'canceled')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS call_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_sid TEXT NOT NULL,
+    status TEXT NOT NULL,
+    sequence INTEGER,
+    duration INTEGER,
+    to_number TEXT,
+    answered_by TEXT,
+    received_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_call_events_status ON call_events (status, received_at);
+CREATE INDEX IF NOT EXISTS idx_call_events_call_sid ON call_events (call_sid, sequence);
+"""
+
+INSERT_EVENT = (
+    "INSERT INTO call_events (call_sid, status, sequence, duration, to_number, answered_by, received_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CallEventStore:
+    """Buffered, batch-written store of call status events with outcome stats"""
+
+    def __init__(self, database_url=None, batch_size=200, flush_interval=1.0, max_buffer=50000):
+        self.db_path = sqlite_path_from_url(database_url)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer = []
+        self._wakeup = threading.Event()
+        self._local = threading.local()
+        self._pid = None
+        self._writer = None
+        self._stop = None
+        self._schema_ready = False
+
+    def record(self, values):
+        """Buffer one status callback (Twilio's form fields); returns False if it was dropped"""
+        call_sid = values.get('CallSid')
+        status = values.get('CallStatus')
+        if not call_sid or not status:
+            return False
+        self._ensure_writer()
+        event = (call_sid, status, _int_or_none(values.get('SequenceNumber')),
+                 _int_or_none(values.get('CallDuration')), values.get('To'),
+                 values.get('AnsweredBy'), time.time())
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return False
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Write every buffered event now, on the calling thread"""
+        self._write(self._take())
+
+    def stats(self, since=None):
+        """
+        Outcome counts, answer rate and talk time over calls that reached a final status,
+        optionally only counting events received after the `since` timestamp.
+        """
+        self.flush()
+        placeholders = ', '.join('?' * len(FINAL_STATUSES))
+        rows = self._query(
+            "SELECT status, COUNT(DISTINCT call_sid) AS calls, COALESCE(SUM(duration), 0) AS total_duration "
+            f"FROM call_events WHERE status IN ({placeholders}) AND received_at >= ? GROUP BY status",
+            FINAL_STATUSES + (since or 0,)
+        )
+        outcomes = dict.fromkeys(FINAL_STATUSES, 0)
+        for row in rows:
+            outcomes[row['status']] = row['calls']
+        finished = sum(outcomes.values())
+        talk_seconds = next((row['total_duration'] for row in rows if row['status'] == 'completed'), 0)
+        answered = outcomes['completed']
+        in_progress = self._query(
+            "SELECT COUNT(DISTINCT call_sid) AS calls FROM call_events WHERE received_at >= ? "
+            f"AND call_sid NOT IN (SELECT call_sid FROM call_events WHERE status IN ({placeholders}))",
+            (since or 0,) + FINAL_STATUSES
+        )[0]['calls']
+        return {
+            'finished_calls': finished,
+            'unfinished_calls': in_progress,
+            'outcomes': outcomes,
+            'answer_rate': round(answered / finished, 3) if finished else None,
+            'talk_seconds': talk_seconds,
+            'avg_duration_seconds': round(talk_seconds / answered, 1) if answered else None,
+            'dropped': self.dropped,
+        }
+
+    def close(self):
+        """Write buffered events and stop the writer thread"""
+        if self._writer is not None and self._pid == os.getpid():
+            self._stop.set()
+            self._wakeup.set()
+            self._writer.join(timeout=5)
+        self._writer = None
+        self.flush()
+
+    def _ensure_writer(self):
+        pid = os.getpid()
+        if self._pid == pid and self._writer is not None:
+            return
+        with self._lock:
+            if self._pid == pid and self._writer is not None:
+                return
+            # First use, or first use after fork: the parent's buffer and thread are not ours
+            self._pid = pid
+            self._buffer = []
+            self._local = threading.local()
+            self._stop = threading.Event()
+            self._writer = threading.Thread(target=self._write_loop, args=(self._stop,),
+                                            name='call-event-writer', daemon=True)
+            self._writer.start()
+
+    def _take(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            conn = self._conn()
+            with self._write_lock, conn:
+                conn.executemany(INSERT_EVENT, batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.error("Failed to write %d call event(s): %s", len(batch), e)
+
+    def _write_loop(self, stop):
+        while not stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._write(self._take())
+
+    def _query(self, sql, params=()):
+        cursor = self._conn().execute(sql, params)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = connect(self.db_path)
+            if not self._schema_ready:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
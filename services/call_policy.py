@@ -0,0 +1,240 @@
+# services/call_policy.py
+"""
+Deadline-aware retries and a circuit breaker for upstream (OpenAI) calls.
+
+CallPolicy runs a call against a total per-turn deadline: each attempt gets
+the time that is left as its timeout, failures are retried with
+exponential backoff and full jitter, and errors are classified by
+exception type rather than by message text. A shared CircuitBreaker stops
+calling the upstream entirely while it is failing, so callers get a canned
+answer immediately instead of waiting out timeouts.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE = 'retryable'
+RATE_LIMITED = 'rate_limited'
+FATAL = 'fatal'
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the breaker is open"""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when no time is left in the per-turn deadline for another attempt"""
+
+
+def classify_error(error):
+    """Map an exception to RETRYABLE, RATE_LIMITED or FATAL"""
+    if isinstance(error, openai.RateLimitError):
+        return RATE_LIMITED
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError,
+                          openai.InternalServerError, TimeoutError, ConnectionError)):
+        return RETRYABLE
+    if isinstance(error, openai.APIStatusError):
+        return RETRYABLE if error.status_code >= 500 or error.status_code == 408 else FATAL
+    return FATAL
+
+
+def retry_after_seconds(error):
+    """Retry-After hint from a rate-limit response, if the server sent one"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Classic closed/open/half-open breaker.
+
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `recovery_timeout` seconds, then lets a single probe call through.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self):
+        """True if a call may go to the upstream now"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit breaker closed: upstream recovered")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """A call ended without a verdict (cancelled, interrupted): let the next probe through"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            was_probe = self._probe_in_flight
+            self._probe_in_flight = False
+            if self._state == OPEN:
+                return
+            if was_probe or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self.times_opened += 1
+                logger.error("Circuit breaker opened after %d consecutive failures", self._failures)
+
+    def snapshot(self):
+        """Breaker state for monitoring endpoints"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == OPEN:
+                retry_in = max(0.0, self._opened_at + self.recovery_timeout - self._clock())
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'times_opened': self.times_opened,
+                'rejected_calls': self.rejected,
+                'retry_in_seconds': round(retry_in, 1),
+            }
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+
+class CallPolicy:
+    """Retries with backoff and jitter inside a total deadline, guarded by a breaker"""
+
+    def __init__(self, deadline=12.0, max_attempts=3, base_delay=0.25, max_delay=2.0,
+                 min_attempt_timeout=1.0, max_attempt_timeout=30.0, breaker=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_attempt_timeout = min_attempt_timeout
+        self.max_attempt_timeout = max_attempt_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._clock = clock
+        self._sleep = sleep
+
+    def call(self, fn, deadline=None, info=None):
+        """
+        Call fn(timeout=...) until it succeeds, a fatal error occurs, attempts
+        run out or the deadline would be exceeded. If info is a dict, the
+        number of retries is written to info['retries'].
+        """
+        info = {} if info is None else info
+        end = self._clock() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            timeout = self._before_attempt(end, attempt, info)
+            try:
+                result = fn(timeout=timeout)
+            except Exception as e:
+                delay = self._after_failure(e, end, attempt)
+                self._sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, fn, deadline=None, info=None):
+        """Async variant of call(); fn(timeout=...) must return an awaitable"""
+        info = {} if info is None else info
+        end = self._clock() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            timeout = self._before_attempt(end, attempt, info)
+            try:
+                result = await fn(timeout=timeout)
+            except Exception as e:
+                delay = self._after_failure(e, end, attempt)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # e.g. CancelledError when the caller hung up during a half-open probe
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _before_attempt(self, end, attempt, info):
+        info['retries'] = attempt
+        remaining = end - self._clock()
+        if remaining < self.min_attempt_timeout:
+            raise DeadlineExceeded(f"Only {remaining:.2f}s left of the turn deadline")
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Upstream circuit is open")
+        return min(remaining, self.max_attempt_timeout)
+
+    def _after_failure(self, error, end, attempt):
+        """Decide whether to retry; re-raises the error when not, else returns the delay"""
+        kind = classify_error(error)
+        if kind == FATAL:
+            # Bad requests/auth problems are ours to fix; the upstream itself answered
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+
+        if attempt + 1 >= self.max_attempts:
+            logger.error("Giving up after %d attempts: %s: %s", attempt + 1, type(error).__name__, error)
+            raise error
+
+        delay = self.backoff_delay(attempt)
+        if kind == RATE_LIMITED:
+            delay = max(delay, retry_after_seconds(error) or 0.0)
+        if self._clock() + delay + self.min_attempt_timeout > end:
+            logger.error("No time left in the turn deadline to retry %s", type(error).__name__)
+            raise error
+
+        logger.warning("Attempt %d failed with %s, retrying in %.2fs", attempt + 1, type(error).__name__, delay)
+        return delay
@@ -0,0 +1,88 @@
+# services/deferred.py
+"""
+Background execution of slow LLM answers, keyed by Twilio CallSid.
+
+The webhook submits the work and returns a hold prompt straight away;
+a polling route then picks the answer up once it is ready.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+READY = 'ready'
+MISSING = 'missing'
+
+
+class DeferredAnswers:
+    """Tracks one in-flight answer job per call"""
+
+    def __init__(self, max_workers=8, result_ttl=300):
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='deferred-answer'
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, call_sid, fn, *args, **kwargs):
+        """Start fn in the background for call_sid, replacing any older job"""
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._purge_expired()
+            previous = self._jobs.get(call_sid)
+            self._jobs[call_sid] = (future, time.monotonic())
+        if previous is not None:
+            previous[0].cancel()
+        return future
+
+    def result(self, call_sid, timeout=0):
+        """
+        Return (state, answer) for call_sid.
+
+        Waits up to `timeout` seconds for a pending job. A finished job is
+        removed, so each answer is handed out exactly once.
+        """
+        with self._lock:
+            job = self._jobs.get(call_sid)
+        if job is None:
+            return MISSING, None
+
+        future = job[0]
+        try:
+            answer = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return PENDING, None
+        except Exception as e:
+            logger.error("Deferred answer for %s failed: %s", call_sid, e, exc_info=True)
+            answer = None
+
+        self.discard(call_sid)
+        return READY, answer
+
+    def discard(self, call_sid):
+        """Forget the job for call_sid, cancelling it if it has not started"""
+        with self._lock:
+            job = self._jobs.pop(call_sid, None)
+        if job is not None:
+            job[0].cancel()
+
+    def pending_count(self):
+        """Number of jobs that have not been collected yet"""
+        with self._lock:
+            return len(self._jobs)
+
+    def _purge_expired(self):
+        """Drop uncollected jobs older than result_ttl (caller holds the lock)"""
+        cutoff = time.monotonic() - self.result_ttl
+        expired = [sid for sid, (_, created) in self._jobs.items() if created < cutoff]
+        for sid in expired:
+            self._jobs.pop(sid)[0].cancel()
+
+    def shutdown(self, wait=False):
+        """Stop the worker pool"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
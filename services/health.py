@@ -0,0 +1,102 @@
+# services/health.py
+"""
+Cached readiness probing of the OpenAI dependency.
+
+Load balancers probe every few seconds; a real completion per probe costs
+money and can time out the probe itself. ReadinessProber runs one cheap
+check on a schedule in a background thread and serves the cached result,
+treating it as unknown once it is older than the staleness window. The
+circuit breaker state is folded in, so a node whose breaker is open is
+reported as not ready.
+"""
+import logging
+import os
+import threading
+import time
+
+from services.call_policy import OPEN
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = 'healthy'
+UNHEALTHY = 'unhealthy'
+UNKNOWN = 'unknown'
+
+
+class ReadinessProber:
+    """Background prober with a cached, staleness-bounded result"""
+
+    def __init__(self, check_fn, interval=30.0, stale_after=90.0, breaker=None, clock=time.time):
+        self.check_fn = check_fn
+        self.interval = interval
+        self.stale_after = stale_after
+        self.breaker = breaker
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._ok = None
+        self._error = None
+        self._checked_at = None
+        self._latency_ms = None
+        self.checks = 0
+
+    def ensure_started(self):
+        """Start the probe thread for this process (again after a fork)"""
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None:
+                return
+            self._pid = pid
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                            name='readiness-prober', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def check_now(self):
+        """Run one check synchronously and cache its result"""
+        started = time.monotonic()
+        try:
+            self.check_fn()
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {e}"
+            logger.error("Readiness probe failed: %s", error)
+        with self._lock:
+            self._ok = ok
+            self._error = error
+            self._checked_at = self._clock()
+            self._latency_ms = round((time.monotonic() - started) * 1000, 1)
+            self.checks += 1
+        return ok
+
+    def snapshot(self):
+        """Cached readiness: never calls the upstream"""
+        with self._lock:
+            ok, error, checked_at, latency_ms = self._ok, self._error, self._checked_at, self._latency_ms
+        age = None if checked_at is None else self._clock() - checked_at
+        if ok is None or age > self.stale_after:
+            status = UNKNOWN
+        else:
+            status = HEALTHY if ok else UNHEALTHY
+        breaker_state = self.breaker.state if self.breaker is not None else None
+        return {
+            'ready': status == HEALTHY and breaker_state != OPEN,
+            'openai_api': status,
+            'openai_circuit': breaker_state,
+            'last_check_age_seconds': None if age is None else round(age, 1),
+            'last_check_latency_ms': latency_ms,
+            'last_error': error,
+        }
+
+    def _run(self, stop):
+        while not stop.is_set():
+            self.check_now()
+            stop.wait(self.interval)
@@ -0,0 +1,168 @@
+# services/intents.py
+"""
+Local intent matching for the most common caller questions.
+
+A single precompiled regex (one named group per intent) recognises price,
+bedroom, location, amenity and sales-contact questions and answers them
+straight from facts read out of the knowledge base, so those turns never
+wait on the LLM and never contradict it. An intent whose facts are not in
+the knowledge base is left to the model, as is anything ambiguous or
+open-ended.
+
+The same module provides yes/no detection for the follow-up prompt using
+whole-word matching, so "book" is not mistaken for "ok".
+"""
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Where each fast-path fact is found in the knowledge base snippets
+FACT_PATTERNS = {
+    'name': r"^(.+?) is a residential",
+    'city': r"is a residential .*?project in ([A-Z][\w .]*?)[,.]",
+    'bedrooms': r"offers modern (.+?) apartments",
+    'starting_price': r"prices? .*?start at (\$[\d,]+)",
+    'amenities': r"apartments come with (.+?)\.",
+    'construction': r"built with (.+?) throughout",
+}
+
+INTENT_ANSWERS = {
+    'price': (
+        "Apartments at {name} start at {starting_price}. "
+        "Our sales team can give you pricing for a specific unit."
+    ),
+    'bedrooms': (
+        "{name} offers modern {bedrooms} apartments."
+    ),
+    'location': (
+        "{name} is a residential project located in {city}."
+    ),
+    'amenities': (
+        "{name} features {amenities} and {construction}. "
+        "Our sales team can send you the full list of amenities."
+    ),
+    'contact_sales': (
+        "I'd be happy to connect you with our sales team. "
+        "They can answer detailed questions and arrange a visit."
+    ),
+}
+
+INTENT_PATTERNS = {
+    'price': r"price|prices|pricing|cost|costs|how much|starting at|cheapest",
+    'bedrooms': r"bedrooms?|beds?|how many rooms|\d\s?br|two bed\w*|three bed\w*",
+    'location': (
+        r"where is (?:it|this|that|the (?:project|property|building|community)|buildn(?: 123)?)|"
+        r"where are (?:you|they|the apartments)|located|location|address|which city|what city|what area"
+    ),
+    'amenities': r"amenities|amenity|features|facilities",
+    'contact_sales': r"sales team|talk to (?:someone|a person|sales|an agent)|speak (?:to|with) (?:someone|a person|sales|an agent)|contact (?:you|sales|someone)|call me back",
+}
+
+# Questions that need reasoning or combine topics go to the LLM, and so do questions
+# about one specific place or amenity, which the generic fact sentences don't answer
+_FALL_THROUGH = re.compile(
+    r"\b(why|explain|compare|versus|vs|difference|financ\w*|mortgage|loan|hoa|"
+    r"invest\w*|tax|taxes|if i|what if|and (?:the|how|what|where)|"
+    r"office|showroom|model unit|pools?|gyms?|parking|garage|playground|elevators?|balcon\w*|pets?|laundry)\b"
+)
+
+# Asking for more help wins over a "no" earlier in the reply ("no, I have another question")
+_MORE_HELP = re.compile(r"\b(another question|one more (?:question|thing)|something else|a question)\b")
+_NEGATED = re.compile(r"\b(?:don't|do not|not|no)(?: \w+)? $")
+_LEADING = re.compile(r"\W*([a-z']+)")
+_LEADING_YES = frozenset(('yes', 'yeah', 'yep', 'yup', 'ya', 'sure', 'absolutely', 'definitely'))
+_LEADING_NO = frozenset(('no', 'nope', 'nah'))
+
+_YES = re.compile(
+    r"\b(yes|yeah|yep|yup|ya|sure|okay|ok|please|absolutely|definitely|of course|"
+    r"i do|i have|one more|another question)\b"
+)
+_NO = re.compile(
+    r"\b(no|nope|nah|not really|not sure|nothing|that's all|that is all|that's it|"
+    r"i'm good|i am good|all set|goodbye|bye|don't have|do not have)\b"
+)
+
+
+def load_facts(snippets, patterns=None):
+    """Read the fast-path facts from knowledge base snippets; facts not found are left out"""
+    facts = {}
+    for name, pattern in (patterns or FACT_PATTERNS).items():
+        regex = re.compile(pattern)
+        for snippet in snippets:
+            match = regex.search(snippet)
+            if match:
+                facts[name] = match.group(1)
+                break
+    return facts
+
+
+class IntentMatch:
+    __slots__ = ('intent', 'answer')
+
+    def __init__(self, intent, answer):
+        self.intent = intent
+        self.answer = answer
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent!r})"
+
+
+class IntentMatcher:
+    """Precompiled matcher answering common intents from a fact table (see load_facts)"""
+
+    def __init__(self, facts=None, patterns=None, answers=None, max_words=14, enabled=True):
+        facts = facts or {}
+        patterns = patterns or INTENT_PATTERNS
+        answers = answers or INTENT_ANSWERS
+        self.max_words = max_words
+        self.enabled = enabled
+        # Answers are rendered once; matching then costs one regex scan
+        self._answers = {}
+        for name in patterns:
+            try:
+                self._answers[name] = answers[name].format(**facts)
+            except KeyError as e:
+                logger.warning("Intent '%s' is answered by the LLM: fact %s not found in the knowledge base",
+                               name, e)
+        self._pattern = re.compile(
+            '|'.join(f'(?P<{name}>\\b(?:{patterns[name]})\\b)' for name in self._answers)
+        ) if self._answers else None
+
+    def answers(self):
+        """Every rendered answer, e.g. to pre-render as audio"""
+        return list(self._answers.values())
+
+    def match(self, user_input):
+        """Return an IntentMatch for a single clear intent, else None"""
+        if not self.enabled or not user_input:
+            return None
+        text = user_input.lower().replace("’", "'")
+        if self._pattern is None or len(text.split()) > self.max_words or _FALL_THROUGH.search(text):
+            return None
+
+        intents = {m.lastgroup for m in self._pattern.finditer(text)}
+        if len(intents) != 1:
+            # No intent, or several at once ("price of the 3 bedroom in Dallas"): let the LLM answer
+            return None
+        intent = intents.pop()
+        return IntentMatch(intent, self._answers[intent])
+
+
+def classify_yes_no(user_input):
+    """Return 'yes', 'no' or None for a follow-up reply"""
+    text = (user_input or '').lower().replace("’", "'")
+    more_help = _MORE_HELP.search(text)
+    if more_help and not _NEGATED.search(text[:more_help.start()]):
+        return 'yes'
+    # A reply that opens with a plain yes or no means it ("yes, no more hold")
+    leading = _LEADING.match(text)
+    if leading and leading.group(1) in _LEADING_YES:
+        return 'yes'
+    if leading and leading.group(1) in _LEADING_NO:
+        return 'no'
+    if _NO.search(text):
+        return 'no'
+    if _YES.search(text):
+        return 'yes'
+    return None
@@ -0,0 +1,105 @@
+# services/knowledge.py
+"""
+Project knowledge base with BM25 retrieval.
+
+The facts file is split into paragraphs ("snippets") and indexed into an
+in-memory inverted index once at startup. For each question only the
+top-k most relevant snippets, up to a token ceiling, go into the prompt,
+so prompt size stays flat as the knowledge base grows.
+"""
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+from services.sessions import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9$]+(?:[.,'][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its "
+    "me my of on or our so that the their them there they this to us was we what "
+    "when where which who will with you your".split()
+)
+
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords; trailing plural 's' is folded"""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def load_snippets(path):
+    """Read a facts file: paragraphs separated by blank lines, '#' lines are comments"""
+    with open(path, encoding='utf-8') as f:
+        lines = [line.rstrip() for line in f if not line.lstrip().startswith('#')]
+    paragraphs = '\n'.join(lines).split('\n\n')
+    return [' '.join(p.split()) for p in paragraphs if p.strip()]
+
+
+class KnowledgeBase:
+    """BM25 inverted index over knowledge snippets"""
+
+    def __init__(self, snippets=(), k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.snippets = list(snippets)
+        self._tokens = [estimate_tokens(s) for s in self.snippets]
+        self._postings = defaultdict(list)   # term -> [(snippet index, term frequency)]
+        self._lengths = []
+        for i, snippet in enumerate(self.snippets):
+            terms = tokenize(snippet)
+            self._lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings[term].append((i, tf))
+        count = len(self.snippets)
+        self._avg_length = sum(self._lengths) / count if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @classmethod
+    def from_file(cls, path):
+        """Load and index a facts file; a missing file gives an empty knowledge base"""
+        try:
+            snippets = load_snippets(path)
+        except FileNotFoundError:
+            logger.warning("Knowledge base file not found: %s", path)
+            snippets = []
+        logger.info("Indexed %d knowledge snippets from %s", len(snippets), path)
+        return cls(snippets)
+
+    def __len__(self):
+        return len(self.snippets)
+
+    def search(self, query, k=3):
+        """Indexes of the top-k snippets for query, best first"""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self._postings[term]:
+                norm = 1 - self.b + self.b * self._lengths[i] / self._avg_length
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return sorted(scores, key=lambda i: (-scores[i], i))[:k]
+
+    def context(self, query, k=3, token_budget=200):
+        """Top-k relevant snippets joined for the prompt, within token_budget"""
+        selected = []
+        used = 0
+        for i in self.search(query, k):
+            if used + self._tokens[i] > token_budget:
+                continue
+            selected.append(self.snippets[i])
+            used += self._tokens[i]
+        return '\n'.join(f'- {snippet}' for snippet in selected)
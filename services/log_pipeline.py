@@ -0,0 +1,204 @@
+# services/log_pipeline.py
+"""
+Non-blocking structured logging.
+
+Request threads only put LogRecords on a bounded queue; a QueueListener
+thread formats them as JSON lines and writes them to a rotating file, so a
+slow or stalled disk never shows up as webhook latency. Messages are
+formatted lazily on the writer thread, records below WARNING can be
+sampled per level before they are queued, and a full queue drops records
+(and counts them) instead of blocking.
+
+Every record carries the CallSid of the request that logged it (set with
+bind_call_sid), so one call's lines can be pulled out with a single grep.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+
+_call_sid = contextvars.ContextVar('call_sid', default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'call_sid'}
+
+
+def bind_call_sid(call_sid):
+    """Tag every record logged from this thread/task with call_sid; returns a reset token"""
+    return _call_sid.set(call_sid or None)
+
+
+def reset_call_sid(token):
+    _call_sid.reset(token)
+
+
+def parse_sample_rates(spec):
+    """'DEBUG=0.1,INFO=0.5' -> {10: 0.1, 20: 0.5}; WARNING and above are never sampled"""
+    rates = {}
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition('=')
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in LOG_SAMPLE_RATES: '{name}'")
+        if level < logging.WARNING:
+            rates[level] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records at the sampled levels"""
+
+    def __init__(self, rates=None, rand=random.random):
+        super().__init__()
+        self.rates = rates or {}
+        self._rand = rand
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+        return rate is None or self._rand() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, call_sid and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        call_sid = getattr(record, 'call_sid', None)
+        if call_sid:
+            entry['call_sid'] = call_sid
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats the message on the calling thread; this one
+    only stamps the CallSid and enqueues. A full queue drops the record.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.call_sid = _call_sid.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """The queue handler installed on the root logger and its background writer"""
+
+    def __init__(self, handler, listener, max_queue=10000):
+        self.handler = handler
+        self.listener = listener
+        self.max_queue = max_queue
+
+    def restart_after_fork(self):
+        """The writer thread does not survive fork: give the child its own queue and writer"""
+        if self.listener is None:
+            return
+        self.handler.queue = queue.Queue(maxsize=self.max_queue)
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, *self.listener.handlers, respect_handler_level=False
+        )
+        self.listener.start()
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def stop(self):
+        """Flush queued records and stop the writer thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            for target in logging.getLogger().handlers:
+                if target is self.handler:
+                    logging.getLogger().removeHandler(target)
+            self.handler.close()
+
+
+def configure_logging(log_file='logs/voice_caller.log', level=logging.INFO, json_lines=True,
+                      max_bytes=10 * 1024 * 1024, backup_count=5, sample_rates=None,
+                      max_queue=10000):
+    """
+    Route all logging through a queue to a rotating file writer thread.
+
+    Replaces any handlers already on the root logger and returns the LogPipeline.
+    Size-based rotation is per process; with prefork workers set max_bytes=0
+    and rotate externally (e.g. logrotate with copytruncate).
+    """
+    directory = os.path.dirname(log_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    if json_lines:
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(call_sid)s - %(message)s'))
+
+    log_queue = queue.Queue(maxsize=max_queue)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rates))
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    listener.start()
+
+    pipeline = LogPipeline(handler, listener, max_queue)
+    atexit.register(pipeline.stop)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=pipeline.restart_after_fork)
+    return pipeline
+
+
+class RequestLog:
+    """Start time and CallSid binding for the one summary line logged per webhook request"""
+
+    __slots__ = ('started', 'token')
+
+    def __init__(self, call_sid):
+        self.started = time.perf_counter()
+        self.token = bind_call_sid(call_sid)
+
+    def finish(self, logger, route, method, status, **fields):
+        """Log the request summary line and unbind the CallSid"""
+        logger.info(
+            '%s %s -> %s', method, route, status,
+            extra={'event': 'request', 'route': route, 'method': method, 'status': status,
+                   'duration_ms': round((time.perf_counter() - self.started) * 1000, 1), **fields}
+        )
+        reset_call_sid(self.token)
@@ -0,0 +1,269 @@
+# services/metrics.py
+"""
+Prometheus-style metrics without the prometheus_client dependency.
+
+Every labelled series is created once (known label values up front) and
+keeps its values in preallocated slots guarded by its own lock. Callers
+hold on to series handles, so an observation is a bisect plus a few adds
+under an uncontended lock, with no label lookups or per-call containers.
+Scraping copies each series under its lock and formats outside it, so a
+slow scrape never holds up live calls.
+
+Each process keeps its own registry; with prefork workers every worker
+reports its own numbers.
+"""
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; tuned for webhook latencies (Twilio gives up at 15s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0)
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _CounterSeries:
+    __slots__ = ('_lock', '_value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    @property
+    def value(self):
+        with self._lock:
+            return self._value
+
+
+class _HistogramSeries:
+    __slots__ = ('_lock', '_bounds', '_counts', '_sum')
+
+    def __init__(self, bounds):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self._sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts), self._sum
+
+    @property
+    def count(self):
+        with self._lock:
+            return sum(self._counts)
+
+
+class Metric:
+    """A metric family with one series per label combination"""
+
+    def __init__(self, kind, name, documentation, labelnames=(), labelvalues=(), buckets=None):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+        self._lock = threading.Lock()
+        self._series = {}
+        for values in (labelvalues if self.labelnames else [()]):
+            self.labels(*values)
+
+    def labels(self, *values):
+        """
+        The series for these label values, created on first use.
+
+        Look it up once and keep the handle for the hot path.
+        """
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                series = self._series.get(values)
+                if series is None:
+                    series = _HistogramSeries(self.buckets) if self.kind == 'histogram' else _CounterSeries()
+                    self._series[values] = series
+        return series
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, series in list(self._series.items()):
+            if self.kind != 'histogram':
+                lines.append(f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}')
+                continue
+            counts, total = series.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}')
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(round(total, 6))}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=(), labelvalues=()):
+        return self._register(Metric('counter', name, documentation, labelnames, labelvalues))
+
+    def gauge(self, name, documentation, labelnames=(), labelvalues=()):
+        return self._register(Metric('gauge', name, documentation, labelnames, labelvalues))
+
+    def histogram(self, name, documentation, labelnames=(), labelvalues=(), buckets=LATENCY_BUCKETS):
+        return self._register(Metric('histogram', name, documentation, labelnames, labelvalues, buckets))
+
+    def render(self):
+        """Text exposition format for a /metrics scrape"""
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+class RouteMetrics:
+    """Latency histogram, error counter and in-flight gauge handles for one route"""
+
+    __slots__ = ('latency', 'errors', 'in_flight')
+
+    def __init__(self, latency, errors, in_flight):
+        self.latency = latency
+        self.errors = errors
+        self.in_flight = in_flight
+
+    def error(self):
+        self.errors.inc()
+
+    def instrument(self, handler):
+        """Decorator timing a sync or async route handler and counting uncaught errors"""
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def timed_async(*args, **kwargs):
+                self.in_flight.inc()
+                started = time.perf_counter()
+                try:
+                    return await handler(*args, **kwargs)
+                except BaseException:
+                    self.errors.inc()
+                    raise
+                finally:
+                    self.latency.observe(time.perf_counter() - started)
+                    self.in_flight.dec()
+            return timed_async
+
+        @functools.wraps(handler)
+        def timed(*args, **kwargs):
+            self.in_flight.inc()
+            started = time.perf_counter()
+            try:
+                return handler(*args, **kwargs)
+            except BaseException:
+                self.errors.inc()
+                raise
+            finally:
+                self.latency.observe(time.perf_counter() - started)
+                self.in_flight.dec()
+        return timed
+
+
+# ===== VOICE CALLER METRICS =====
+ROUTES = ('outbound', 'process_speech', 'process_followup', 'call_status')
+OPENAI_TIERS = ('fast', 'smart')
+OPENAI_OUTCOMES = ('ok', 'empty', 'rate_limited', 'circuit_open', 'deadline', 'error')
+REPROMPT_REASONS = ('no_input', 'low_confidence')
+
+registry = MetricsRegistry()
+
+route_latency = registry.histogram(
+    'voice_route_latency_seconds', 'Webhook handling time by route',
+    ('route',), [(r,) for r in ROUTES]
+)
+route_errors = registry.counter(
+    'voice_route_errors_total', 'Webhook requests answered with an error response',
+    ('route',), [(r,) for r in ROUTES]
+)
+route_in_flight = registry.gauge(
+    'voice_route_in_flight', 'Webhook requests currently being handled',
+    ('route',), [(r,) for r in ROUTES]
+)
+openai_latency = registry.histogram(
+    'voice_openai_latency_seconds', 'OpenAI call time including retries, by model tier',
+    ('tier',), [(t,) for t in OPENAI_TIERS]
+)
+openai_calls = registry.counter(
+    'voice_openai_calls_total', 'OpenAI calls by outcome',
+    ('outcome',), [(o,) for o in OPENAI_OUTCOMES]
+)
+openai_retries = registry.counter(
+    'voice_openai_retries_total', 'OpenAI attempts retried by the call policy'
+).labels()
+openai_coalesced = registry.counter(
+    'voice_openai_coalesced_total', 'Answers shared from an identical OpenAI call already in flight'
+).labels()
+speculative_wasted_tokens = registry.counter(
+    'voice_speculative_wasted_tokens_total', 'Tokens spent on speculative answers that were never used',
+    ('type',), [('prompt',), ('completion',)]
+)
+reprompts = registry.counter(
+    'voice_reprompts_total', 'Callers asked to repeat themselves',
+    ('reason',), [(r,) for r in REPROMPT_REASONS]
+)
+
+# Per-route handles, so the hot path never builds label tuples
+route_metrics = {
+    name: RouteMetrics(route_latency.labels(name), route_errors.labels(name), route_in_flight.labels(name))
+    for name in ROUTES
+}
+openai_outcomes = {outcome: openai_calls.labels(outcome) for outcome in OPENAI_OUTCOMES}
+reprompt_reasons = {reason: reprompts.labels(reason) for reason in REPROMPT_REASONS}
+speculative_waste = {kind: speculative_wasted_tokens.labels(kind) for kind in ('prompt', 'completion')}
+_openai_tier_latency = {tier: openai_latency.labels(tier) for tier in OPENAI_TIERS}
+
+
+def record_openai_call(tier_name, seconds, outcome, retries=0):
+    """Record one OpenAI call (all attempts) for the given tier and outcome"""
+    series = _openai_tier_latency.get(tier_name)
+    if series is None:
+        # Tiers from a custom MODEL_TIERS table get their series on first use
+        series = _openai_tier_latency[tier_name] = openai_latency.labels(tier_name)
+    series.observe(seconds)
+    openai_outcomes[outcome].inc()
+    if retries:
+        openai_retries.inc(retries)
@@ -0,0 +1,106 @@
+# services/model_router.py
+"""
+Routes each caller utterance to a model tier.
+
+Short factual questions (price, bedrooms, location...) go to a fast, cheap
+model; longer or open-ended ones go to GPT-4. Classification is a cheap
+local keyword/length check, and per-tier counts and latencies are kept so
+the latency win can be verified.
+"""
+import json
+import re
+import threading
+
+DEFAULT_TIERS = {
+    'fast': {'model': 'gpt-4o-mini', 'max_tokens': 100, 'timeout': 6.0},
+    'smart': {'model': 'gpt-4', 'max_tokens': 150, 'timeout': 12.0},
+}
+
+# Topics a small model answers as well as GPT-4
+SIMPLE_TOPICS = re.compile(
+    r"\b(price|prices|pricing|cost|costs|how much|cheap|expensive|bedroom|bedrooms|bed|beds|"
+    r"located|location|where|address|area|neighbou?rhood|dallas|amenities|amenity|pool|gym|"
+    r"parking|pet|pets|contact|phone|call|email|sales|office|hours|open|available|availability|"
+    r"size|square feet|sq ft|when|move in|ready)\b"
+)
+
+# Signals that the question needs reasoning or a careful answer
+COMPLEX_MARKERS = re.compile(
+    r"\b(why|explain|compare|comparison|versus|vs|difference|better|recommend|should i|"
+    r"financ\w*|mortgage|loan|interest|invest\w*|return|roi|tax|taxes|hoa|contract|"
+    r"negotiat\w*|legal|calculate|if i|what if|pros|cons)\b"
+)
+
+
+class ModelTier:
+    __slots__ = ('name', 'model', 'max_tokens', 'timeout')
+
+    def __init__(self, name, model, max_tokens, timeout):
+        self.name = name
+        self.model = model
+        self.max_tokens = int(max_tokens)
+        self.timeout = float(timeout)
+
+    def __repr__(self):
+        return f"ModelTier({self.name!r}, {self.model!r})"
+
+
+def load_tiers(tiers_json=None):
+    """Build the tier table from MODEL_TIERS JSON, falling back to DEFAULT_TIERS"""
+    table = json.loads(tiers_json) if tiers_json else DEFAULT_TIERS
+    return {name: ModelTier(name, **settings) for name, settings in table.items()}
+
+
+def classify_utterance(user_input, max_simple_words=14):
+    """Return 'fast' for short simple questions, 'smart' for everything else"""
+    text = (user_input or '').lower()
+    if not text or len(text.split()) > max_simple_words:
+        return 'smart'
+    if COMPLEX_MARKERS.search(text):
+        return 'smart'
+    if SIMPLE_TOPICS.search(text):
+        return 'fast'
+    return 'smart'
+
+
+class ModelRouter:
+    """Picks a ModelTier per utterance and tracks per-tier latency"""
+
+    def __init__(self, tiers=None, default_tier='smart', enabled=True):
+        self.tiers = tiers or load_tiers()
+        if default_tier not in self.tiers:
+            raise ValueError(f"Default tier '{default_tier}' is not in the tier table")
+        self.default_tier = default_tier
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {name: {'turns': 0, 'total_ms': 0.0, 'max_ms': 0.0} for name in self.tiers}
+
+    def route(self, user_input, has_history=False):
+        """Choose the tier for an utterance"""
+        if not self.enabled:
+            return self.tiers[self.default_tier]
+        name = classify_utterance(user_input)
+        if has_history and name == 'fast' and len((user_input or '').split()) <= 3:
+            # "And the other one?" style follow-ups lean on context
+            name = self.default_tier
+        return self.tiers.get(name, self.tiers[self.default_tier])
+
+    def record(self, tier_name, latency_ms):
+        """Record how long a turn served by tier_name took"""
+        with self._lock:
+            stats = self._stats.setdefault(tier_name, {'turns': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['turns'] += 1
+            stats['total_ms'] += latency_ms
+            stats['max_ms'] = max(stats['max_ms'], latency_ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'model': self.tiers[name].model if name in self.tiers else None,
+                    'turns': s['turns'],
+                    'avg_ms': round(s['total_ms'] / s['turns'], 1) if s['turns'] else 0.0,
+                    'max_ms': round(s['max_ms'], 1),
+                }
+                for name, s in self._stats.items()
+            }
@@ -0,0 +1,117 @@
+# services/prefork.py
+"""
+Prefork process manager for production serving.
+
+The master binds one listening socket, forks N workers that all accept on
+it, and restarts any worker that exits unexpectedly (with backoff if a
+worker keeps crashing on boot). Each worker runs `warm_up` before it
+starts serving so the first real call never pays for client setup.
+"""
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer:
+    """Master process supervising a pool of forked workers on a shared socket"""
+
+    def __init__(self, serve_worker, workers=2, host='0.0.0.0', port=5000,
+                 warm_up=None, backlog=2048, min_uptime=5.0, max_restart_delay=30.0):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("Prefork serving needs os.fork (not available on this platform)")
+        self.serve_worker = serve_worker
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.warm_up = warm_up
+        self.backlog = backlog
+        self.min_uptime = min_uptime
+        self.max_restart_delay = max_restart_delay
+        self.sock = None
+        self._children = {}      # pid -> (slot, started_at)
+        self._crashes = {}       # slot -> consecutive quick crashes
+        self._stopping = False
+
+    def bind(self):
+        """Create the shared listening socket"""
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        self.sock = sock
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def run(self):
+        """Bind, fork the workers and supervise them until SIGINT/SIGTERM"""
+        if self.sock is None:
+            self.bind()
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        logger.info(f"Prefork master {os.getpid()} listening on {self.host}:{self.port} "
+                    f"with {self.workers} workers")
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot, started_at = self._children.pop(pid, (None, None))
+            if slot is None or self._stopping:
+                continue
+
+            code = os.waitstatus_to_exitcode(status)
+            uptime = time.monotonic() - started_at
+            logger.error("Worker %s (slot %s) exited with %s after %.1fs, restarting", pid, slot, code, uptime)
+            self._crashes[slot] = self._crashes.get(slot, 0) + 1 if uptime < self.min_uptime else 0
+            if self._crashes[slot]:
+                time.sleep(min(self.max_restart_delay, 0.5 * 2 ** (self._crashes[slot] - 1)))
+            if not self._stopping:
+                self._spawn(slot)
+
+        self.sock.close()
+        logger.info("Prefork master stopped")
+
+    def _spawn(self, slot):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = (slot, time.monotonic())
+            return pid
+
+        # Worker process
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        code = 0
+        try:
+            if self.warm_up:
+                self.warm_up()
+            logger.info(f"Worker {os.getpid()} (slot {slot}) accepting connections")
+            self.serve_worker(self.sock)
+        except Exception as e:
+            logger.error("Worker %s failed: %s", os.getpid(), e, exc_info=True)
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _handle_stop(self, signum, frame):
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info(f"Prefork master received signal {signum}, stopping workers")
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,151 @@
+# services/sessions.py
+"""
+Per-call conversation history.
+
+Keeps compact turn records for each CallSid so follow-up questions carry
+context, while bounding memory (session count, turns per session, total
+characters) and prompt size (token budget for replayed history).
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+class Turn:
+    __slots__ = ('role', 'content', 'tokens')
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+        self.tokens = estimate_tokens(content)
+
+
+class Session:
+    __slots__ = ('turns', 'chars', 'last_active')
+
+    def __init__(self, max_turns):
+        self.turns = deque(maxlen=max_turns)
+        self.chars = 0
+        self.last_active = time.monotonic()
+
+
+class SessionStore:
+    """In-memory conversation sessions keyed by CallSid, LRU ordered"""
+
+    def __init__(self, max_sessions=1000, max_turns=20, max_turn_chars=1000,
+                 max_total_chars=2_000_000, idle_ttl=900, token_budget=600):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.max_turn_chars = max_turn_chars
+        self.max_total_chars = max_total_chars
+        self.idle_ttl = idle_ttl
+        self.token_budget = token_budget
+        self._sessions = OrderedDict()
+        self._total_chars = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def add_exchange(self, call_sid, user_input, answer):
+        """Record a caller question and the assistant's answer"""
+        if not call_sid or not user_input or not answer:
+            return
+        with self._lock:
+            session = self._sessions.get(call_sid)
+            if session is None:
+                self._evict_idle()
+                session = self._sessions[call_sid] = Session(self.max_turns)
+            else:
+                self._sessions.move_to_end(call_sid)
+            session.last_active = time.monotonic()
+
+            for role, content in (('user', user_input), ('assistant', answer)):
+                content = content[:self.max_turn_chars]
+                if len(session.turns) == session.turns.maxlen:
+                    dropped = session.turns[0]
+                    session.chars -= len(dropped.content)
+                    self._total_chars -= len(dropped.content)
+                session.turns.append(Turn(role, content))
+                session.chars += len(content)
+                self._total_chars += len(content)
+
+            self._enforce_caps(keep=call_sid)
+
+    def history(self, call_sid, token_budget=None):
+        """
+        Return recent turns as chat messages, oldest first.
+
+        Turns are taken newest-first until the token budget is spent, so the
+        replayed history never grows past the budget however long the call.
+        """
+        if not call_sid:
+            return []
+        budget = self.token_budget if token_budget is None else token_budget
+        with self._lock:
+            session = self._sessions.get(call_sid)
+            if session is None:
+                return []
+            if time.monotonic() - session.last_active > self.idle_ttl:
+                self._drop(call_sid)
+                return []
+            selected = []
+            for turn in reversed(session.turns):
+                if turn.tokens > budget:
+                    break
+                budget -= turn.tokens
+                selected.append({"role": turn.role, "content": turn.content})
+        selected.reverse()
+        # Never start the replayed history with a dangling assistant answer
+        if selected and selected[0]['role'] == 'assistant':
+            selected.pop(0)
+        return selected
+
+    def end(self, call_sid):
+        """Forget a call's session, e.g. when the call hangs up"""
+        with self._lock:
+            if call_sid in self._sessions:
+                self._drop(call_sid)
+
+    def evict_idle(self):
+        """Drop sessions idle for longer than idle_ttl; returns how many were dropped"""
+        with self._lock:
+            return self._evict_idle()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'total_chars': self._total_chars,
+                'evictions': self.evictions,
+            }
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        idle = []
+        # Sessions are kept in last-active order, so stop at the first fresh one
+        for sid, session in self._sessions.items():
+            if session.last_active >= cutoff:
+                break
+            idle.append(sid)
+        for sid in idle:
+            self._drop(sid)
+        self.evictions += len(idle)
+        return len(idle)
+
+    def _enforce_caps(self, keep):
+        """Evict least recently used sessions until both caps hold"""
+        while (len(self._sessions) > self.max_sessions
+               or self._total_chars > self.max_total_chars) and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, call_sid):
+        session = self._sessions.pop(call_sid)
+        self._total_chars -= session.chars
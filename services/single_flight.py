@@ -0,0 +1,135 @@
+# services/single_flight.py
+"""
+Single-flight coalescing of identical concurrent upstream calls.
+
+When many callers ask the same question at once (a campaign's opening
+question), the first request for a key makes the upstream call and every
+identical request that arrives while it is in flight waits for that
+result instead of sending its own. Only in-flight calls are shared: once
+the call finishes the key is released, and repeats are the answer cache's
+job.
+
+Each waiter has its own deadline and gets DeadlineExceeded when it runs
+out, without affecting the shared call. If the call raises, every waiter
+gets the same exception, so rate limits and an open circuit are handled
+by each caller exactly as if it had made the call itself.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from services.call_policy import DeadlineExceeded
+
+
+class _Stats:
+    """Counters shared by the thread and asyncio variants"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._flights = {}   # key -> the in-flight call's Future or Task
+        self.calls = 0       # upstream calls made (one per flight)
+        self.coalesced = 0   # requests answered from another request's call
+        self.timeouts = 0    # waiters whose own deadline ran out first
+
+    def stats(self):
+        requests = self.calls + self.coalesced
+        return {
+            'enabled': self.enabled,
+            'in_flight': len(self._flights),
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'timeouts': self.timeouts,
+            'coalesced_rate': round(self.coalesced / requests, 3) if requests else 0.0,
+        }
+
+
+class SingleFlight(_Stats):
+    """Coalesces identical concurrent calls made from threads"""
+
+    def __init__(self, enabled=True):
+        super().__init__(enabled)
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None, info=None):
+        """
+        Return fn(), or the result of the identical call already in flight for key.
+
+        If info is a dict, info['coalesced'] is set when this caller shares
+        another caller's call. A waiter gives up after `timeout` seconds; the
+        caller that runs fn is bounded by fn's own deadline.
+        """
+        if not self.enabled or key is None:
+            return fn()
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            if info is not None:
+                info['coalesced'] = True
+            return self._wait(future, timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _wait(self, future, timeout):
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise DeadlineExceeded(f"No shared answer within {timeout:.1f}s") from None
+
+    def _finish(self, key):
+        with self._lock:
+            self._flights.pop(key, None)
+
+
+class AsyncSingleFlight(_Stats):
+    """Coalesces identical concurrent calls made from coroutines on one event loop"""
+
+    async def do(self, key, coro_fn, timeout=None, info=None):
+        """
+        Async counterpart of SingleFlight.do.
+
+        The call runs as its own task, so a caller that is cancelled (e.g. Twilio
+        hung up) or times out does not cancel it for the others.
+        """
+        if not self.enabled or key is None:
+            return await coro_fn()
+        task = self._flights.get(key)
+        if task is not None:
+            self.coalesced += 1
+            if info is not None:
+                info['coalesced'] = True
+        else:
+            task = self._flights[key] = asyncio.ensure_future(coro_fn())
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.calls += 1
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            if task.done() and not task.cancelled():
+                # The call finished in the same loop iteration the deadline ran out
+                return task.result()
+            self.timeouts += 1
+            raise DeadlineExceeded(f"No shared answer within {time.monotonic() - started:.1f}s") from None
+
+    def _finish(self, key, task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Mark the outcome as retrieved even if every waiter gave up on it
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,159 @@
+# services/speculative.py
+"""
+Speculative LLM requests started from Twilio partial transcripts.
+
+Twilio posts partial speech results while the caller is still talking.
+Once a partial looks stable we start the completion early; if the final
+SpeechResult matches, process_speech reuses the in-flight or finished
+request instead of starting from scratch.
+
+A speculation that is superseded by a newer partial, or does not match the
+final transcript, is cancelled if it has not started yet; one already
+running is handed to waste_fn when it finishes, so its spend is counted.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.answer_cache import normalize_utterance
+
+logger = logging.getLogger(__name__)
+
+
+class _Partial:
+    __slots__ = ('key', 'text', 'repeats', 'updated', 'speculated_key', 'future')
+
+    def __init__(self):
+        self.key = ''
+        self.text = ''
+        self.repeats = 0
+        self.updated = time.monotonic()
+        self.speculated_key = None
+        self.future = None
+
+
+class SpeculativeAnswers:
+    """
+    Latest partial transcript and speculative answer per call.
+
+    answer_fn(text, call_sid) produces the answer; it runs in a worker pool.
+    Partials for which skip_fn(text) is true are never speculated on, and
+    waste_fn(result) gets the result of every speculation that ran but was
+    not used.
+    """
+
+    def __init__(self, answer_fn, max_workers=4, min_words=3, stable_repeats=2, ttl=120,
+                 enabled=True, skip_fn=None, waste_fn=None):
+        self.answer_fn = answer_fn
+        self.skip_fn = skip_fn
+        self.waste_fn = waste_fn
+        self.enabled = enabled
+        self.min_words = min_words
+        self.stable_repeats = stable_repeats
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='speculative-answer'
+        )
+        self._partials = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.reused = 0
+        self.discarded = 0
+        self.cancelled = 0
+
+    def record_partial(self, call_sid, stable_text, unstable_text=''):
+        """
+        Store the latest partial for call_sid and speculate once it is stable.
+
+        A partial counts as stable when Twilio reports no unstable tail, or
+        when the same text arrives `stable_repeats` times in a row.
+        """
+        stable_text = (stable_text or '').strip()
+        unstable_text = (unstable_text or '').strip()
+        text = f'{stable_text} {unstable_text}'.strip()
+        key = normalize_utterance(text)
+
+        with self._lock:
+            partial = self._partials.get(call_sid)
+            if partial is None:
+                self._purge_expired()
+                partial = self._partials[call_sid] = _Partial()
+
+            partial.repeats = partial.repeats + 1 if key == partial.key else 1
+            partial.key = key
+            partial.text = text
+            partial.updated = time.monotonic()
+
+            stable = not unstable_text or partial.repeats >= self.stable_repeats
+            if (not self.enabled or not stable or len(key.split()) < self.min_words
+                    or key == partial.speculated_key):
+                return False
+            if self.skip_fn is not None and self.skip_fn(text):
+                return False
+
+            if partial.future is not None:
+                self._discard(partial.future)
+            partial.speculated_key = key
+            partial.future = self._executor.submit(self.answer_fn, text, call_sid)
+            self.started += 1
+
+        logger.debug("Speculative AI request for call %s", call_sid)
+        return True
+
+    def claim(self, call_sid, final_text):
+        """
+        Return the speculative Future if it matches the final transcript.
+
+        The call's partial state is dropped either way.
+        """
+        if not call_sid:
+            return None
+        with self._lock:
+            partial = self._partials.pop(call_sid, None)
+            if partial is None or partial.future is None:
+                return None
+            if partial.speculated_key != normalize_utterance(final_text):
+                self._discard(partial.future)
+                return None
+            self.reused += 1
+            return partial.future
+
+    def latest_partial(self, call_sid):
+        """Latest partial transcript text for call_sid, or None"""
+        with self._lock:
+            partial = self._partials.get(call_sid)
+            return partial.text if partial else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active_calls': len(self._partials),
+                'started': self.started,
+                'reused': self.reused,
+                'discarded': self.discarded,
+                'cancelled': self.cancelled,
+            }
+
+    def _discard(self, future):
+        """Cancel an unused speculation, or account for it once it finishes (caller holds the lock)"""
+        self.discarded += 1
+        if future.cancel():
+            self.cancelled += 1
+        elif self.waste_fn is not None:
+            future.add_done_callback(self._wasted)
+
+    def _wasted(self, future):
+        if future.exception() is not None:
+            return
+        try:
+            self.waste_fn(future.result())
+        except Exception as e:
+            logger.error("Recording a wasted speculative answer failed: %s", e)
+
+    def _purge_expired(self):
+        """Drop calls whose last partial is older than ttl (caller holds the lock)"""
+        cutoff = time.monotonic() - self.ttl
+        for sid in [sid for sid, p in self._partials.items() if p.updated < cutoff]:
+            del self._partials[sid]
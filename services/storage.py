@@ -0,0 +1,259 @@
+# services/storage.py
+"""
+Durable call transcripts in SQLite.
+
+Turns are queued by the webhook and written in batches by a background
+writer thread (write-behind), so a slow disk never adds webhook latency.
+Each worker process keeps its own connections; they are reopened after
+a fork.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = 'sqlite:///data/voice_caller.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS call_turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_sid TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    user_input TEXT,
+    confidence REAL,
+    answer TEXT,
+    model TEXT,
+    tier TEXT,
+    latency_ms REAL,
+    retries INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cost_usd REAL
+);
+CREATE INDEX IF NOT EXISTS idx_call_turns_call_sid ON call_turns (call_sid, id);
+"""
+
+# Columns added after the first release of the schema: (name, type)
+ADDED_COLUMNS = (
+    ('tier', 'TEXT'),
+    ('prompt_tokens', 'INTEGER'),
+    ('completion_tokens', 'INTEGER'),
+    ('cost_usd', 'REAL'),
+)
+
+INSERT_TURN = (
+    "INSERT INTO call_turns "
+    "(call_sid, created_at, user_input, confidence, answer, model, tier, latency_ms, retries, "
+    "prompt_tokens, completion_tokens, cost_usd) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+TURN_COLUMNS = (
+    "created_at, user_input, confidence, answer, model, tier, latency_ms, retries, "
+    "prompt_tokens, completion_tokens, cost_usd"
+)
+
+CALL_TOTALS = (
+    "SELECT call_sid, COUNT(*) AS turns, MIN(created_at) AS started_at, "
+    "COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens, "
+    "COALESCE(SUM(completion_tokens), 0) AS completion_tokens, "
+    "ROUND(COALESCE(SUM(cost_usd), 0), 6) AS cost_usd, "
+    "ROUND(AVG(latency_ms), 1) AS avg_latency_ms, MAX(latency_ms) AS max_latency_ms, "
+    "COALESCE(SUM(retries), 0) AS retries "
+    "FROM call_turns"
+)
+
+_STOP = object()
+
+
+def sqlite_path_from_url(database_url):
+    """Turn sqlite:///relative.db or sqlite:////abs/path.db into a filesystem path"""
+    parsed = urlparse(database_url or DEFAULT_DATABASE_URL)
+    if parsed.scheme != 'sqlite':
+        raise ValueError(f"Unsupported DATABASE_URL scheme '{parsed.scheme}': only sqlite is supported")
+    path = parsed.path[1:] if parsed.path.startswith('/') else parsed.path
+    if not path or path == ':memory:':
+        raise ValueError("DATABASE_URL must point at a SQLite file")
+    return path
+
+
+def connect(db_path):
+    """Open a SQLite connection tuned for many small concurrent writers"""
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+class TranscriptStore:
+    """Write-behind store of call turns with a per-call transcript query"""
+
+    def __init__(self, database_url=None, batch_size=50, idle_wait=1.0, max_queue=10000):
+        self.db_path = sqlite_path_from_url(database_url)
+        self.batch_size = batch_size
+        self.idle_wait = idle_wait
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = None
+        self._queue = None
+        self._writer = None
+        self._schema_ready = False
+
+    def record_turn(self, call_sid, user_input, answer, confidence=None,
+                    model=None, tier=None, latency_ms=None, retries=None,
+                    prompt_tokens=None, completion_tokens=None, cost_usd=None):
+        """Queue a turn for writing; never blocks the caller"""
+        self._ensure_writer()
+        row = (call_sid, time.time(), user_input, confidence, answer, model, tier, latency_ms, retries,
+               prompt_tokens, completion_tokens, cost_usd)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Transcript queue full, dropped turn for call %s", call_sid)
+
+    def flush(self, timeout=None):
+        """Block until every queued turn has been written"""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        if timeout is None:
+            self._queue.join()
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def get_transcript(self, call_sid):
+        """Return every stored turn for call_sid in order, as dicts"""
+        return self._query(
+            f"SELECT {TURN_COLUMNS} FROM call_turns WHERE call_sid = ? ORDER BY id",
+            (call_sid,)
+        )
+
+    def get_call_usage(self, call_sid):
+        """Token, cost, latency and retry totals for one call, or None if it has no turns"""
+        rows = self._query(f"{CALL_TOTALS} WHERE call_sid = ? GROUP BY call_sid", (call_sid,))
+        return rows[0] if rows else None
+
+    def usage_summary(self, limit=10, since=None):
+        """
+        Overall totals plus the most expensive calls and the slowest turns,
+        optionally only counting turns created after the `since` timestamp.
+        """
+        since = since or 0
+        totals = self._query(
+            "SELECT COUNT(DISTINCT call_sid) AS calls, COUNT(*) AS turns, "
+            "COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens, "
+            "COALESCE(SUM(completion_tokens), 0) AS completion_tokens, "
+            "ROUND(COALESCE(SUM(cost_usd), 0), 6) AS cost_usd, "
+            "ROUND(AVG(latency_ms), 1) AS avg_latency_ms "
+            "FROM call_turns WHERE created_at >= ?",
+            (since,)
+        )[0]
+        return {
+            'totals': totals,
+            'top_calls_by_cost': self._query(
+                f"{CALL_TOTALS} WHERE created_at >= ? GROUP BY call_sid "
+                "ORDER BY cost_usd DESC, prompt_tokens DESC LIMIT ?",
+                (since, limit)
+            ),
+            'slowest_turns': self._query(
+                f"SELECT call_sid, {TURN_COLUMNS} FROM call_turns WHERE created_at >= ? "
+                "AND latency_ms IS NOT NULL ORDER BY latency_ms DESC LIMIT ?",
+                (since, limit)
+            ),
+        }
+
+    def close(self):
+        """Flush pending turns and stop the writer thread"""
+        if self._writer is not None and self._pid == os.getpid() and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5)
+        self._writer = None
+        self._queue = None
+
+    def _ensure_writer(self):
+        pid = os.getpid()
+        if self._pid == pid and self._writer is not None:
+            return
+        with self._lock:
+            if self._pid == pid and self._writer is not None:
+                return
+            # First use, or first use after fork: threads and connections don't survive fork
+            self._pid = pid
+            self._local = threading.local()
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._writer = threading.Thread(
+                target=self._write_loop,
+                args=(self._queue,),
+                name='transcript-writer',
+                daemon=True
+            )
+            self._writer.start()
+
+    def _init_schema(self, conn):
+        if not self._schema_ready:
+            conn.executescript(SCHEMA)
+            # Databases created before a column existed get it added in place
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(call_turns)")}
+            for column, column_type in ADDED_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE call_turns ADD COLUMN {column} {column_type}")
+            conn.commit()
+            self._schema_ready = True
+
+    def _query(self, sql, params=()):
+        cursor = self._reader().execute(sql, params)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = connect(self.db_path)
+            self._init_schema(conn)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _write_loop(self, pending):
+        conn = connect(self.db_path)
+        self._init_schema(conn)
+        stop = False
+        while not stop:
+            try:
+                first = pending.get(timeout=self.idle_wait)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [row for row in batch if row is not _STOP]
+            stop = len(rows) != len(batch)
+            try:
+                if rows:
+                    with conn:
+                        conn.executemany(INSERT_TURN, rows)
+                    self.written += len(rows)
+            except sqlite3.Error as e:
+                self.dropped += len(rows)
+                logger.error("Failed to write %d transcript turn(s): %s", len(rows), e)
+            finally:
+                for _ in batch:
+                    pending.task_done()
+        conn.close()
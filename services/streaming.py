@@ -0,0 +1,132 @@
+# services/streaming.py
+"""
+Sentence-by-sentence delivery of streamed LLM completions.
+
+A background thread consumes the completion stream for each call and
+splits it into complete sentences. The webhook speaks the first sentence
+as soon as it exists and picks up the rest through a chained redirect.
+"""
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace.
+# Requiring whitespace keeps prices like "$180.000" and decimals in one piece.
+_SENTENCE_END_RE = re.compile(r'[.!?]+["\')\]]*\s+')
+
+
+def split_sentences(buffer):
+    """Split buffer into (complete_sentences, remainder)"""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(buffer):
+        sentence = buffer[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, buffer[start:]
+
+
+class _StreamState:
+    __slots__ = ('sentences', 'finished', 'failed', 'created', 'condition')
+
+    def __init__(self):
+        self.sentences = []
+        self.finished = False
+        self.failed = False
+        self.created = time.monotonic()
+        self.condition = threading.Condition()
+
+
+class StreamingAnswers:
+    """Buffers streamed answer sentences per call until they are spoken"""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def start(self, call_sid, chunks, on_complete=None):
+        """Consume the text chunks iterator in the background for call_sid"""
+        state = _StreamState()
+        with self._lock:
+            self._purge_expired()
+            self._streams[call_sid] = state
+        thread = threading.Thread(
+            target=self._consume,
+            args=(call_sid, state, chunks, on_complete),
+            name=f'stream-{call_sid}',
+            daemon=True
+        )
+        thread.start()
+        return state
+
+    def next_sentences(self, call_sid, timeout):
+        """
+        Wait up to `timeout` seconds for buffered sentences.
+
+        Returns (sentences, finished). sentences is None when no stream exists
+        for call_sid; finished is True once the stream is drained.
+        """
+        with self._lock:
+            state = self._streams.get(call_sid)
+        if state is None:
+            return None, True
+
+        with state.condition:
+            state.condition.wait_for(lambda: state.sentences or state.finished, timeout)
+            sentences = state.sentences
+            state.sentences = []
+            finished = state.finished
+
+        if finished:
+            with self._lock:
+                if self._streams.get(call_sid) is state:
+                    del self._streams[call_sid]
+        return sentences, finished
+
+    def active_count(self):
+        """Number of streams that have not been fully delivered"""
+        with self._lock:
+            return len(self._streams)
+
+    def _consume(self, call_sid, state, chunks, on_complete):
+        buffer = ''
+        parts = []
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                parts.append(chunk)
+                buffer += chunk
+                sentences, buffer = split_sentences(buffer)
+                if sentences:
+                    with state.condition:
+                        state.sentences.extend(sentences)
+                        state.condition.notify_all()
+        except Exception as e:
+            logger.error("Streamed answer for %s failed: %s", call_sid, e, exc_info=True)
+            state.failed = True
+
+        tail = buffer.strip()
+        with state.condition:
+            if tail:
+                state.sentences.append(tail)
+            state.finished = True
+            state.condition.notify_all()
+
+        full_text = ''.join(parts).strip()
+        if on_complete and full_text and not state.failed:
+            try:
+                on_complete(full_text)
+            except Exception as e:
+                logger.error("Stream completion callback for %s failed: %s", call_sid, e)
+
+    def _purge_expired(self):
+        """Drop streams nobody collected within ttl (caller holds the lock)"""
+        cutoff = time.monotonic() - self.ttl
+        for sid in [sid for sid, state in self._streams.items() if state.created < cutoff]:
+            del self._streams[sid]
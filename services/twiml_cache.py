@@ -0,0 +1,100 @@
+# services/twiml_cache.py
+"""
+Precompiled TwiML documents.
+
+Static responses are rendered once into immutable bytes and served from a
+registry. Responses that only differ by a piece of text (an AI answer, an
+error message) use a template that is split around placeholders at build
+time, so each request only escapes and concatenates.
+"""
+import threading
+from xml.sax.saxutils import escape
+
+_MARKER = '@@TWIML_FIELD_{}@@'
+
+
+class TwimlRegistry:
+    """Named static TwiML documents rendered once into bytes"""
+
+    def __init__(self):
+        self._builders = {}
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, builder):
+        """Register a zero-argument builder that returns a VoiceResponse"""
+        with self._lock:
+            self._builders[name] = builder
+            self._documents.pop(name, None)
+
+    def render_all(self):
+        """(Re)render every registered document, e.g. at startup or after assets change"""
+        with self._lock:
+            builders = dict(self._builders)
+        documents = {name: str(builder()).encode('utf-8') for name, builder in builders.items()}
+        with self._lock:
+            self._documents.update(documents)
+        return len(documents)
+
+    def get(self, name):
+        """Return the rendered bytes for name, rendering lazily on first use"""
+        document = self._documents.get(name)
+        if document is None:
+            with self._lock:
+                builder = self._builders[name]
+            document = str(builder()).encode('utf-8')
+            with self._lock:
+                self._documents[name] = document
+        return document
+
+    def names(self):
+        with self._lock:
+            return sorted(self._builders)
+
+
+class TwimlTemplate:
+    """
+    TwiML document with text placeholders.
+
+    The builder is called once with a marker string for every field; the
+    serialized XML is then split around the markers. render() escapes the
+    values and joins the precomputed segments.
+    """
+
+    def __init__(self, builder, *fields):
+        self.builder = builder
+        self.fields = fields
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the segments, e.g. after the prompt audio the builder uses has changed"""
+        fields = self.fields
+        markers = {field: _MARKER.format(field) for field in fields}
+        xml = str(self.builder(**markers))
+
+        segments = []
+        order = []
+        while True:
+            positions = [(xml.find(markers[f]), f) for f in fields if markers[f] in xml]
+            if not positions:
+                break
+            position, field = min(positions)
+            segments.append(xml[:position].encode('utf-8'))
+            order.append(field)
+            xml = xml[position + len(markers[field]):]
+        segments.append(xml.encode('utf-8'))
+
+        missing = set(fields) - set(order)
+        if missing:
+            raise ValueError(f"Template builder did not use fields: {', '.join(sorted(missing))}")
+        # One attribute, so a concurrent render() never mixes old and new segments
+        self._compiled = (segments, order)
+
+    def render(self, **values):
+        """Return the document bytes with each field escaped and inserted"""
+        segments, order = self._compiled
+        parts = [segments[0]]
+        for field, segment in zip(order, segments[1:]):
+            parts.append(escape(str(values[field])).encode('utf-8'))
+            parts.append(segment)
+        return b''.join(parts)
@@ -0,0 +1,46 @@
+# services/usage.py
+"""
+Token usage and cost of OpenAI calls.
+
+Each answered turn carries prompt/completion token counts from
+`response.usage`; this module turns them into an estimated cost using a
+per-model price table (USD per 1K tokens, overridable with MODEL_PRICES).
+Per-call aggregation and the "worst turns" queries live in TranscriptStore.
+"""
+import json
+
+# USD per 1K tokens: (prompt, completion)
+DEFAULT_PRICES = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4o-mini': (0.00015, 0.0006),
+}
+
+
+def load_prices(prices_json=None):
+    """Price table from MODEL_PRICES JSON ({"model": [prompt, completion]}), else DEFAULT_PRICES"""
+    table = json.loads(prices_json) if prices_json else DEFAULT_PRICES
+    return {model: (float(prompt), float(completion)) for model, (prompt, completion) in table.items()}
+
+
+def record_usage(turn_info, usage):
+    """Copy token counts from an OpenAI usage object into turn_info (adds up across calls)"""
+    if usage is None:
+        return turn_info
+    for field in ('prompt_tokens', 'completion_tokens'):
+        turn_info[field] = turn_info.get(field, 0) + int(getattr(usage, field, 0) or 0)
+    return turn_info
+
+
+def estimate_cost(prices, model, prompt_tokens, completion_tokens):
+    """Estimated USD cost of a call, or None if the model or token counts are unknown"""
+    if not model or prompt_tokens is None and completion_tokens is None:
+        return None
+    # Dated snapshots ("gpt-4o-mini-2024-07-18") use their base model's price
+    base = max((name for name in prices if model == name or model.startswith(name + '-')),
+               key=len, default=None)
+    if base is None:
+        return None
+    prompt_price, completion_price = prices[base]
+    cost = ((prompt_tokens or 0) * prompt_price + (completion_tokens or 0) * completion_price) / 1000
+    return round(cost, 6)
@@ -0,0 +1,10 @@
+"""Keep the app's stores out of the repository's data/ directory while testing"""
+import atexit
+import os
+import shutil
+import tempfile
+
+# Set before `app` is imported: its transcript and call-event stores open DATABASE_URL at import
+_data_dir = tempfile.mkdtemp(prefix='voice-caller-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_data_dir, 'voice_caller.db')}"
+atexit.register(shutil.rmtree, _data_dir, ignore_errors=True)
@@ -0,0 +1,55 @@
+from unittest.mock import patch, MagicMock
+from services.answer_cache import AnswerCache, normalize_utterance
+
+def test_normalize_strips_case_punctuation_and_fillers():
+    assert normalize_utterance("Um, what's the PRICE?") == "what's the price"
+    assert normalize_utterance("Uh, where is it located!") == "where is it located"
+    # Words that carry meaning are kept, so different questions don't share a key
+    assert normalize_utterance("What's it like?") == "what's it like"
+    assert normalize_utterance("Is it right by the lake?") != normalize_utterance("Is it by the lake?")
+    assert normalize_utterance("") == ""
+
+def test_cache_hit_on_normalized_input():
+    cache = AnswerCache(max_size=10, ttl=60)
+    cache.set("What's the price?", "Starting at $180,000.")
+    assert cache.get("uh what's the price") == "Starting at $180,000."
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 0
+
+def test_cache_ttl_expiry():
+    cache = AnswerCache(max_size=10, ttl=5)
+    with patch('services.answer_cache.time.monotonic', return_value=100.0):
+        cache.set("price", "answer")
+    with patch('services.answer_cache.time.monotonic', return_value=106.0):
+        assert cache.get("price") is None
+    assert cache.stats()['misses'] == 1
+
+def test_cache_lru_eviction():
+    cache = AnswerCache(max_size=2, ttl=60)
+    cache.set("one", "1")
+    cache.set("two", "2")
+    cache.get("one")
+    cache.set("three", "3")
+    assert cache.get("two") is None
+    assert cache.get("one") == "1"
+    assert cache.get("three") == "3"
+    assert cache.stats()['evictions'] == 1
+
+def test_cache_disabled():
+    cache = AnswerCache(enabled=False)
+    cache.set("price", "answer")
+    assert cache.get("price") is None
+    assert cache.stats()['size'] == 0
+
+def test_get_ai_response_uses_cache():
+    import app
+    app.answer_cache.clear()
+    with patch('app.client') as mock_client:
+        completion = MagicMock()
+        completion.choices[0].message.content = "Two and three bedroom apartments."
+        mock_client.chat.completions.create.return_value = completion
+        assert app.get_ai_response("How many bedrooms?") == "Two and three bedroom apartments."
+        assert app.get_ai_response("um, how many bedrooms") == "Two and three bedroom apartments."
+        assert mock_client.chat.completions.create.call_count == 1
+    app.answer_cache.clear()
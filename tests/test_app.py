@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from app import app
+from app import app, health_prober
 
 @pytest.fixture
 def client():
@@ -13,6 +13,7 @@ def test_health_check_ok(client):
         mock_chat = MagicMock()
         mock_chat.completions.create.return_value = MagicMock()
         mock_client.chat = mock_chat
+        health_prober.check_now()
         response = client.get('/health')
         assert response.status_code == 200
         data = response.get_json()
@@ -24,10 +25,13 @@ def test_health_check_openai_error(client):
         mock_chat = MagicMock()
         mock_chat.completions.create.side_effect = Exception("API error")
         mock_client.chat = mock_chat
+        health_prober.check_now()
         response = client.get('/health')
         assert response.status_code == 200
         data = response.get_json()
         assert data['openai_api'] == 'unhealthy'
+        assert client.get('/health/ready').status_code == 503
+        assert client.get('/health/live').status_code == 200
 
 def test_outbound_route(client):
     response = client.post('/outbound')
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+import openai
+from aiohttp.test_utils import TestClient, TestServer
+from async_app import create_async_app
+from app import answer_cache, openai_breaker
+
+def _completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+def _fake_openai(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+def _run(openai_client, scenario):
+    async def runner():
+        async with TestClient(TestServer(create_async_app(openai_client))) as client:
+            return await scenario(client)
+    return asyncio.run(runner())
+
+def test_async_outbound_and_followup():
+    async def scenario(client):
+        outbound = await (await client.post('/outbound')).read()
+        goodbye = await (await client.post('/process_followup', data={'SpeechResult': 'no'})).read()
+        missing = await (await client.get('/not_a_real_route')).read()
+        return outbound, goodbye, missing
+    outbound, goodbye, missing = _run(_fake_openai(AsyncMock()), scenario)
+    assert b'How can I help you with our real estate project today?' in outbound
+    assert b'Thank you for your interest in Buildn 123' in goodbye
+    assert b'routing error' in missing
+
+def test_async_process_speech_answers_with_async_client():
+    answer_cache.clear()
+    create = AsyncMock(return_value=_completion("Apartments start at $180,000."))
+    async def scenario(client):
+        response = await client.post('/process_speech', data={
+            'SpeechResult': 'Is it a good area for families?', 'Confidence': '0.9', 'CallSid': 'CAasync'
+        })
+        return await response.read()
+    body = _run(_fake_openai(create), scenario)
+    assert b'Apartments start at $180,000.' in body
+    assert b'/process_followup' in body
+    create.assert_awaited_once()
+    answer_cache.clear()
+
+def test_async_process_speech_failure_and_reprompts():
+    answer_cache.clear()
+    create = AsyncMock(side_effect=openai.APIConnectionError(request=MagicMock()))
+    async def scenario(client):
+        failed = await (await client.post('/process_speech', data={'SpeechResult': 'Tell me more', 'Confidence': '0.9'})).read()
+        empty = await (await client.post('/process_speech', data={})).read()
+        low = await (await client.post('/process_speech', data={'SpeechResult': 'x', 'Confidence': '0.1'})).read()
+        return failed, empty, low
+    with patch('app.openai_policy.base_delay', 0):
+        failed, empty, low = _run(_fake_openai(create), scenario)
+    openai_breaker.record_success()
+    assert b"I'm having trouble processing your request right now" in failed
+    assert b"I didn't catch that" in empty
+    assert b"I'm not sure I understood that correctly" in low
+    assert create.await_count == 3
+
+def test_async_call_status_buffers_and_reports(tmp_path):
+    from services.call_events import CallEventStore
+    store = CallEventStore(f'sqlite:///{tmp_path}/events.db', flush_interval=60)
+    async def scenario(client):
+        accepted = await client.post('/call_status', data={'CallSid': 'CA1', 'CallStatus': 'busy'})
+        stats = await (await client.get('/call_status/stats')).json()
+        return accepted.status, stats
+    with patch('async_app.call_event_store', store):
+        status, stats = _run(_fake_openai(AsyncMock()), scenario)
+    store.close()
+    assert status == 204
+    assert stats['outcomes']['busy'] == 1
+    assert stats['answer_rate'] == 0.0
+
+def test_async_audio_route_serves_ranges(tmp_path):
+    from services.audio_prompts import AudioPromptStore
+    store = AudioPromptStore(str(tmp_path), voice='Polly.Joanna')
+    store._write(store.path('prompts', store.key('Hello')), b'0123456789')
+    async def scenario(client):
+        url = f"/audio/prompts/{store.key('Hello')}.mp3"
+        full = await client.get(url)
+        partial = await client.get(url, headers={'Range': 'bytes=2-4'})
+        missing = await client.get('/audio/answers/missing.mp3')
+        return full.status, full.content_type, partial.status, await partial.read(), missing.status
+    with patch('async_app.audio_prompts', store):
+        status, content_type, partial_status, body, missing = _run(_fake_openai(AsyncMock()), scenario)
+    assert (status, content_type) == (200, 'audio/mpeg')
+    assert (partial_status, body) == (206, b'234')
+    assert missing == 404
+
+def test_flask_only_modes_are_reported_at_startup():
+    import async_app
+    from config.settings import config
+    with patch.object(config, 'DEFERRED_ANSWERS_ENABLED', True), \
+         patch.object(config, 'STREAMING_ANSWERS_ENABLED', False), \
+         patch.object(config, 'SPECULATIVE_ANSWERS_ENABLED', True), \
+         patch.object(async_app.logger, 'warning') as warning:
+        async_app.warn_unsupported_flags()
+    assert [call.args[1] for call in warning.call_args_list] == [
+        'DEFERRED_ANSWERS_ENABLED', 'SPECULATIVE_ANSWERS_ENABLED'
+    ]
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+import app as app_module
+from app import app
+from services.audio_prompts import AudioPromptStore
+
+class FakeSynthesizer:
+    voice = 'Polly.Joanna'
+    extension = 'mp3'
+
+    def __init__(self):
+        self.texts = []
+
+    def synthesize(self, text):
+        self.texts.append(text)
+        return f'AUDIO:{text}'.encode('utf-8')
+
+@pytest.fixture
+def store(tmp_path):
+    return AudioPromptStore(str(tmp_path), synthesizer=FakeSynthesizer(), min_hits=2)
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def wait_for(condition):
+    deadline = time.time() + 2
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_render_once_then_url(store, tmp_path):
+    assert store.url_for('Hello there') is None
+    assert store.render(['Hello there', 'Goodbye', 'Hello there']) == (2, 0)
+    assert store.render(['Hello there']) == (0, 0)
+    assert len(store.synthesizer.texts) == 2
+    url = store.url_for('Hello there')
+    assert url.startswith('/audio/prompts/') and url.endswith('.mp3')
+    # A fresh store (another worker, a restart) finds the files on disk
+    assert AudioPromptStore(str(tmp_path), voice='Polly.Joanna').url_for('Hello there') == url
+    assert AudioPromptStore(str(tmp_path), voice='Polly.Matthew').url_for('Hello there') is None
+
+def test_answers_synthesized_after_min_hits_and_evicted_by_size(tmp_path):
+    store = AudioPromptStore(str(tmp_path), synthesizer=FakeSynthesizer(), min_hits=2,
+                             answer_cache_bytes=40)
+    assert store.answer_url('First answer') is None
+    assert store.answer_url('First answer') is None
+    assert wait_for(lambda: store.answer_url('First answer') is not None)
+    for _ in range(2):
+        store.answer_url('Second answer')
+    assert wait_for(lambda: store.answer_url('Second answer') is not None)
+    # Both files (19 + 20 bytes) fit; a third pushes out the least recently used
+    store.answer_url('First answer')
+    for _ in range(2):
+        store.answer_url('Third answer')
+    assert wait_for(lambda: store.stats()['answers'] == 2 and store.synthesized == 3)
+    assert store.answer_url('Second answer') is None
+    assert store.answer_url('First answer') is not None
+    assert store.resolve(f"answers/{store.key('Second answer')}.mp3") is None
+
+def test_answer_cache_is_shared_by_workers(tmp_path):
+    # Two workers serving the same directory: one cap between them
+    first, second = (AudioPromptStore(str(tmp_path), synthesizer=FakeSynthesizer(), min_hits=1,
+                                      answer_cache_bytes=40) for _ in range(2))
+    first.answer_url('First answer')
+    assert wait_for(lambda: first.answer_url('First answer') is not None)
+    second.answer_url('First answer')
+    assert wait_for(lambda: second.answer_url('First answer') is not None)
+    assert second.synthesized == 0
+    for text in ('Second answer', 'Third answer'):
+        second.answer_url(text)
+        assert wait_for(lambda: second.answer_url(text) is not None)
+    assert second.stats()['answer_bytes'] <= 40
+    # The first worker still indexes the evicted file, but falls back to <Say>
+    assert first.answer_url('First answer') is None
+    assert first.stats()['answers'] == 0
+
+def test_resolve_rejects_unknown_and_traversal(store):
+    store.render(['Hello there'])
+    assert store.resolve(f"prompts/{store.key('Hello there')}.mp3")
+    assert store.resolve('../secrets.mp3') is None
+    assert store.resolve('prompts/../../etc.mp3') is None
+    assert store.resolve(f"prompts/{store.key('Hello there')}.wav") is None
+
+def test_audio_route_supports_etag_and_range(client, store, monkeypatch):
+    monkeypatch.setattr(app_module, 'audio_prompts', store)
+    store.render(['Hello there'])
+    url = store.url_for('Hello there')
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == 'audio/mpeg'
+    assert response.data == b'AUDIO:Hello there'
+    assert 'max-age' in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    partial = client.get(url, headers={'Range': 'bytes=0-4'})
+    assert partial.status_code == 206
+    assert partial.data == b'AUDIO'
+    assert client.get('/audio/prompts/missing.mp3').status_code == 404
+
+def test_twiml_plays_rendered_prompts(client, store, monkeypatch):
+    monkeypatch.setattr(app_module, 'audio_prompts', store)
+    try:
+        store.render([app_module.WELCOME_MESSAGE, app_module.DEFAULT_ERROR_MESSAGE])
+        app_module.refresh_twiml()
+        response = client.post('/outbound')
+        assert f'<Play>{store.url_for(app_module.WELCOME_MESSAGE)}</Play>' in response.get_data(as_text=True)
+        assert app_module.NO_SPEECH_MESSAGE in response.get_data(as_text=True)
+        error = app_module.render_error_twiml().decode()
+        assert '<Play>' in error and '<Hangup />' in error
+    finally:
+        monkeypatch.undo()
+        app_module.refresh_twiml()
+    assert '<Play>' not in client.post('/outbound').get_data(as_text=True)
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from unittest.mock import patch
+from app import app
+from services.call_events import CallEventStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = CallEventStore(f'sqlite:///{tmp_path}/events.db', batch_size=5, flush_interval=0.05)
+    yield store
+    store.close()
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def event(call_sid, status, duration=None):
+    values = {'CallSid': call_sid, 'CallStatus': status, 'To': '+14155550100'}
+    if duration is not None:
+        values['CallDuration'] = str(duration)
+    return values
+
+def test_events_are_flushed_on_batch_size_and_interval(store):
+    for i in range(5):
+        assert store.record(event(f'CA{i}', 'initiated'))
+    deadline = time.time() + 2
+    while store.written < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.written == 5
+    store.record(event('CA9', 'ringing'))
+    deadline = time.time() + 2
+    while store.written < 6 and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.written == 6
+
+def test_stats_aggregate_final_outcomes(store):
+    for call_sid, final, duration in [('CA1', 'completed', 30), ('CA2', 'completed', 90),
+                                      ('CA3', 'no-answer', 0), ('CA4', 'busy', 0)]:
+        store.record(event(call_sid, 'initiated'))
+        store.record(event(call_sid, final, duration))
+    store.record(event('CA5', 'ringing'))
+    stats = store.stats()
+    assert stats['finished_calls'] == 4
+    assert stats['unfinished_calls'] == 1
+    assert stats['outcomes']['completed'] == 2
+    assert stats['outcomes']['no-answer'] == 1
+    assert stats['answer_rate'] == 0.5
+    assert stats['talk_seconds'] == 120
+    assert stats['avg_duration_seconds'] == 60.0
+
+def test_full_buffer_drops_and_missing_fields_are_ignored(tmp_path):
+    store = CallEventStore(f'sqlite:///{tmp_path}/events.db', batch_size=100, flush_interval=60, max_buffer=2)
+    assert not store.record({'CallSid': 'CA1'})
+    assert store.record(event('CA1', 'initiated'))
+    assert store.record(event('CA2', 'initiated'))
+    assert not store.record(event('CA3', 'initiated'))
+    assert store.dropped == 1
+    store.close()
+    assert store.written == 2
+
+def test_call_status_route_buffers_and_reports(client, tmp_path):
+    store = CallEventStore(f'sqlite:///{tmp_path}/events.db', flush_interval=60)
+    with patch('app.call_event_store', store):
+        response = client.post('/call_status', data=event('CA1', 'completed', 42))
+        assert response.status_code == 204
+        stats = client.get('/call_status/stats').get_json()
+    store.close()
+    assert stats['outcomes']['completed'] == 1
+    assert stats['talk_seconds'] == 42
+
+def test_make_call_sets_status_callback_only_when_configured():
+    from voice_calls import make_call_better
+    with patch('voice_calls.make_call_better.client') as mock_client, \
+         patch.object(make_call_better.config, 'STATUS_CALLBACK_URL', 'https://example.com/call_status'):
+        make_call_better.make_call(to='+14155550100', from_='+14155550199', url='https://example.com/outbound')
+        kwargs = mock_client.calls.create.call_args.kwargs
+    assert kwargs['status_callback'] == 'https://example.com/call_status'
+    assert 'completed' in kwargs['status_callback_event']
@@ -0,0 +1,109 @@
+import openai
+import pytest
+from unittest.mock import patch, MagicMock
+from services.call_policy import (
+    CallPolicy, CircuitBreaker, CircuitOpenError, DeadlineExceeded,
+    classify_error, RETRYABLE, RATE_LIMITED, FATAL, CLOSED, OPEN, HALF_OPEN
+)
+
+REQUEST = MagicMock()
+
+def _status_error(cls, status, headers=None):
+    response = MagicMock(status_code=status, headers=headers or {})
+    return cls('error', response=response, body=None)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_classify_error_by_type():
+    assert classify_error(openai.APITimeoutError(request=REQUEST)) == RETRYABLE
+    assert classify_error(openai.APIConnectionError(request=REQUEST)) == RETRYABLE
+    assert classify_error(_status_error(openai.InternalServerError, 503)) == RETRYABLE
+    assert classify_error(_status_error(openai.RateLimitError, 429)) == RATE_LIMITED
+    assert classify_error(_status_error(openai.AuthenticationError, 401)) == FATAL
+    assert classify_error(ValueError("timeout in message text")) == FATAL
+
+def test_retries_with_backoff_then_succeeds():
+    clock = FakeClock()
+    policy = CallPolicy(deadline=10, max_attempts=3, clock=clock, sleep=clock.sleep)
+    fn = MagicMock(side_effect=[openai.APITimeoutError(request=REQUEST), 'ok'])
+    info = {}
+    assert policy.call(fn, info=info) == 'ok'
+    assert info['retries'] == 1
+    assert fn.call_args_list[0].kwargs['timeout'] == 10
+
+def test_fatal_errors_are_not_retried():
+    policy = CallPolicy(sleep=lambda s: None)
+    fn = MagicMock(side_effect=_status_error(openai.AuthenticationError, 401))
+    with pytest.raises(openai.AuthenticationError):
+        policy.call(fn)
+    assert fn.call_count == 1
+
+def test_attempt_timeouts_shrink_to_fit_deadline():
+    clock = FakeClock()
+    policy = CallPolicy(deadline=5, max_attempts=5, base_delay=1, max_delay=1,
+                        min_attempt_timeout=1, clock=clock, sleep=clock.sleep)
+    def slow_failure(timeout):
+        clock.now += timeout
+        raise openai.APITimeoutError(request=REQUEST)
+    with pytest.raises((openai.APITimeoutError, DeadlineExceeded)):
+        policy.call(slow_failure)
+    assert clock.now <= 5
+
+def test_rate_limit_honours_retry_after():
+    clock = FakeClock()
+    policy = CallPolicy(deadline=10, clock=clock, sleep=clock.sleep, base_delay=0.01)
+    fn = MagicMock(side_effect=[_status_error(openai.RateLimitError, 429, {'retry-after': '2'}), 'ok'])
+    assert policy.call(fn) == 'ok'
+    assert clock.now >= 2
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30, clock=clock)
+    policy = CallPolicy(max_attempts=1, breaker=breaker, clock=clock, sleep=clock.sleep)
+    failing = MagicMock(side_effect=openai.APIConnectionError(request=REQUEST))
+    for _ in range(2):
+        with pytest.raises(openai.APIConnectionError):
+            policy.call(failing)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        policy.call(failing)
+    assert failing.call_count == 2
+
+    clock.now += 31
+    assert breaker.state == HALF_OPEN
+    assert policy.call(MagicMock(return_value='ok')) == 'ok'
+    assert breaker.snapshot()['state'] == CLOSED
+
+def test_cancelled_half_open_probe_is_released():
+    import asyncio
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30, clock=clock)
+    policy = CallPolicy(max_attempts=1, breaker=breaker, clock=clock, sleep=clock.sleep)
+    with pytest.raises(openai.APIConnectionError):
+        policy.call(MagicMock(side_effect=openai.APIConnectionError(request=REQUEST)))
+    clock.now += 31
+    with pytest.raises(KeyboardInterrupt):
+        policy.call(MagicMock(side_effect=KeyboardInterrupt))
+    clock.now += 31
+    async def cancelled(timeout):
+        raise asyncio.CancelledError()
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(policy.call_async(cancelled))
+    # Neither interrupted probe left the breaker rejecting everything
+    assert breaker.state == HALF_OPEN
+    assert policy.call(MagicMock(return_value='ok')) == 'ok'
+    assert breaker.state == CLOSED
+
+def test_get_ai_response_returns_canned_answer_when_circuit_open():
+    import app
+    app.answer_cache.clear()
+    with patch('app.client') as mock_client, patch.object(app.openai_breaker, 'allow_request', return_value=False):
+        answer = app.get_ai_response("What amenities are there?")
+        assert answer == app.CIRCUIT_OPEN_MESSAGE
+        mock_client.chat.completions.create.assert_not_called()
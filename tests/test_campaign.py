@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from benchmarks.fake_twilio import FakeTwilio
+from voice_calls import make_call_better
+from voice_calls.campaign import TokenBucket, iter_numbers, normalize_number, run_queue
+from voice_calls.dial_queue import DialQueue
+from voice_calls.twilio_http import create_twilio_client
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+def make_queue(tmp_path, numbers):
+    dial_queue = DialQueue(f"sqlite:///{tmp_path / 'dial.db'}", campaign='test', max_attempts=1)
+    dial_queue.enqueue(numbers)
+    return dial_queue
+
+def test_token_bucket_spaces_calls_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(2, burst=1, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(5)]
+    assert waits[0] == 0
+    assert all(abs(w - 0.5) < 1e-9 for w in waits[1:])
+    assert abs(clock.now - 102.0) < 1e-9
+
+def test_token_bucket_allows_burst_after_idle():
+    clock = FakeClock()
+    bucket = TokenBucket(1, burst=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.acquire() == 1.0
+    clock.now += 10
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+
+def test_iter_numbers_header_and_invalid(tmp_path):
+    path = tmp_path / 'numbers.csv'
+    path.write_text('name,phone\nAnn,+1 (415) 555-0100\nBob,14155550100\nCy,nope\n\nDi,+442071838750\n')
+    assert list(iter_numbers(path)) == ['+14155550100', '+14155550100', None, '+442071838750']
+    assert normalize_number('12') is None
+
+def test_run_queue_counts_failures(tmp_path):
+    def dial(number):
+        if number.endswith('3'):
+            raise RuntimeError('busy')
+        return f'CA{number[1:]}'
+    dial_queue = make_queue(tmp_path, [f'+1415555010{i}' for i in range(6)])
+    summary = run_queue(dial_queue, dial, concurrency=3, cps=1000, burst=10).summary()
+    assert summary['total'] == 6
+    assert summary['succeeded'] == 5
+    assert summary['failed'] == 1
+    assert summary['errors'] == {'RuntimeError: busy': 1}
+
+def test_campaign_against_fake_twilio_stays_under_cps(tmp_path):
+    server = FakeTwilio(latency=0.02, cps_limit=20).start()
+    try:
+        client = create_twilio_client('ACtest', 'token', pool_size=4, base_url=server.base_url)
+        numbers = [f'+1415555{i:04d}' for i in range(12)]
+        dial_queue = make_queue(tmp_path, numbers)
+        with patch.object(make_call_better, 'client', client):
+            report = run_queue(dial_queue, make_call_better.make_call, concurrency=4, cps=15)
+        summary = report.summary()
+        assert summary['succeeded'] == 12, summary['errors']
+        assert server.rejected == 0
+        assert sorted(call['To'] for call in server.calls) == numbers
+        assert all(sid.startswith('CA') for _, sid in report.succeeded)
+    finally:
+        server.shutdown()
+        server.server_close()
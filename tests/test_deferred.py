@@ -0,0 +1,60 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app import app
+from services.deferred import DeferredAnswers, PENDING, READY, MISSING
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_deferred_answers_lifecycle():
+    release = threading.Event()
+    answers = DeferredAnswers(max_workers=1)
+    answers.submit('CA1', lambda: release.wait(5) and 'done')
+    assert answers.result('CA1') == (PENDING, None)
+    release.set()
+    assert answers.result('CA1', timeout=5) == (READY, 'done')
+    assert answers.result('CA1') == (MISSING, None)
+    answers.shutdown()
+
+def test_deferred_answers_failure_yields_none():
+    answers = DeferredAnswers(max_workers=1)
+    def boom():
+        raise RuntimeError("upstream down")
+    answers.submit('CA1', boom)
+    assert answers.result('CA1', timeout=5) == (READY, None)
+    answers.shutdown()
+
+def test_process_speech_deferred_returns_hold(client):
+    release = threading.Event()
+    def slow_answer(user_input, **kwargs):
+        release.wait(5)
+        return "Deferred answer."
+    with patch('app.config.DEFERRED_ANSWERS_ENABLED', True), \
+            patch('app.get_ai_response', side_effect=slow_answer):
+        response = client.post('/process_speech', data={
+            'SpeechResult': 'Is it a good area for families?', 'Confidence': '0.9', 'CallSid': 'CAdeferred'
+        })
+        assert b'One moment' in response.data
+        assert b'/await_answer?attempt=1' in response.data
+
+        response = client.post('/await_answer?attempt=1', data={'CallSid': 'CAdeferred'})
+        assert b'<Pause' in response.data
+        assert b'/await_answer?attempt=2' in response.data
+
+        release.set()
+        for _ in range(50):
+            response = client.post('/await_answer?attempt=2', data={'CallSid': 'CAdeferred'})
+            if b'Deferred answer.' in response.data:
+                break
+            time.sleep(0.05)
+        assert b'Deferred answer.' in response.data
+        assert b'/process_followup' in response.data
+
+def test_await_answer_unknown_call(client):
+    response = client.post('/await_answer', data={'CallSid': 'CAunknown'})
+    assert b'lost track of your question' in response.data
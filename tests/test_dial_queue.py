@@ -0,0 +1,144 @@
+import sqlite3
+
+from voice_calls.campaign import iter_numbers, run_queue
+from voice_calls.dial_queue import DialQueue, is_retryable
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+class HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f'HTTP {status}')
+        self.status = status
+
+def make_queue(tmp_path, **kwargs):
+    return DialQueue(f"sqlite:///{tmp_path / 'dial.db'}", campaign='test', **kwargs)
+
+def test_enqueue_streams_in_chunks_and_ignores_duplicates(tmp_path):
+    dial_queue = make_queue(tmp_path)
+    numbers = (f'+1415555{i:04d}' for i in range(25))
+    assert dial_queue.enqueue(numbers, chunk_size=10) == (25, 0)
+    assert dial_queue.enqueue(['+14155550000', None, '+14155559999']) == (1, 1)
+    assert dial_queue.counts()['pending'] == 26
+
+def test_expired_lease_is_recovered_after_crash(tmp_path):
+    clock = FakeClock()
+    dial_queue = make_queue(tmp_path, lease_seconds=30, clock=clock)
+    dial_queue.enqueue(['+14155550001', '+14155550002'])
+    first = dial_queue.lease(1)[0]
+    # the process dies before recording the outcome; a new one resumes
+    resumed = make_queue(tmp_path, lease_seconds=30, clock=clock)
+    second = resumed.lease(5)
+    assert [job.number for job in second] == ['+14155550002']
+    resumed.mark_initiated(second[0], 'CA2')
+    assert resumed.lease(5) == []
+    clock.now += 31
+    recovered = resumed.lease(5)
+    assert [(job.number, job.attempts) for job in recovered] == [(first.number, 2)]
+
+def test_expired_lease_on_last_attempt_fails_the_job(tmp_path):
+    clock = FakeClock()
+    dial_queue = make_queue(tmp_path, max_attempts=2, lease_seconds=30, clock=clock)
+    dial_queue.enqueue(['+14155550001'])
+    assert dial_queue.lease()[0].attempts == 1
+    clock.now += 31
+    assert dial_queue.lease()[0].attempts == 2
+    # the call may have gone out before this lease expired too: don't dial a third time
+    clock.now += 31
+    assert dial_queue.lease() == []
+    failed = list(dial_queue.jobs('failed'))
+    assert [(job['attempts'], job['last_error']) for job in failed] == [(2, 'lease expired on the last attempt')]
+    assert dial_queue.counts()['dialing'] == 0
+
+def test_retries_are_bounded_and_backed_off(tmp_path):
+    clock = FakeClock()
+    dial_queue = make_queue(tmp_path, max_attempts=2, retry_backoff=10, clock=clock)
+    dial_queue.enqueue(['+14155550001'])
+    job = dial_queue.lease()[0]
+    assert dial_queue.mark_failed(job, 'HTTP 503') == 'pending'
+    assert dial_queue.lease() == []
+    assert dial_queue.next_due() == 1010.0
+    clock.now = 1010.0
+    job = dial_queue.lease()[0]
+    assert dial_queue.mark_failed(job, 'HTTP 503') == 'failed'
+    assert dial_queue.next_due() is None
+    assert list(dial_queue.jobs('failed'))[0]['attempts'] == 2
+
+def test_client_errors_are_not_retried():
+    assert not is_retryable(HttpError(400))
+    assert is_retryable(HttpError(429))
+    assert is_retryable(HttpError(503))
+    assert is_retryable(ConnectionError('reset'))
+
+def test_run_queue_records_call_sids_and_resumes(tmp_path):
+    path = tmp_path / 'numbers.csv'
+    path.write_text('phone\n' + ''.join(f'+1415555{i:04d}\n' for i in range(8)) + 'bad\n')
+    dial_queue = make_queue(tmp_path, retry_backoff=0)
+    assert dial_queue.enqueue(iter_numbers(path)) == (8, 1)
+
+    def dial(number):
+        if number == '+14155550003':
+            raise HttpError(400)
+        if number == '+14155550005' and not attempts.setdefault(number, 0):
+            attempts[number] = 1
+            raise HttpError(503)
+        return f'CA{number[1:]}'
+    attempts = {}
+
+    report = run_queue(dial_queue, dial, concurrency=3, cps=1000, burst=10)
+    assert report.summary()['total'] == 9
+    assert dial_queue.counts() == {'pending': 0, 'dialing': 0, 'initiated': 7, 'failed': 1}
+    initiated = {job['number']: job['call_sid'] for job in dial_queue.jobs('initiated')}
+    assert initiated['+14155550005'] == 'CA14155550005'
+
+    # re-running the same list dials nobody twice
+    dial_queue.enqueue(iter_numbers(path))
+    assert run_queue(dial_queue, dial, concurrency=2, cps=1000).summary()['total'] == 0
+
+def test_run_queue_retries_queue_errors(tmp_path):
+    dial_queue = make_queue(tmp_path)
+    dial_queue.enqueue(['+14155550001', '+14155550002'])
+    failures = {'lease': 1, 'mark_initiated': 1}
+    def flaky(name):
+        operation = getattr(dial_queue, name)
+        def call(*args, **kwargs):
+            if failures[name]:
+                failures[name] -= 1
+                raise sqlite3.OperationalError('database is locked')
+            return operation(*args, **kwargs)
+        return call
+    for name in failures:
+        setattr(dial_queue, name, flaky(name))
+
+    report = run_queue(dial_queue, lambda number: f'CA{number[1:]}', concurrency=1, cps=1000,
+                       burst=10, queue_retry_delay=0)
+    summary = report.summary()
+    assert (summary['succeeded'], summary['queue_errors']) == (2, 2)
+    assert dial_queue.counts()['initiated'] == 2
+
+def test_outcome_of_a_lost_lease_is_not_recorded(tmp_path):
+    clock = FakeClock()
+    dial_queue = make_queue(tmp_path, lease_seconds=30, clock=clock)
+    dial_queue.enqueue(['+14155550001'])
+    stale = dial_queue.lease()[0]
+    clock.now += 31
+    current = dial_queue.lease()[0]
+    assert dial_queue.mark_initiated(stale, 'CAstale') is False
+    assert dial_queue.mark_failed(stale, 'HTTP 503') is None
+    assert dial_queue.mark_initiated(current, 'CAcurrent') is True
+    assert [job['call_sid'] for job in dial_queue.jobs('initiated')] == ['CAcurrent']
+
+def test_cps_wait_does_not_outlast_the_lease(tmp_path):
+    dial_queue = make_queue(tmp_path, lease_seconds=0.5)
+    numbers = [f'+1415555000{i}' for i in range(6)]
+    dial_queue.enqueue(numbers)
+    dialed = []
+    def dial(number):
+        dialed.append(number)
+        return f'CA{number[1:]}'
+    summary = run_queue(dial_queue, dial, concurrency=6, cps=4).summary()
+    assert sorted(dialed) == numbers
+    assert summary['lost_leases'] == 0
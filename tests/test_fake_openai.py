@@ -0,0 +1,74 @@
+import pytest
+from openai import OpenAI
+import openai
+
+from benchmarks.fake_openai import FakeOpenAI, Profile
+
+@pytest.fixture
+def server():
+    server = FakeOpenAI(profile=Profile(latency=0, jitter=0, token_rate=10000, seed=1)).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_client(server):
+    return OpenAI(api_key='fake', base_url=server.base_url, max_retries=0)
+
+def test_completion_with_usage_and_recording(server):
+    response = make_client(server).chat.completions.create(
+        model='gpt-4', messages=[{'role': 'user', 'content': 'How much is a two bedroom?'}], max_tokens=5
+    )
+    assert response.choices[0].message.content.count(' ') == 4
+    assert response.usage.completion_tokens > 0
+    assert response.usage.prompt_tokens > 0
+    assert server.requests[0]['model'] == 'gpt-4'
+    assert server.requests[0]['outcome'] == 'ok'
+
+def test_streaming_with_include_usage(server):
+    stream = make_client(server).chat.completions.create(
+        model='gpt-4', messages=[{'role': 'user', 'content': 'hi'}], stream=True,
+        stream_options={'include_usage': True}
+    )
+    text, usage = '', None
+    for chunk in stream:
+        if chunk.choices:
+            text += chunk.choices[0].delta.content or ''
+        if chunk.usage:
+            usage = chunk.usage
+    assert text == server.profile.answer
+    assert usage.completion_tokens > 0
+
+def test_injected_failures(server):
+    client = make_client(server)
+    server.profile.update({'rate_limit_rate': 1.0})
+    with pytest.raises(openai.RateLimitError):
+        client.chat.completions.create(model='gpt-4', messages=[])
+    server.profile.update({'rate_limit_rate': 0, 'error_rate': 1.0})
+    with pytest.raises(openai.InternalServerError):
+        client.chat.completions.create(model='gpt-4', messages=[])
+    server.profile.update({'error_rate': 0, 'timeout_rate': 1.0, 'hang_seconds': 1.0})
+    with pytest.raises(openai.APITimeoutError):
+        client.chat.completions.create(model='gpt-4', messages=[], timeout=0.2)
+    with pytest.raises(ValueError):
+        server.profile.update({'distribution': 'pareto'})
+
+def test_latency_distributions():
+    for distribution in ('constant', 'uniform', 'normal', 'lognormal'):
+        profile = Profile(latency=0.5, jitter=0.1, distribution=distribution, seed=3)
+        delays = [profile.first_token_delay() for _ in range(200)]
+        assert all(delay >= 0 for delay in delays)
+        assert 0.4 < sum(delays) / len(delays) < 0.6
+
+def test_policy_owns_retries_one_request_per_attempt(server):
+    from unittest.mock import patch
+    import app
+    server.profile.update({'error_rate': 1.0})
+    with patch.object(app.config, 'OPENAI_BASE_URL', server.base_url), \
+            patch('app.client', app.create_openai_client(api_key='fake')), \
+            patch.object(app.openai_policy, 'base_delay', 0), \
+            patch.object(app.answer_cache, 'enabled', False), \
+            patch.object(app, 'openai_flights', app.SingleFlight(enabled=False)):
+        assert app.get_ai_response('How much is a two bedroom?') is None
+    app.openai_breaker.record_success()
+    # max_attempts HTTP requests for the turn, not max_attempts x the SDK's own retries
+    assert len(server.requests) == app.openai_policy.max_attempts
@@ -0,0 +1,49 @@
+from services.call_policy import CircuitBreaker
+from services.health import ReadinessProber
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def test_readiness_is_cached_and_goes_stale():
+    clock = FakeClock()
+    calls = []
+    prober = ReadinessProber(lambda: calls.append(1), stale_after=60, clock=clock)
+    assert prober.snapshot()['openai_api'] == 'unknown'
+    assert not prober.snapshot()['ready']
+    prober.check_now()
+    for _ in range(100):
+        assert prober.snapshot()['ready']
+    assert len(calls) == 1
+    clock.now += 61
+    snapshot = prober.snapshot()
+    assert snapshot['openai_api'] == 'unknown'
+    assert not snapshot['ready']
+
+def test_failed_probe_and_open_breaker_are_not_ready():
+    def failing():
+        raise TimeoutError("slow")
+    prober = ReadinessProber(failing)
+    prober.check_now()
+    snapshot = prober.snapshot()
+    assert snapshot['openai_api'] == 'unhealthy'
+    assert 'TimeoutError' in snapshot['last_error']
+
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    prober = ReadinessProber(lambda: None, breaker=breaker)
+    prober.check_now()
+    assert prober.snapshot()['ready']
+    breaker.record_failure()
+    assert prober.snapshot()['openai_circuit'] == 'open'
+    assert not prober.snapshot()['ready']
+
+def test_background_thread_probes_on_start():
+    import threading
+    probed = threading.Event()
+    prober = ReadinessProber(probed.set, interval=60)
+    prober.ensure_started()
+    prober.ensure_started()
+    assert probed.wait(5)
+    prober.stop()
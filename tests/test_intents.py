@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch
+from app import app
+from config.settings import config
+from services.intents import IntentMatcher, classify_yes_no, load_facts
+from services.knowledge import load_snippets
+
+FACTS = load_facts(load_snippets(config.KNOWLEDGE_BASE_PATH))
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_matches_single_clear_intents():
+    matcher = IntentMatcher(FACTS)
+    assert matcher.match("What's the price?").intent == 'price'
+    assert matcher.match("How many bedrooms do the apartments have").intent == 'bedrooms'
+    assert matcher.match("Where is it located?").intent == 'location'
+    assert matcher.match("Can I talk to someone from sales").intent == 'contact_sales'
+    assert '$180,000' in matcher.match("How much does it cost").answer
+
+def test_falls_through_to_llm():
+    matcher = IntentMatcher(FACTS)
+    assert matcher.match("Tell me about Buildn 123") is None
+    assert matcher.match("What is the price of the three bedroom in Dallas, where is it") is None
+    assert matcher.match("Why is the price so high?") is None
+    assert matcher.match("Can I get a mortgage for the price") is None
+    assert IntentMatcher(FACTS, enabled=False).match("What's the price?") is None
+
+def test_specific_questions_are_not_answered_generically():
+    matcher = IntentMatcher(FACTS)
+    assert matcher.match("Is there a pool?") is None
+    assert matcher.match("Do the amenities include a gym") is None
+    assert matcher.match("Where is the sales office") is None
+    assert matcher.match("What's the address of the showroom") is None
+    assert matcher.match("What amenities do you have").intent == 'amenities'
+    assert matcher.match("Where is the project").intent == 'location'
+
+def test_yes_no_uses_whole_words():
+    assert classify_yes_no("yes please") == 'yes'
+    assert classify_yes_no("okay") == 'yes'
+    assert classify_yes_no("no thanks") == 'no'
+    assert classify_yes_no("I'm not sure") == 'no'
+    assert classify_yes_no("can I book a visit") is None
+    assert classify_yes_no("I know enough") is None
+
+def test_yes_no_mixed_replies():
+    assert classify_yes_no("no, I have another question") == 'yes'
+    assert classify_yes_no("No. One more question") == 'yes'
+    assert classify_yes_no("yes, no more hold") == 'yes'
+    assert classify_yes_no("okay, goodbye") == 'no'
+    assert classify_yes_no("no more questions, thanks") == 'no'
+    assert classify_yes_no("I don't have another question") == 'no'
+
+def test_facts_come_from_the_knowledge_base():
+    assert FACTS['name'] == 'Buildn 123'
+    assert FACTS['city'] == 'Dallas'
+    assert FACTS['starting_price'] == '$180,000'
+    # A fact missing from the knowledge base leaves its intent to the LLM
+    matcher = IntentMatcher({name: fact for name, fact in FACTS.items() if name != 'starting_price'})
+    assert matcher.match("What's the price?") is None
+    assert matcher.match("Where is it located?").intent == 'location'
+
+def test_process_speech_answers_intent_without_openai(client):
+    with patch('app.get_ai_response') as mock_answer:
+        response = client.post('/process_speech', data={
+            'SpeechResult': 'How much are the apartments?', 'Confidence': '0.9', 'CallSid': 'CAintent'
+        })
+    assert b'$180,000' in response.data
+    mock_answer.assert_not_called()
+
+def test_followup_book_is_not_ok(client):
+    response = client.post('/process_followup', data={'SpeechResult': 'I want to book', 'CallSid': 'CAbook'})
+    assert b'Thank you for your interest in Buildn 123' in response.data
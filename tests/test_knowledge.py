@@ -0,0 +1,36 @@
+from app import build_messages, knowledge_base
+from services.knowledge import KnowledgeBase, load_snippets, tokenize
+
+SNIPPETS = [
+    "Apartment prices start at $180,000.",
+    "The project is located in Dallas, Texas.",
+    "HOA fees are paid monthly and cover landscaping and the pool.",
+    "Both 2-bedroom and 3-bedroom floor plans are available.",
+]
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("What are the HOA fees?") == ['hoa', 'fee']
+    assert tokenize("Prices start at $180,000") == ['price', 'start', '$180,000']
+
+def test_search_ranks_relevant_snippets_first():
+    kb = KnowledgeBase(SNIPPETS)
+    assert kb.search("how much are the HOA fees", k=1) == [2]
+    assert kb.search("where is it located", k=2)[0] == 1
+    assert kb.search("tell me a joke") == []
+
+def test_context_respects_token_budget():
+    kb = KnowledgeBase(SNIPPETS)
+    assert kb.context("HOA fee and price", k=2, token_budget=1000).count('\n- ') == 1
+    assert kb.context("HOA fee and price", k=2, token_budget=12) == "- Apartment prices start at $180,000."
+
+def test_load_snippets_skips_comments(tmp_path):
+    path = tmp_path / 'facts.txt'
+    path.write_text("# comment\nFirst fact\nwraps here.\n\n\nSecond fact.\n")
+    assert load_snippets(path) == ["First fact wraps here.", "Second fact."]
+    assert len(KnowledgeBase.from_file(tmp_path / 'missing.txt')) == 0
+
+def test_prompt_only_includes_relevant_facts():
+    assert len(knowledge_base) > 0
+    system = build_messages("How much are the apartments?")[0]['content']
+    assert '$180,000' in system
+    assert 'quality construction' not in system
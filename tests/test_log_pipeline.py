@@ -0,0 +1,73 @@
+import json
+import logging
+import logging.handlers
+import queue
+import pytest
+from app import app
+from services.log_pipeline import (
+    JsonFormatter, NonBlockingQueueHandler, SamplingFilter, bind_call_sid, reset_call_sid, parse_sample_rates
+)
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_parse_sample_rates_never_samples_warnings():
+    assert parse_sample_rates('DEBUG=0.1, info=0.5, ERROR=0') == {logging.DEBUG: 0.1, logging.INFO: 0.5}
+    assert parse_sample_rates('') == {}
+    with pytest.raises(ValueError):
+        parse_sample_rates('LOUD=1')
+
+def test_sampling_filter_drops_by_level():
+    sampler = SamplingFilter({logging.INFO: 0.5}, rand=iter([0.2, 0.7]).__next__)
+    info = logging.LogRecord('x', logging.INFO, '', 0, 'm', (), None)
+    error = logging.LogRecord('x', logging.ERROR, '', 0, 'm', (), None)
+    assert sampler.filter(info)
+    assert not sampler.filter(info)
+    assert sampler.filter(error)
+
+def test_queue_handler_is_lazy_tags_call_sid_and_never_blocks():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue)
+    logger = logging.getLogger('test.pipeline')
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    try:
+        token = bind_call_sid('CA123')
+        logger.info('answer for %s', 'caller', extra={'route': 'process_speech'})
+        reset_call_sid(token)
+        logger.info('dropped')
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+    record = log_queue.get_nowait()
+    assert record.args == ('caller',)
+    assert handler.dropped == 1
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['msg'] == 'answer for caller'
+    assert entry['call_sid'] == 'CA123'
+    assert entry['route'] == 'process_speech'
+
+def test_one_request_line_per_webhook(client):
+    # The handler app.setup_logging() installs on the root logger, minus the file writer
+    log_queue = queue.Queue()
+    handler = NonBlockingQueueHandler(log_queue)
+    root = logging.getLogger()
+    level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    try:
+        client.post('/process_followup', data={'SpeechResult': 'no', 'CallSid': 'CAlog'})
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(level)
+    records = [log_queue.get_nowait() for _ in range(log_queue.qsize())]
+    lines = [r for r in records if getattr(r, 'event', None) == 'request']
+    assert len(lines) == 1
+    assert lines[0].route == 'PROCESS_FOLLOWUP'
+    assert lines[0].status == 200
+    assert lines[0].speech == 'no'
+    assert lines[0].call_sid == 'CAlog'
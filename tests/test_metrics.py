@@ -0,0 +1,71 @@
+import threading
+import pytest
+from unittest.mock import patch
+from app import app
+from services.metrics import MetricsRegistry, RouteMetrics, route_metrics, reprompt_reasons, openai_outcomes
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('req_seconds', 'Request time', ('route',), [('a',)], buckets=(0.1, 1.0))
+    series = latency.labels('a')
+    for value in (0.05, 0.5, 0.7, 3.0):
+        series.observe(value)
+    text = registry.render()
+    assert 'req_seconds_bucket{route="a",le="0.1"} 1' in text
+    assert 'req_seconds_bucket{route="a",le="1"} 3' in text
+    assert 'req_seconds_bucket{route="a",le="+Inf"} 4' in text
+    assert 'req_seconds_count{route="a"} 4' in text
+    assert 'req_seconds_sum{route="a"} 4.25' in text
+
+def test_counters_are_thread_safe_and_labels_are_reused():
+    registry = MetricsRegistry()
+    counter = registry.counter('hits_total', 'Hits', ('kind',))
+    series = counter.labels('x')
+    assert counter.labels('x') is series
+    threads = [threading.Thread(target=lambda: [series.inc() for _ in range(1000)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert series.value == 8000
+    with pytest.raises(ValueError):
+        counter.labels('x', 'y')
+
+def test_instrument_tracks_in_flight_and_uncaught_errors():
+    registry = MetricsRegistry()
+    route = RouteMetrics(registry.histogram('l', 'l').labels(), registry.counter('e', 'e').labels(),
+                         registry.gauge('g', 'g').labels())
+    @route.instrument
+    def handler(fail):
+        assert route.in_flight.value == 1
+        if fail:
+            raise RuntimeError('boom')
+        return 'ok'
+    assert handler(False) == 'ok'
+    with pytest.raises(RuntimeError):
+        handler(True)
+    assert route.in_flight.value == 0
+    assert route.errors.value == 1
+    assert route.latency.count == 2
+
+def test_routes_update_metrics(client):
+    speech = route_metrics['process_speech'].latency.count
+    no_input = reprompt_reasons['no_input'].value
+    ok = openai_outcomes['ok'].value
+    client.post('/process_speech', data={'SpeechResult': ''})
+    with patch('app.client') as mock_client:
+        mock_client.chat.completions.create.return_value.choices[0].message.content = "Yes, it is."
+        client.post('/process_speech', data={'SpeechResult': 'Is there a school nearby for kids?', 'Confidence': '0.9'})
+    assert route_metrics['process_speech'].latency.count == speech + 2
+    assert reprompt_reasons['no_input'].value == no_input + 1
+    assert openai_outcomes['ok'].value == ok + 1
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert b'# TYPE voice_route_latency_seconds histogram' in response.data
+    assert b'voice_route_in_flight{route="process_speech"} 0' in response.data
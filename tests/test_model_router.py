@@ -0,0 +1,71 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from services.model_router import ModelRouter, classify_utterance, load_tiers
+
+def test_classify_simple_and_complex_questions():
+    assert classify_utterance("What's the price?") == 'fast'
+    assert classify_utterance("Where is it located") == 'fast'
+    assert classify_utterance("How many bedrooms do the apartments have") == 'fast'
+    assert classify_utterance("Should I finance with a mortgage or pay cash?") == 'smart'
+    assert classify_utterance("Can you compare the two bedroom and three bedroom price") == 'smart'
+    assert classify_utterance("Tell me a story about the builders") == 'smart'
+    assert classify_utterance("") == 'smart'
+
+def test_router_uses_configured_table():
+    tiers = load_tiers(json.dumps({
+        'fast': {'model': 'small-model', 'max_tokens': 60, 'timeout': 4},
+        'smart': {'model': 'big-model', 'max_tokens': 200, 'timeout': 10},
+    }))
+    router = ModelRouter(tiers)
+    tier = router.route("what is the price")
+    assert (tier.name, tier.model, tier.max_tokens, tier.timeout) == ('fast', 'small-model', 60, 4.0)
+    assert router.route("why is it priced like that compared to others").model == 'big-model'
+    router.enabled = False
+    assert router.route("what is the price").name == 'smart'
+
+def test_router_rejects_unknown_default_tier():
+    with pytest.raises(ValueError):
+        ModelRouter(load_tiers(), default_tier='huge')
+
+def test_router_records_latency_per_tier():
+    router = ModelRouter()
+    router.record('fast', 100)
+    router.record('fast', 300)
+    stats = router.stats()
+    assert stats['fast']['turns'] == 2
+    assert stats['fast']['avg_ms'] == 200
+    assert stats['fast']['max_ms'] == 300
+    assert stats['smart']['turns'] == 0
+
+def test_get_ai_response_uses_routed_tier():
+    import app
+    app.answer_cache.clear()
+    with patch('app.client') as mock_client:
+        completion = MagicMock()
+        completion.choices[0].message.content = "Starting at $180,000."
+        mock_client.chat.completions.create.return_value = completion
+        turn_info = {}
+        app.get_ai_response("What's the price?", turn_info=turn_info)
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        fast = app.model_router.tiers['fast']
+        assert kwargs['model'] == fast.model
+        assert kwargs['max_tokens'] == fast.max_tokens
+        assert turn_info['tier'] == 'fast'
+    app.answer_cache.clear()
+
+def test_turn_deadline_caps_tier_timeouts():
+    import app
+    smart = app.model_router.tiers['smart']
+    with patch.object(app.openai_policy, 'deadline', 5.0):
+        assert app.turn_deadline(smart) == 5.0
+        app.answer_cache.clear()
+        with patch('app.client') as mock_client:
+            completion = MagicMock()
+            completion.choices[0].message.content = "Starting at $180,000."
+            mock_client.chat.completions.create.return_value = completion
+            app.get_ai_response("What's the price?")
+            assert mock_client.chat.completions.create.call_args.kwargs['timeout'] <= 5.0
+    with patch.object(app.openai_policy, 'deadline', 60.0):
+        assert app.turn_deadline(smart) == smart.timeout
+    app.answer_cache.clear()
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import signal
+import time
+import urllib.request
+import pytest
+from unittest.mock import patch
+from werkzeug.serving import make_server
+from services.prefork import PreforkServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='prefork needs os.fork')
+
+def _pid_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain'), ('Connection', 'close')])
+    return [str(os.getpid()).encode()]
+
+def _serve(sock):
+    make_server('127.0.0.1', 0, _pid_app, fd=sock.fileno()).serve_forever()
+
+def _get_pid(port):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5) as response:
+        return int(response.read())
+
+def _wait_for_pid(port, exclude=(), timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            pid = _get_pid(port)
+            if pid not in exclude:
+                return pid
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise AssertionError('worker did not answer in time')
+
+def test_workers_share_socket_and_crashed_worker_is_restarted():
+    warmed = multiprocessing.get_context('fork').Queue()
+    server = PreforkServer(_serve, workers=2, host='127.0.0.1', port=0,
+                           warm_up=lambda: warmed.put(os.getpid()))
+    server.bind()
+    master = multiprocessing.get_context('fork').Process(target=server.run)
+    master.start()
+    server.sock.close()
+    try:
+        warm_pids = {warmed.get(timeout=10), warmed.get(timeout=10)}
+        pid = _wait_for_pid(server.port)
+        assert pid in warm_pids
+
+        os.kill(pid, signal.SIGKILL)
+        new_pid = warmed.get(timeout=10)
+        assert new_pid not in warm_pids
+        assert _wait_for_pid(server.port, exclude={pid}) in (warm_pids | {new_pid}) - {pid}
+    finally:
+        os.kill(master.pid, signal.SIGTERM)
+        master.join(timeout=10)
+    assert master.exitcode == 0
+
+def test_prefork_refuses_modes_with_per_process_call_state(capsys):
+    import main
+    from config.settings import config
+    with patch.object(config, 'DEFERRED_ANSWERS_ENABLED', True), \
+            patch.object(config, 'STREAMING_ANSWERS_ENABLED', False):
+        assert [flag for flag, _ in main.single_process_conflicts(config)] == ['DEFERRED_ANSWERS_ENABLED']
+        with pytest.raises(SystemExit):
+            main.run_prefork_server(port=0, workers=2)
+    assert 'DEFERRED_ANSWERS_ENABLED' in capsys.readouterr().out
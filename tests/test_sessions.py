@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from app import app, session_store, answer_cache
+from services.sessions import SessionStore
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_history_is_trimmed_to_token_budget():
+    store = SessionStore(token_budget=20)
+    store.add_exchange('CA1', 'What is the price?', 'Prices start at $180,000.')
+    store.add_exchange('CA1', 'And how many bedrooms do the apartments have?', 'Two or three bedrooms.')
+    history = store.history('CA1')
+    assert history == [
+        {"role": "user", "content": "And how many bedrooms do the apartments have?"},
+        {"role": "assistant", "content": "Two or three bedrooms."},
+    ]
+    assert len(store.history('CA1', token_budget=1000)) == 4
+
+def test_turn_cap_and_session_cap():
+    store = SessionStore(max_sessions=2, max_turns=4, token_budget=1000)
+    for i in range(5):
+        store.add_exchange('CA1', f'question {i}', f'answer {i}')
+    assert [m['content'] for m in store.history('CA1')] == ['question 3', 'answer 3', 'question 4', 'answer 4']
+    store.add_exchange('CA2', 'hi there', 'hello')
+    store.add_exchange('CA3', 'hi there', 'hello')
+    assert store.history('CA1') == []
+    assert store.stats()['sessions'] == 2
+
+def test_total_char_cap_evicts_oldest_session():
+    store = SessionStore(max_total_chars=30, token_budget=1000)
+    store.add_exchange('CA1', 'a' * 10, 'b' * 10)
+    store.add_exchange('CA2', 'c' * 10, 'd' * 10)
+    assert store.history('CA1') == []
+    assert store.stats()['total_chars'] == 20
+
+def test_idle_sessions_are_evicted():
+    store = SessionStore(idle_ttl=10)
+    with patch('services.sessions.time.monotonic', return_value=100.0):
+        store.add_exchange('CA1', 'price', 'answer')
+    with patch('services.sessions.time.monotonic', return_value=111.0):
+        assert store.evict_idle() == 1
+    assert store.stats()['sessions'] == 0
+
+def test_followup_question_carries_history(client):
+    answer_cache.clear()
+    with patch('app.client') as mock_client:
+        completion = MagicMock()
+        completion.choices[0].message.content = "Apartments start at $180,000."
+        mock_client.chat.completions.create.return_value = completion
+        for question in ('Is it a good area for families?', 'Is there parking for guests?'):
+            client.post('/process_speech', data={'SpeechResult': question, 'Confidence': '0.9', 'CallSid': 'CAsession'})
+        messages = mock_client.chat.completions.create.call_args.kwargs['messages']
+        assert [m['role'] for m in messages] == ['system', 'user', 'assistant', 'user']
+        assert messages[1]['content'] == 'Is it a good area for families?'
+    client.post('/process_followup', data={'SpeechResult': 'no thanks', 'CallSid': 'CAsession'})
+    assert session_store.history('CAsession') == []
+    answer_cache.clear()
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+from services.call_policy import DeadlineExceeded
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+def run_threads(count, target):
+    results = [None] * count
+    def worker(i):
+        try:
+            results[i] = target(i)
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_identical_calls_share_one_call():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return 'answer'
+    infos = [{} for _ in range(5)]
+    threading.Timer(0.1, release.set).start()
+    results = run_threads(5, lambda i: flights.do('price', slow, timeout=2, info=infos[i]))
+    assert results == ['answer'] * 5
+    assert len(calls) == 1
+    assert sum(1 for info in infos if info.get('coalesced')) == 4
+    assert flights.stats()['in_flight'] == 0
+    assert flights.stats()['coalesced'] == 4
+    # Once finished, the next request makes its own call
+    assert flights.do('price', slow) == 'answer'
+    assert len(calls) == 2
+
+def test_failure_propagates_to_every_waiter():
+    flights = SingleFlight()
+    error = RuntimeError('rate limited')
+    def failing():
+        time.sleep(0.1)
+        raise error
+    results = run_threads(3, lambda i: flights.do('price', failing, timeout=2))
+    assert results == [error] * 3
+    assert flights.stats()['calls'] == 1
+
+def test_waiter_deadline_does_not_cancel_the_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flights.do('price', lambda: release.wait(2) and 'answer'))
+    leader.start()
+    time.sleep(0.05)
+    with pytest.raises(DeadlineExceeded):
+        flights.do('price', lambda: 'not called', timeout=0.05)
+    release.set()
+    leader.join()
+    assert flights.stats()['timeouts'] == 1
+
+def test_disabled_or_no_key_calls_directly():
+    assert SingleFlight(enabled=False).do('k', lambda: 1) == 1
+    flights = SingleFlight()
+    assert flights.do(None, lambda: 2) == 2
+    assert flights.stats()['calls'] == 0
+
+def test_async_calls_share_one_task_and_survive_cancellation():
+    flights = AsyncSingleFlight()
+    calls = []
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 'answer'
+    async def scenario():
+        leader = asyncio.ensure_future(flights.do('price', slow))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(flights.do('price', slow, timeout=1)) for _ in range(3)]
+        leader.cancel()
+        impatient = flights.do('price', slow, timeout=0.01)
+        with pytest.raises(DeadlineExceeded):
+            await impatient
+        return await asyncio.gather(*waiters)
+    assert asyncio.run(scenario()) == ['answer'] * 3
+    assert len(calls) == 1
+    assert flights.stats()['timeouts'] == 1
+
+def test_get_ai_response_coalesces_identical_first_questions():
+    import app
+    app.answer_cache.clear()
+    completion = MagicMock()
+    completion.choices[0].message.content = 'Prices start at $180,000.'
+    def slow_create(**kwargs):
+        time.sleep(0.2)
+        return completion
+    with patch('app.client') as mock_client, patch.object(app.answer_cache, 'enabled', False):
+        mock_client.chat.completions.create.side_effect = slow_create
+        infos = [{} for _ in range(4)]
+        results = run_threads(4, lambda i: app.get_ai_response('What is the price?', turn_info=infos[i]))
+    assert results == ['Prices start at $180,000.'] * 4
+    assert mock_client.chat.completions.create.call_count == 1
+    assert sum(1 for info in infos if info.get('coalesced')) == 3
+
+def test_async_deadline_racing_the_result_returns_the_result():
+    flights = AsyncSingleFlight()
+    async def answer():
+        return 'answer'
+    async def deadline_hits_as_the_call_finishes(awaitable, timeout):
+        await awaitable
+        raise asyncio.TimeoutError
+    async def scenario():
+        with patch('services.single_flight.asyncio.wait_for', deadline_hits_as_the_call_finishes):
+            return await flights.do('price', answer, timeout=1)
+    assert asyncio.run(scenario()) == 'answer'
+    assert flights.stats()['timeouts'] == 0
+    assert AsyncSingleFlight().stats()['in_flight'] == 0
@@ -0,0 +1,110 @@
+import threading
+import pytest
+from unittest.mock import patch
+import app as app_module
+from app import app
+from services.speculative import SpeculativeAnswers
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def speculating():
+    # Off by default (SPECULATIVE_ANSWERS_ENABLED)
+    with patch.object(app_module.speculative_answers, 'enabled', True):
+        yield
+
+def test_speculates_once_partial_is_stable():
+    calls = []
+    answers = SpeculativeAnswers(answer_fn=lambda text, call_sid: calls.append(text) or 'answer')
+    assert not answers.record_partial('CA1', 'what is', 'the')
+    assert not answers.record_partial('CA1', 'what is the', 'price')
+    assert answers.record_partial('CA1', 'what is the', 'price')
+    assert not answers.record_partial('CA1', 'what is the price', '')
+    future = answers.claim('CA1', 'What is the price?')
+    assert future.result(timeout=5) == 'answer'
+    assert calls == ['what is the price']
+    assert answers.stats()['reused'] == 1
+
+def test_claim_mismatch_discards():
+    answers = SpeculativeAnswers(answer_fn=lambda text, call_sid: 'answer')
+    answers.record_partial('CA1', 'where is it located', '')
+    assert answers.claim('CA1', 'where is it located and how much') is None
+    assert answers.claim('CA1', 'where is it located') is None
+    assert answers.stats()['discarded'] == 1
+
+def test_superseded_speculation_is_cancelled_or_counted_as_waste():
+    running, release = threading.Event(), threading.Event()
+    wasted = []
+    def answer(text, call_sid):
+        running.set()
+        release.wait(5)
+        return text
+    answers = SpeculativeAnswers(answer_fn=answer, max_workers=1, waste_fn=wasted.append)
+    answers.record_partial('CA1', 'what is the price', '')
+    assert running.wait(5)
+    answers.record_partial('CA2', 'where is it located', '')     # queued behind CA1's
+    answers.record_partial('CA2', 'where is it located exactly', '')
+    assert answers.stats()['cancelled'] == 1
+    answers.record_partial('CA1', 'what is the price of parking', '')
+    release.set()
+    assert answers.claim('CA1', 'what is the price of parking').result(timeout=5) == 'what is the price of parking'
+    # The first CA1 request was already running: its spend is reported, not lost
+    assert wasted == ['what is the price']
+    assert answers.stats()['discarded'] == 2
+
+def test_speculative_waste_counts_tokens():
+    before = app_module.speculative_waste['prompt'].value
+    app_module.record_speculative_waste(('answer', {'prompt_tokens': 120, 'completion_tokens': 30}))
+    assert app_module.speculative_waste['prompt'].value == before + 120
+
+def test_short_or_disabled_partials_do_not_speculate():
+    answers = SpeculativeAnswers(answer_fn=lambda text, call_sid: 'answer', min_words=3)
+    assert not answers.record_partial('CA1', 'price', '')
+    answers.enabled = False
+    assert not answers.record_partial('CA2', 'what is the price', '')
+    assert answers.latest_partial('CA2') == 'what is the price'
+
+def test_partial_result_route_is_cheap(client):
+    response = client.post('/partial_result', data={'CallSid': 'CApartial', 'UnstableSpeechResult': 'hel'})
+    assert response.status_code == 204
+    assert response.data == b''
+
+def test_process_speech_reuses_speculative_answer(client, speculating):
+    started = threading.Event()
+    def fake_answer(user_input, **kwargs):
+        started.set()
+        return "Speculative answer."
+    with patch('app.get_ai_response', side_effect=fake_answer) as mock_answer:
+        client.post('/partial_result', data={
+            'CallSid': 'CAspec', 'StableSpeechResult': 'Is it a good area for families', 'UnstableSpeechResult': ''
+        })
+        assert started.wait(5)
+        response = client.post('/process_speech', data={
+            'SpeechResult': 'Is it a good area for families?', 'Confidence': '0.9', 'CallSid': 'CAspec'
+        })
+        assert b'Speculative answer.' in response.data
+        assert mock_answer.call_count == 1
+
+def test_reused_speculative_turn_keeps_usage(client, speculating):
+    started = threading.Event()
+    def fake_answer(user_input, turn_info=None, **kwargs):
+        turn_info.update(model='gpt-4o-mini', tier='fast', retries=0, prompt_tokens=120, completion_tokens=30)
+        started.set()
+        return "Speculative answer."
+    with patch('app.get_ai_response', side_effect=fake_answer), \
+            patch('app.record_transcript_turn') as record_turn:
+        client.post('/partial_result', data={
+            'CallSid': 'CAspecusage', 'StableSpeechResult': 'Do you have parking for residents', 'UnstableSpeechResult': ''
+        })
+        assert started.wait(5)
+        client.post('/process_speech', data={
+            'SpeechResult': 'Do you have parking for residents?', 'Confidence': '0.9', 'CallSid': 'CAspecusage'
+        })
+    turn_info = record_turn.call_args.args[-1]
+    assert turn_info['speculative'] is True
+    assert turn_info['model'] == 'gpt-4o-mini'
+    assert turn_info['prompt_tokens'] == 120
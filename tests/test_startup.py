@@ -0,0 +1,12 @@
+import pytest
+from benchmarks.bench_startup import probe, side_effects
+
+@pytest.mark.parametrize('module', ['config.settings', 'app', 'voice_calls.make_call', 'voice_calls.make_call_test'])
+def test_import_without_credentials_has_no_side_effects(module):
+    assert side_effects(probe(module)) == []
+
+def test_cli_modes_do_not_import_the_app():
+    for command in (('main.py', '--help'), ('main.py', '--mode', 'test')):
+        result = probe(*command)
+        assert side_effects(result) == []
+        assert not {'flask', 'openai', 'twilio'} & set(result['heavy'])
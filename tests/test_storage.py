@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import patch
+from app import app
+from services.storage import TranscriptStore, sqlite_path_from_url
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def store(tmp_path):
+    store = TranscriptStore(f'sqlite:///{tmp_path}/calls.db', batch_size=10, idle_wait=0.05)
+    yield store
+    store.close()
+
+def test_sqlite_path_from_url():
+    assert sqlite_path_from_url('sqlite:///data/calls.db') == 'data/calls.db'
+    assert sqlite_path_from_url('sqlite:////var/lib/calls.db') == '/var/lib/calls.db'
+    assert sqlite_path_from_url(None) == 'data/voice_caller.db'
+    with pytest.raises(ValueError):
+        sqlite_path_from_url('postgres://db/calls')
+
+def test_turns_are_written_in_batches_and_queryable(store):
+    for i in range(25):
+        store.record_turn('CA1', f'question {i}', f'answer {i}', confidence=0.9,
+                          model='gpt-4', latency_ms=120.5, retries=0)
+    store.record_turn('CA2', 'other call', 'other answer')
+    store.flush()
+    transcript = store.get_transcript('CA1')
+    assert [t['user_input'] for t in transcript] == [f'question {i}' for i in range(25)]
+    assert transcript[0]['model'] == 'gpt-4'
+    assert transcript[0]['latency_ms'] == 120.5
+    assert store.written == 26
+
+def test_process_speech_records_transcript(client, store):
+    with patch('app.transcript_store', store), \
+            patch('app.get_ai_response', return_value="Starting at $180,000."):
+        client.post('/process_speech', data={
+            'SpeechResult': 'Is it a good area for families?', 'Confidence': '0.87', 'CallSid': 'CAtranscript'
+        })
+        from app import get_call_transcript
+        transcript = get_call_transcript('CAtranscript')
+    assert len(transcript) == 1
+    assert transcript[0]['answer'] == "Starting at $180,000."
+    assert transcript[0]['confidence'] == 0.87
+    assert transcript[0]['latency_ms'] is not None
+
+def test_old_database_gets_new_columns(tmp_path):
+    import sqlite3
+    db_path = tmp_path / 'old.db'
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE call_turns (id INTEGER PRIMARY KEY AUTOINCREMENT, call_sid TEXT NOT NULL, "
+                 "created_at REAL NOT NULL, user_input TEXT, confidence REAL, answer TEXT, model TEXT, "
+                 "latency_ms REAL, retries INTEGER)")
+    conn.commit()
+    conn.close()
+    store = TranscriptStore(f'sqlite:///{db_path}', idle_wait=0.05)
+    store.record_turn('CA1', 'price?', 'answer', tier='fast')
+    store.flush()
+    assert store.get_transcript('CA1')[0]['tier'] == 'fast'
+    store.close()
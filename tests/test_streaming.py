@@ -0,0 +1,92 @@
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from app import app, answer_cache
+from services.streaming import StreamingAnswers, split_sentences
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_split_sentences_keeps_prices_together():
+    sentences, rest = split_sentences("Prices start at $180.000 today. Units are big! And")
+    assert sentences == ["Prices start at $180.000 today.", "Units are big!"]
+    assert rest == "And"
+
+def test_streaming_answers_delivers_sentences_and_tail():
+    completed = []
+    answers = StreamingAnswers()
+    answers.start('CA1', iter(["Hello there. ", "Second", " part"]), on_complete=completed.append)
+    collected = []
+    finished = False
+    while not finished:
+        sentences, finished = answers.next_sentences('CA1', timeout=5)
+        collected.extend(sentences)
+    assert collected == ["Hello there.", "Second part"]
+    assert completed == ["Hello there. Second part"]
+    assert answers.next_sentences('CA1', timeout=0) == (None, True)
+
+def test_streaming_answers_failure_is_not_cached():
+    completed = []
+    def chunks():
+        yield "Partial answer. "
+        raise RuntimeError("stream dropped")
+    answers = StreamingAnswers()
+    answers.start('CA1', chunks(), on_complete=completed.append)
+    collected = []
+    finished = False
+    while not finished:
+        sentences, finished = answers.next_sentences('CA1', timeout=5)
+        collected.extend(sentences)
+    assert collected == ["Partial answer."]
+    assert completed == []
+
+def test_process_speech_streams_first_sentence(client):
+    answer_cache.clear()
+    chunks = ["Apartments start ", "at $180,000. ", "We have 2 and 3 bedroom units."]
+    with patch('app.config.STREAMING_ANSWERS_ENABLED', True), \
+            patch('app.stream_ai_response', return_value=iter(chunks)):
+        response = client.post('/process_speech', data={
+            'SpeechResult': 'Is it a good area for families?', 'Confidence': '0.9', 'CallSid': 'CAstream'
+        })
+        assert b'Apartments start at $180,000.' in response.data
+        spoken = body = response.data
+        for _ in range(10):
+            if b'/continue_answer' not in body:
+                break
+            body = client.post('/continue_answer', data={'CallSid': 'CAstream'}).data
+            spoken += body
+        assert b'We have 2 and 3 bedroom units.' in spoken
+        assert b'/process_followup' in body
+    answer_cache.clear()
+
+def test_stream_with_open_circuit_speaks_canned_reply(client):
+    import app as app_module
+    answer_cache.clear()
+    with patch('app.config.STREAMING_ANSWERS_ENABLED', True), \
+            patch.object(app_module.openai_breaker, 'allow_request', return_value=False):
+        response = client.post('/process_speech', data={
+            'SpeechResult': 'Are there schools nearby?', 'Confidence': '0.9', 'CallSid': 'CAcircuit'
+        })
+    assert b"I can't look that up right now" in response.data
+    time.sleep(0.1)  # on_complete runs on the stream thread after the last sentence
+    assert answer_cache.get('Are there schools nearby?') is None
+
+def test_stream_failure_mid_answer_counts_against_breaker():
+    import openai
+    import app as app_module
+    def broken_stream():
+        yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content='Hello. '))])
+        raise openai.APIConnectionError(request=MagicMock())
+    with patch('app.client') as mock_client, \
+            patch.object(app_module.openai_breaker, 'record_failure') as record_failure:
+        mock_client.chat.completions.create.return_value = broken_stream()
+        chunks = app_module.stream_ai_response('Tell me about the area')
+        assert next(chunks) == 'Hello. '
+        record_failure.assert_not_called()
+        with pytest.raises(openai.APIConnectionError):
+            next(chunks)
+        record_failure.assert_called_once()
@@ -0,0 +1,37 @@
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
+from services.twiml_cache import TwimlRegistry, TwimlTemplate
+import app as app_module
+
+def _say_and_hangup(message):
+    resp = VoiceResponse()
+    resp.say(message, language='en-US', voice='Polly.Joanna')
+    resp.hangup()
+    return resp
+
+def test_registry_renders_once():
+    calls = []
+    def builder():
+        calls.append(1)
+        return _say_and_hangup('Goodbye')
+    registry = TwimlRegistry()
+    registry.register('bye', builder)
+    registry.render_all()
+    assert registry.get('bye') == registry.get('bye') == str(_say_and_hangup('Goodbye')).encode()
+    assert len(calls) == 1
+
+def test_template_matches_full_render_and_escapes():
+    template = TwimlTemplate(_say_and_hangup, 'message')
+    text = 'Prices start at $180,000 & up <for 2BR>'
+    assert template.render(message=text) == str(_say_and_hangup(text)).encode()
+
+def test_template_requires_every_field():
+    with pytest.raises(ValueError):
+        TwimlTemplate(lambda message, extra: _say_and_hangup(message), 'message', 'extra')
+
+def test_app_templates_match_voice_response_builders():
+    answer = 'We have "modern" 2 & 3 bedroom apartments.'
+    assert app_module.ANSWER_TEMPLATE.render(answer=answer) == str(app_module.build_answer_twiml(answer)).encode()
+    assert app_module.HOLD_TEMPLATE.render(message='Hold on', attempt=3) == \
+        str(app_module.build_hold_twiml(3, 'Hold on')).encode()
+    assert app_module.static_twiml.get('outbound') == str(app_module.build_outbound_twiml()).encode()
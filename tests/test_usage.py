@@ -0,0 +1,74 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from app import app, answer_cache
+from services.storage import TranscriptStore
+from services.usage import load_prices, record_usage, estimate_cost
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def store(tmp_path):
+    store = TranscriptStore(f'sqlite:///{tmp_path}/calls.db', batch_size=10, idle_wait=0.05)
+    yield store
+    store.close()
+
+def test_estimate_cost_uses_base_model_price():
+    prices = load_prices()
+    assert estimate_cost(prices, 'gpt-4', 1000, 500) == 0.06
+    assert estimate_cost(prices, 'gpt-4o-mini-2024-07-18', 1000, 0) == estimate_cost(prices, 'gpt-4o-mini', 1000, 0)
+    assert estimate_cost(prices, 'unknown-model', 10, 10) is None
+    assert estimate_cost(prices, 'gpt-4', None, None) is None
+    assert load_prices('{"my-model": [1, 2]}') == {'my-model': (1.0, 2.0)}
+
+def test_record_usage_adds_up():
+    info = {}
+    record_usage(info, SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+    record_usage(info, SimpleNamespace(prompt_tokens=50, completion_tokens=None))
+    record_usage(info, None)
+    assert info == {'prompt_tokens': 150, 'completion_tokens': 20}
+
+def test_call_usage_and_summary(store):
+    store.record_turn('CA1', 'q1', 'a1', model='gpt-4', latency_ms=900.0, retries=1,
+                      prompt_tokens=300, completion_tokens=50, cost_usd=0.012)
+    store.record_turn('CA1', 'q2', 'a2', model='gpt-4', latency_ms=4000.0, retries=0,
+                      prompt_tokens=400, completion_tokens=80, cost_usd=0.0168)
+    store.record_turn('CA2', 'q3', 'a3', model='gpt-4o-mini', latency_ms=300.0, retries=0,
+                      prompt_tokens=200, completion_tokens=40, cost_usd=0.000054)
+    store.flush()
+    usage = store.get_call_usage('CA1')
+    assert usage['turns'] == 2
+    assert usage['prompt_tokens'] == 700
+    assert usage['cost_usd'] == 0.0288
+    assert usage['max_latency_ms'] == 4000.0
+    assert usage['retries'] == 1
+    assert store.get_call_usage('CAnone') is None
+    summary = store.usage_summary(limit=2)
+    assert summary['totals']['calls'] == 2
+    assert summary['top_calls_by_cost'][0]['call_sid'] == 'CA1'
+    assert [t['user_input'] for t in summary['slowest_turns']] == ['q2', 'q1']
+
+def test_usage_endpoint_reports_openai_tokens(client, store):
+    answer_cache.clear()
+    completion = MagicMock()
+    completion.choices[0].message.content = "It is close to good schools."
+    completion.usage = SimpleNamespace(prompt_tokens=250, completion_tokens=30)
+    with patch('app.transcript_store', store), patch('app.client') as mock_client:
+        mock_client.chat.completions.create.return_value = completion
+        client.post('/process_speech', data={
+            'SpeechResult': 'Is it a good area for families?', 'Confidence': '0.9', 'CallSid': 'CAusage'
+        })
+        report = client.get('/usage/CAusage').get_json()
+        missing = client.get('/usage/CAmissing')
+        summary = client.get('/usage').get_json()
+    answer_cache.clear()
+    assert report['prompt_tokens'] == 250
+    assert report['completion_tokens'] == 30
+    assert report['cost_usd'] > 0
+    assert report['turns_detail'][0]['model']
+    assert missing.status_code == 404
+    assert summary['totals']['turns'] == 1
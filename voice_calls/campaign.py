@@ -0,0 +1,220 @@
+# voice_calls/campaign.py
+"""
+Bulk outbound campaign dialer.
+
+Phone numbers are streamed from a CSV file into a durable DialQueue, and
+run_queue dials them from a pool of threads sharing one pooled Twilio
+client, so a campaign can be resumed after a crash. A token bucket keeps
+the call-creation rate within the account's calls-per-second (CPS) limit,
+and every dial's latency and outcome is recorded for the end-of-run
+summary.
+"""
+import csv
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from voice_calls.dial_queue import is_retryable
+
+logger = logging.getLogger(__name__)
+
+_NON_DIGITS = re.compile(r'[\s\-().]')
+_E164 = re.compile(r'^\+?[1-9]\d{6,14}$')
+NUMBER_COLUMNS = ('phone', 'phone_number', 'number', 'to')
+
+
+def normalize_number(value):
+    """Strip formatting from a phone number; None if it is not a plausible E.164 number"""
+    number = _NON_DIGITS.sub('', value or '')
+    if not _E164.match(number):
+        return None
+    return number if number.startswith('+') else f'+{number}'
+
+
+def iter_numbers(path):
+    """
+    Stream normalized numbers from a CSV file, one row at a time.
+
+    Uses the phone/phone_number/number/to column if there is a header row,
+    otherwise the first column. Invalid rows yield None.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        column = 0
+        for index, row in enumerate(csv.reader(f)):
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            if index == 0 and normalize_number(row[0]) is None:
+                header = [cell.strip().lower() for cell in row]
+                column = next((header.index(name) for name in NUMBER_COLUMNS if name in header), 0)
+                continue
+            yield normalize_number(row[column] if column < len(row) else '')
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `burst` saved up.
+
+    acquire() reserves a token under the lock and sleeps outside it, so
+    waiting threads are released in order at exactly the configured rate.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def acquire(self):
+        """Take one token, blocking until it is available; returns the time waited"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class CampaignReport:
+    """Outcome and latency of every dial in a campaign"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished = None
+        self.latencies = []
+        self.succeeded = []      # (number, call_sid)
+        self.failed = []         # (number, error)
+        self.queue_errors = Counter()  # DialQueue operations that raised, by error
+        self.lost_leases = 0           # dials whose job was re-leased before the outcome was recorded
+
+    def record_queue_error(self, error):
+        with self._lock:
+            self.queue_errors[f"{type(error).__name__}: {error}"] += 1
+
+    def record_lost_lease(self):
+        with self._lock:
+            self.lost_leases += 1
+
+    def record(self, number, latency, call_sid=None, error=None):
+        with self._lock:
+            self.latencies.append(latency)
+            if error is None:
+                self.succeeded.append((number, call_sid))
+            else:
+                self.failed.append((number, error))
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        latencies = sorted(self.latencies)
+        total = len(latencies)
+        return {
+            'total': total,
+            'succeeded': len(self.succeeded),
+            'failed': len(self.failed),
+            'elapsed_seconds': round(elapsed, 2),
+            'calls_per_second': round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50) * 1000, 1),
+                'p95': round(percentile(latencies, 0.95) * 1000, 1),
+                'p99': round(percentile(latencies, 0.99) * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            },
+            'errors': dict(Counter(error for _, error in self.failed).most_common(5)),
+            'queue_errors': sum(self.queue_errors.values()),
+            'lost_leases': self.lost_leases,
+        }
+
+
+def retry_queue(operation, report, attempts=5, delay=0.5):
+    """
+    Run a DialQueue operation, retrying errors such as sqlite's "database is locked".
+
+    Every error is counted in the report; after `attempts` tries the last one is raised.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except Exception as e:
+            report.record_queue_error(e)
+            if attempt == attempts:
+                raise
+            logger.warning("Dial queue operation failed (attempt %d/%d), retrying: %s", attempt, attempts, e)
+            time.sleep(delay * attempt)
+
+
+def run_queue(dial_queue, dial, concurrency=10, cps=1.0, burst=1, max_idle_wait=1.0,
+              queue_attempts=5, queue_retry_delay=0.5):
+    """
+    Work a DialQueue until it has no pending jobs left, checkpointing every dial.
+
+    Each worker leases one job, dials it under the CPS limit and records the
+    Call SID or the error (retried with backoff up to the attempt limit)
+    before leasing the next, so a crash loses at most the in-flight dials.
+    The CPS token is taken before the lease, so waiting for it never eats
+    into the lease. Queue operations that fail are retried with backoff; a
+    worker that still cannot reach the queue logs the error and stops,
+    leaving its job leased.
+    """
+    bucket = TokenBucket(cps, burst=burst)
+    report = CampaignReport()
+
+    def queue(operation):
+        return retry_queue(operation, report, attempts=queue_attempts, delay=queue_retry_delay)
+
+    def recorded(job, outcome):
+        if not outcome:
+            logger.warning("Lease on %s was taken over before its outcome was recorded", job.number)
+            report.record_lost_lease()
+
+    def worker():
+        try:
+            while True:
+                bucket.acquire()
+                jobs = queue(lambda: dial_queue.lease(1))
+                if not jobs:
+                    due = queue(dial_queue.next_due)
+                    if due is None:
+                        return
+                    # Only retries waiting out their backoff are left
+                    time.sleep(min(max(due - time.time(), 0.01), max_idle_wait))
+                    continue
+                job = jobs[0]
+                started = time.perf_counter()
+                try:
+                    call_sid = dial(job.number)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    report.record(job.number, time.perf_counter() - started, error=error)
+                    recorded(job, queue(lambda: dial_queue.mark_failed(job, error, retryable=is_retryable(e))))
+                else:
+                    report.record(job.number, time.perf_counter() - started, call_sid=call_sid)
+                    recorded(job, queue(lambda: dial_queue.mark_initiated(job, call_sid)))
+        except Exception:
+            logger.exception("Dial queue unavailable, stopping %s", threading.current_thread().name)
+        finally:
+            dial_queue.close()
+
+    threads = [threading.Thread(target=worker, name=f'campaign-dialer-{i}', daemon=True)
+               for i in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report.finished = time.perf_counter()
+    return report
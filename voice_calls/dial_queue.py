@@ -0,0 +1,221 @@
+# voice_calls/dial_queue.py
+"""
+Durable, resumable dial queue in SQLite (WAL).
+
+Every destination of a campaign is a row that moves through
+pending -> dialing -> initiated | failed, with its Call SID once Twilio
+accepts it. A worker leases a job by marking it dialing with a lease
+expiry before it calls Twilio, and records the outcome right after, so
+each job's state is committed before and after every dial. If the process
+dies, re-running the campaign picks up every pending job plus any job
+whose lease expired mid-dial.
+
+A lease that expires means the process died between claiming the job and
+recording Twilio's answer, so the call may or may not have been placed;
+such jobs are retried, and count against the attempt limit: once it is
+reached an expired lease fails the job instead of dialing the number again.
+Every lease bumps the job's attempt count, which doubles as the lease
+token: a worker only records an outcome for the attempt it leased, so a
+worker whose lease was taken over cannot overwrite the new one.
+"""
+import os
+import threading
+import time
+
+from services.storage import connect, sqlite_path_from_url
+
+PENDING = 'pending'
+DIALING = 'dialing'
+INITIATED = 'initiated'
+FAILED = 'failed'
+STATES = (PENDING, DIALING, INITIATED, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dial_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign TEXT NOT NULL,
+    number TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    call_sid TEXT,
+    last_error TEXT,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_expires_at REAL,
+    updated_at REAL NOT NULL,
+    UNIQUE (campaign, number)
+);
+CREATE INDEX IF NOT EXISTS idx_dial_jobs_state ON dial_jobs (campaign, state, next_attempt_at, id);
+"""
+
+INSERT_JOB = "INSERT OR IGNORE INTO dial_jobs (campaign, number, updated_at) VALUES (?, ?, ?)"
+
+
+def is_retryable(error):
+    """Client errors (invalid number, bad request, ...) are final; rate limits, 5xx and network errors are not"""
+    status = getattr(error, 'status', None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in (408, 429)
+    return True
+
+
+class DialJob:
+    """One leased destination"""
+
+    __slots__ = ('id', 'number', 'attempts')
+
+    def __init__(self, job_id, number, attempts):
+        self.id = job_id
+        self.number = number
+        self.attempts = attempts
+
+
+class DialQueue:
+    """Campaign destinations with leases, bounded retries and resume after a crash"""
+
+    def __init__(self, database_url=None, campaign='default', max_attempts=3,
+                 lease_seconds=60.0, retry_backoff=30.0, clock=time.time):
+        self.db_path = sqlite_path_from_url(database_url)
+        self.campaign = campaign
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self._clock = clock
+        self._local = threading.local()
+
+    def enqueue(self, numbers, chunk_size=1000):
+        """
+        Add numbers from any iterable, committing every chunk_size rows.
+
+        Numbers already in the campaign are ignored, so re-running the same
+        list is safe. None entries (invalid rows) are skipped and counted.
+        Returns (added, skipped).
+        """
+        conn = self._conn()
+        added = skipped = 0
+        chunk = []
+        for number in numbers:
+            if number is None:
+                skipped += 1
+                continue
+            chunk.append(number)
+            if len(chunk) >= chunk_size:
+                added += self._insert(conn, chunk)
+                chunk = []
+        if chunk:
+            added += self._insert(conn, chunk)
+        return added, skipped
+
+    def lease(self, limit=1):
+        """Claim up to `limit` due jobs (pending, or dialing with an expired lease) for this worker"""
+        conn = self._conn()
+        now = self._clock()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # The call may have been placed before the worker died: never dial a number past max_attempts
+            conn.execute(
+                "UPDATE dial_jobs SET state = ?, last_error = ?, lease_expires_at = NULL, updated_at = ? "
+                "WHERE campaign = ? AND state = ? AND lease_expires_at < ? AND attempts >= ?",
+                (FAILED, 'lease expired on the last attempt', now, self.campaign, DIALING, now,
+                 self.max_attempts)
+            )
+            rows = conn.execute(
+                "SELECT id, number, attempts FROM dial_jobs WHERE campaign = ? AND ("
+                "(state = ? AND next_attempt_at <= ?) OR (state = ? AND lease_expires_at < ? AND attempts < ?)"
+                ") ORDER BY id LIMIT ?",
+                (self.campaign, PENDING, now, DIALING, now, self.max_attempts, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE dial_jobs SET state = ?, attempts = attempts + 1, lease_expires_at = ?, "
+                "updated_at = ? WHERE id = ?",
+                [(DIALING, now + self.lease_seconds, now, row[0]) for row in rows]
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return [DialJob(job_id, number, attempts + 1) for job_id, number, attempts in rows]
+
+    def mark_initiated(self, job, call_sid):
+        """Record the Call SID; False if the lease was lost to another worker"""
+        return self._update(
+            "UPDATE dial_jobs SET state = ?, call_sid = ?, last_error = NULL, lease_expires_at = NULL, "
+            "updated_at = ? WHERE id = ? AND state = ? AND attempts = ?",
+            (INITIATED, call_sid, self._clock(), job.id, DIALING, job.attempts)
+        )
+
+    def mark_failed(self, job, error, retryable=True):
+        """
+        Schedule a retry with exponential backoff, or fail the job for good.
+
+        Returns the new state, or None if the lease was lost to another worker.
+        """
+        now = self._clock()
+        if retryable and job.attempts < self.max_attempts:
+            state, next_attempt_at = PENDING, now + self.retry_backoff * 2 ** (job.attempts - 1)
+        else:
+            state, next_attempt_at = FAILED, now
+        if not self._update(
+            "UPDATE dial_jobs SET state = ?, last_error = ?, next_attempt_at = ?, lease_expires_at = NULL, "
+            "updated_at = ? WHERE id = ? AND state = ? AND attempts = ?",
+            (state, str(error)[:500], next_attempt_at, now, job.id, DIALING, job.attempts)
+        ):
+            return None
+        return state
+
+    def next_due(self):
+        """Earliest next_attempt_at of the campaign's pending jobs, or None if none are left"""
+        row = self._conn().execute(
+            "SELECT MIN(next_attempt_at) FROM dial_jobs WHERE campaign = ? AND state = ?",
+            (self.campaign, PENDING)
+        ).fetchone()
+        return row[0]
+
+    def counts(self):
+        """Number of the campaign's jobs in each state"""
+        counts = dict.fromkeys(STATES, 0)
+        for state, count in self._conn().execute(
+            "SELECT state, COUNT(*) FROM dial_jobs WHERE campaign = ? GROUP BY state", (self.campaign,)
+        ):
+            counts[state] = count
+        return counts
+
+    def jobs(self, state=None):
+        """Iterate over the campaign's jobs as dicts, optionally only those in one state"""
+        sql = "SELECT number, state, attempts, call_sid, last_error FROM dial_jobs WHERE campaign = ?"
+        params = [self.campaign]
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        cursor = self._conn().execute(sql + " ORDER BY id", params)
+        columns = [c[0] for c in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _insert(self, conn, numbers):
+        now = self._clock()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(INSERT_JOB, [(self.campaign, number, now) for number in numbers])
+            return conn.total_changes - before
+
+    def _update(self, sql, params):
+        """Run one UPDATE in its own transaction; True if it changed a row"""
+        conn = self._conn()
+        with conn:
+            return conn.execute(sql, params).rowcount > 0
+
+    def _conn(self):
+        # One connection per thread (and per process after a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = connect(self.db_path)
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
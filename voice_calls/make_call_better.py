@@ -1,7 +1,8 @@
-from twilio.rest import Client
 import os
 import sys
+import threading
 from config.settings import config
+from voice_calls.twilio_http import create_twilio_client
 
 # ==== TWILIO CONFIGURATION ====
 # Replace these with your actual Twilio credentials
@@ -19,6 +20,32 @@ twilio_number = config.TWILIO_PHONE_NUMBER   # Format: +1234567890
 destination_number = config.DESTINATION_NUMBER  # Replace with the number you want to call
 flask_url_outbound = config.FLASK_SERVER_URL_OUTBOUND
 
+# Progress events posted to STATUS_CALLBACK_URL (the app's /call_status webhook)
+STATUS_CALLBACK_EVENTS = ['initiated', 'ringing', 'answered', 'completed']
+
+# One pooled keep-alive client shared by every call, created on first use
+client = None
+_client_lock = threading.Lock()
+
+def get_client(pool_size=None):
+    """
+    The shared Twilio client.
+
+    pool_size (default CAMPAIGN_CONCURRENCY) only applies to the first call,
+    which creates the client: a campaign passes its dialer thread count.
+    """
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                client = create_twilio_client(
+                    account_sid,
+                    auth_token,
+                    pool_size=pool_size or config.CAMPAIGN_CONCURRENCY,
+                    base_url=config.TWILIO_API_BASE_URL
+                )
+    return client
+
 def validate_credentials():
     """Validate Twilio credentials before making the call"""
     print("🔍 Validating Twilio credentials...")
@@ -59,7 +86,7 @@ def test_twilio_connection():
     """Test Twilio connection before making a call"""
     try:
         print("🔗 Testing Twilio connection...")
-        client = Client(account_sid, auth_token)
+        client = get_client()
         
         # Test by fetching account info
         account = client.api.accounts(account_sid).fetch()
@@ -87,34 +114,28 @@ def test_twilio_connection():
         print(f"❌ Twilio connection test failed: {str(e)}")
         return False
 
-def make_call():
-    """Make the outbound call"""
-    try:
-        print("📞 Initiating call...")
-        client = Client(account_sid, auth_token)
-        
-        call = client.calls.create(
-            to=destination_number,
-            from_=twilio_number,
-            url=flask_url_outbound,
-            method='POST'
-        )
-        
-        print(f"✅ Call initiated successfully!")
-        print(f"   Call SID: {call.sid}")
-        print(f"   Status: {call.status}")
-        
-        # Use the original values instead of trying to access from the call object
-        print(f"   From: {twilio_number}")
-        print(f"   To: {destination_number}")
-        print(f"   Webhook URL: {flask_url_outbound}")
-        print(f"\n🎯 Monitor your call at: https://console.twilio.com/us1/monitor/logs/calls/{call.sid}")
-        
-        return call
-        
-    except Exception as e:
-        print(f"❌ Failed to make call: {str(e)}")
-        return None
+def make_call(to=None, from_=None, url=None):
+    """
+    Place one outbound call on the shared client and return its Call SID.
+
+    Defaults to DESTINATION_NUMBER, TWILIO_PHONE_NUMBER and the /outbound
+    webhook URL from the config. When STATUS_CALLBACK_URL is set, Twilio
+    posts the call's progress there. Twilio errors are raised to the caller.
+    """
+    params = {}
+    if config.STATUS_CALLBACK_URL:
+        params = {
+            'status_callback': config.STATUS_CALLBACK_URL,
+            'status_callback_event': STATUS_CALLBACK_EVENTS,
+            'status_callback_method': 'POST'
+        }
+    call = get_client().calls.create(
+        to=to or destination_number,
+        from_=from_ or twilio_number,
+        url=url or flask_url_outbound,
+        **params
+    )
+    return call.sid
 
 def main():
     print("🚀 Twilio Voice Call Initiator")
@@ -144,13 +165,22 @@ def main():
         print("Call cancelled.")
         return
     
-    call = make_call()
-    
-    if call:
-        print(f"\n🎉 Success! Call is in progress.")
-        print(f"🔍 You can monitor the call logs in your Twilio console.")
-    else:
+    try:
+        print("📞 Initiating call...")
+        call_sid = make_call()
+    except Exception as e:
+        print(f"❌ Failed to make call: {str(e)}")
         print(f"\n❌ Call failed. Check the error message above.")
+        return
+    
+    print(f"✅ Call initiated successfully!")
+    print(f"   Call SID: {call_sid}")
+    print(f"   From: {twilio_number}")
+    print(f"   To: {destination_number}")
+    print(f"   Webhook URL: {flask_url_outbound}")
+    print(f"\n🎯 Monitor your call at: https://console.twilio.com/us1/monitor/logs/calls/{call_sid}")
+    print(f"\n🎉 Success! Call is in progress.")
+    print(f"🔍 You can monitor the call logs in your Twilio console.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
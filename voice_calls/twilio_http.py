@@ -0,0 +1,38 @@
+# voice_calls/twilio_http.py
+"""
+Shared, pooled Twilio REST client.
+
+One twilio.rest.Client whose requests.Session keeps enough keep-alive
+connections open for every concurrent dialer thread, instead of a new
+client (and TLS handshake) per call. TWILIO_API_BASE_URL points every
+Twilio domain at another host, e.g. a local fake Twilio server in tests
+and benchmarks.
+"""
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+
+class PooledHttpClient(TwilioHttpClient):
+    """TwilioHttpClient with a connection pool sized for concurrent use and an optional base URL"""
+
+    def __init__(self, pool_size=10, base_url=None, timeout=15.0):
+        super().__init__(pool_connections=True, timeout=timeout)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.base_url = urlsplit(base_url) if base_url else None
+
+    def request(self, method, url, *args, **kwargs):
+        if self.base_url is not None:
+            parts = urlsplit(url)
+            url = urlunsplit((self.base_url.scheme, self.base_url.netloc, parts.path, parts.query, parts.fragment))
+        return super().request(method, url, *args, **kwargs)
+
+
+def create_twilio_client(account_sid, auth_token, pool_size=10, base_url=None, timeout=15.0):
+    """Twilio client backed by a PooledHttpClient"""
+    http_client = PooledHttpClient(pool_size=pool_size, base_url=base_url, timeout=timeout)
+    return Client(account_sid, auth_token, http_client=http_client)